@@ -0,0 +1,200 @@
+# autentikasi.py
+# Verifikasi password dan token sesi. bcrypt dijalankan di pool thread terbatas
+# agar lonjakan login tidak menghabiskan CPU semua kasir, percobaan gagal dibatasi
+# per username dan per IP, dan browser yang tersambung ulang cukup menunjukkan
+# token sesi bertanda tangan HMAC tanpa putaran bcrypt baru.
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from penyimpanan import cari_akun, kunci_data, simpan_akun
+
+# Faktor biaya bcrypt untuk hash baru; hash lama diperbarui otomatis saat login berhasil
+RONDE_BCRYPT = int(os.environ.get("KASIR_BCRYPT_ROUNDS", "12"))
+PEKERJA_BCRYPT = int(os.environ.get("KASIR_BCRYPT_WORKERS", "2"))
+# Verifikasi yang menunggu lebih dari ini langsung ditolak
+ANTREAN_MAKS = PEKERJA_BCRYPT * 4
+
+BATAS_GAGAL_USER = int(os.environ.get("KASIR_BATAS_LOGIN", "5"))
+BATAS_GAGAL_IP = BATAS_GAGAL_USER * 4
+JENDELA_GAGAL = 300  # detik
+ENTRI_GAGAL_MAKS = 10000
+
+UMUR_TOKEN = int(os.environ.get("KASIR_UMUR_SESI", str(12 * 3600)))
+RAHASIA_FILE = os.environ.get("KASIR_SECRET_FILE", "kasir.secret")
+
+_pool = ThreadPoolExecutor(max_workers=PEKERJA_BCRYPT, thread_name_prefix="bcrypt")
+_antrean = threading.BoundedSemaphore(ANTREAN_MAKS)
+
+_kunci = threading.Lock()
+_gagal = {}
+_rahasia = None
+_hash_dummy = None
+
+
+class LoginDitahanError(Exception):
+    def __init__(self, tunggu, pesan):
+        super().__init__(pesan)
+        self.tunggu = tunggu
+
+
+def _hashpw(password, ronde):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(ronde)).decode()
+
+
+def _checkpw(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    except ValueError:  # hash rusak/bukan bcrypt
+        return False
+
+
+def _ronde(hashed):
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def hash_password(password):
+    return _pool.submit(_hashpw, password, RONDE_BCRYPT).result()
+
+
+def check_password(password, hashed):
+    if not _antrean.acquire(blocking=False):
+        raise LoginDitahanError(1, "Server sedang sibuk memproses login. Coba lagi sebentar.")
+    try:
+        return _pool.submit(_checkpw, password, hashed).result()
+    finally:
+        _antrean.release()
+
+
+def _perbarui_hash(a, password):
+    # Dilakukan sebelum token dibuat, agar token tidak langsung batal oleh hash baru
+    baru = hash_password(password)
+    with kunci_data():
+        terkini = cari_akun(a["username"])
+        # Lewati jika password diganti di sela-sela
+        if terkini and terkini["password"] == a["password"]:
+            terkini["password"] = baru
+            simpan_akun(terkini)
+            return terkini
+    return a
+
+
+# Pembatasan percobaan: kunci -> waktu-waktu gagal dalam JENDELA_GAGAL terakhir
+def _kunci_batas(username, ip):
+    hasil = [(("user", username), BATAS_GAGAL_USER)]
+    if ip:
+        hasil.append((("ip", ip), BATAS_GAGAL_IP))
+    return hasil
+
+
+def _sisa_tunggu(username, ip, sekarang):
+    tunggu = 0
+    with _kunci:
+        for kunci, batas in _kunci_batas(username, ip):
+            riwayat = _gagal.get(kunci)
+            if not riwayat:
+                continue
+            while riwayat and riwayat[0] <= sekarang - JENDELA_GAGAL:
+                riwayat.popleft()
+            if len(riwayat) >= batas:
+                tunggu = max(tunggu, riwayat[0] + JENDELA_GAGAL - sekarang)
+    return int(tunggu) + 1 if tunggu else 0
+
+
+def _catat_gagal(username, ip, sekarang):
+    with _kunci:
+        if len(_gagal) >= ENTRI_GAGAL_MAKS:
+            for kunci in [k for k, r in _gagal.items() if not r or r[-1] <= sekarang - JENDELA_GAGAL]:
+                del _gagal[kunci]
+        for kunci, batas in _kunci_batas(username, ip):
+            _gagal.setdefault(kunci, deque(maxlen=batas)).append(sekarang)
+
+
+def verifikasi_login(username, password, ip=None):
+    # Mengembalikan akun jika cocok, None jika salah; LoginDitahanError jika dibatasi
+    global _hash_dummy
+    sekarang = time.monotonic()
+    tunggu = _sisa_tunggu(username, ip, sekarang)
+    if tunggu:
+        raise LoginDitahanError(tunggu, f"Terlalu banyak percobaan login. Coba lagi dalam {tunggu} detik.")
+
+    a = cari_akun(username)
+    if a is None:
+        # Tetap jalankan bcrypt agar username yang tidak ada tidak terbedakan dari waktunya
+        if _hash_dummy is None:
+            _hash_dummy = hash_password(secrets.token_hex(8))
+        check_password(password, _hash_dummy)
+        cocok = False
+    else:
+        cocok = check_password(password, a["password"])
+
+    if not cocok:
+        _catat_gagal(username, ip, sekarang)
+        return None
+    with _kunci:
+        _gagal.pop(("user", username), None)
+    if _ronde(a["password"]) != RONDE_BCRYPT:
+        a = _perbarui_hash(a, password)
+    return a
+
+
+# Token sesi (disimpan di cookie browser, bukan URL): base64(json [username, kedaluwarsa]) + "." + HMAC-SHA256.
+# Hash password ikut ditandatangani sehingga ganti password membatalkan token lama.
+def _kunci_rahasia():
+    global _rahasia
+    if _rahasia is None:
+        teks = os.environ.get("KASIR_SECRET")
+        if not teks:
+            if not os.path.exists(RAHASIA_FILE):
+                # Ditulis ke file sementara lalu di-link, proses lain tidak melihat file setengah jadi
+                tmp = f"{RAHASIA_FILE}.{os.getpid()}.tmp"
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(secrets.token_hex(32))
+                try:
+                    os.link(tmp, RAHASIA_FILE)
+                except FileExistsError:
+                    pass
+                finally:
+                    os.remove(tmp)
+            with open(RAHASIA_FILE) as f:
+                teks = f.read().strip()
+        _rahasia = teks.encode()
+    return _rahasia
+
+
+def _tanda(isi, hash_pw):
+    return hmac.new(_kunci_rahasia(), isi + b"|" + hash_pw.encode(), hashlib.sha256).hexdigest()
+
+
+def buat_token(akun):
+    kedaluwarsa = int(time.time()) + UMUR_TOKEN
+    isi = base64.urlsafe_b64encode(json.dumps([akun["username"], kedaluwarsa]).encode())
+    return f"{isi.decode()}.{_tanda(isi, akun['password'])}"
+
+
+def baca_token(token):
+    # Mengembalikan akun jika token sah dan belum kedaluwarsa, selain itu None
+    try:
+        isi, tanda = token.split(".", 1)
+        username, kedaluwarsa = json.loads(base64.urlsafe_b64decode(isi.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(kedaluwarsa, int) or kedaluwarsa < time.time():
+        return None
+    a = cari_akun(username)
+    if a is None or not hmac.compare_digest(tanda, _tanda(isi.encode(), a["password"])):
+        return None
+    return a
@@ -0,0 +1,123 @@
+# bench/bench_checkout.py
+# Stress test checkout paralel: N proses x M thread menyimpan transaksi ke satu
+# direktori data, lalu memastikan tidak ada stok atau transaksi yang hilang.
+#
+#   python bench/bench_checkout.py --proses 4 --thread 4 --checkout 200
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def siapkan_data(direktori, jumlah_barang, stok_awal):
+    barang = [
+        {"nama": f"Barang {i}", "kategori": f"Kategori {i % 10}", "stok": stok_awal,
+         "harga": 1000 + i, "harga_modal": 800 + i}
+        for i in range(jumlah_barang)
+    ]
+    with open(os.path.join(direktori, "barang.json"), "w") as f:
+        json.dump(barang, f)
+    return barang
+
+
+def pekerja(direktori, id_proses, jumlah_thread, jumlah_checkout, barang, antrian):
+    os.chdir(direktori)
+    from operasi import StokBerubahError, commit_transaksi
+
+    hasil = {"sukses": 0, "ditolak": 0, "qty": 0}
+    kunci = threading.Lock()
+
+    def kasir(id_thread):
+        acak = random.Random(id_proses * 1000 + id_thread)
+        for _ in range(jumlah_checkout):
+            keranjang = []
+            for b in acak.sample(barang, acak.randint(1, 3)):
+                qty = acak.randint(1, 3)
+                keranjang.append({"nama": b["nama"], "kategori": b["kategori"], "qty": qty,
+                                  "harga": b["harga"], "harga_modal": b["harga_modal"],
+                                  "subtotal": b["harga"] * qty})
+            try:
+                commit_transaksi(keranjang, f"kasir{id_proses}-{id_thread}", "QRIS/Transfer", 0)
+                with kunci:
+                    hasil["sukses"] += 1
+                    hasil["qty"] += sum(item["qty"] for item in keranjang)
+            except StokBerubahError:
+                with kunci:
+                    hasil["ditolak"] += 1
+
+    threads = [threading.Thread(target=kasir, args=(i,)) for i in range(jumlah_thread)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    antrian.put(hasil)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test checkout paralel")
+    parser.add_argument("--proses", type=int, default=4)
+    parser.add_argument("--thread", type=int, default=4)
+    parser.add_argument("--checkout", type=int, default=100, help="Checkout per thread")
+    parser.add_argument("--barang", type=int, default=50)
+    parser.add_argument("--stok", type=int, default=200, help="Stok awal per barang")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    os.environ["KASIR_STORAGE"] = args.storage
+    direktori = tempfile.mkdtemp(prefix="bench_checkout_")
+    barang = siapkan_data(direktori, args.barang, args.stok)
+    if args.storage == "sqlite":
+        os.chdir(direktori)
+        from penyimpanan import migrasi_json_ke_sqlite
+        migrasi_json_ke_sqlite()
+
+    antrian = Queue()
+    proses = [
+        Process(target=pekerja, args=(direktori, i, args.thread, args.checkout, barang, antrian))
+        for i in range(args.proses)
+    ]
+    mulai = time.perf_counter()
+    for p in proses:
+        p.start()
+    hasil = [antrian.get() for _ in proses]
+    for p in proses:
+        p.join()
+    durasi = time.perf_counter() - mulai
+
+    os.chdir(direktori)
+    from penyimpanan import BARANG_FILE, TRANSAKSI_FILE, load_data
+    sukses = sum(h["sukses"] for h in hasil)
+    ditolak = sum(h["ditolak"] for h in hasil)
+    qty_terjual = sum(h["qty"] for h in hasil)
+    stok_akhir = load_data(BARANG_FILE)
+    transaksi = load_data(TRANSAKSI_FILE)
+    stok_berkurang = args.barang * args.stok - sum(b["stok"] for b in stok_akhir)
+    qty_tercatat = sum(item["qty"] for t in transaksi for item in t["items"])
+    # Rekap dan tabel fakta proses ini harus ikut memuat transaksi semua proses pekerja
+    import fakta
+    import ringkasan
+    rekap = ringkasan.total()
+    qty_fakta = sum(b["qty"] for b in fakta.teratas(n=args.barang))
+
+    print(f"direktori data : {direktori}")
+    print(f"checkout       : {sukses} sukses, {ditolak} ditolak (stok berubah)")
+    print(f"durasi         : {durasi:.2f} s -> {sukses / durasi:.1f} commit/detik")
+    print(f"stok berkurang : {stok_berkurang}, qty terjual: {qty_terjual}, qty tercatat: {qty_tercatat}")
+    print(f"rekap          : {rekap['jumlah']} transaksi, qty {rekap['qty']}; tabel fakta qty {qty_fakta}")
+
+    assert len(transaksi) == sukses, f"transaksi hilang: {len(transaksi)} tercatat, {sukses} sukses"
+    assert stok_berkurang == qty_terjual == qty_tercatat, "update stok hilang"
+    assert all(b["stok"] >= 0 for b in stok_akhir), "stok negatif"
+    assert rekap["jumlah"] == sukses and rekap["qty"] == qty_fakta == qty_tercatat, "rekap tidak selaras"
+    print("OK: tidak ada update yang hilang")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# bench/bench_format.py
+# Bandingkan format transaksi lama (dict JSON, versi 1) dengan format ringkas
+# skema.py (versi 2): ukuran di disk, memori setelah dimuat dan waktu muat penuh.
+#
+#   python bench/bench_format.py --transaksi 50000 --barang 2000
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import buat_data
+
+
+def _ukur(fungsi):
+    # Waktu diukur tanpa tracemalloc, memori di muat kedua
+    mulai = time.perf_counter()
+    fungsi()
+    durasi = time.perf_counter() - mulai
+    tracemalloc.start()
+    hasil = fungsi()
+    memori = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return hasil, durasi, memori
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ukuran dan waktu muat format transaksi")
+    parser.add_argument("--transaksi", type=int, default=50000)
+    parser.add_argument("--barang", type=int, default=2000)
+    args = parser.parse_args()
+
+    direktori = tempfile.mkdtemp(prefix="bench_format_")
+    buat_data(direktori, barang=args.barang, transaksi=args.transaksi)
+    os.chdir(direktori)
+    import penyimpanan
+    from penyimpanan import TRANSAKSI_FILE, _beku, baca_data, hapus_cache
+
+    with open(TRANSAKSI_FILE) as f:
+        lama = json.load(f)
+    byte_indent = len(json.dumps(lama, indent=2))
+    byte_ringkas = len(json.dumps(lama, separators=(",", ":")))
+    del lama
+
+    # Muat pertama memecah transaksi.json ke partisi bulanan dalam format versi 2
+    baca_data(TRANSAKSI_FILE)
+    byte_v2 = sum(os.path.getsize(f) for f in glob.glob(os.path.join("transaksi", "*")))
+    byte_v2 += os.path.getsize(penyimpanan.PRODUK_FILE)
+
+    def muat_v1():
+        with open(TRANSAKSI_FILE + ".pra-partisi") as f:
+            return _beku(json.load(f))
+
+    def muat_v2():
+        hapus_cache()
+        return baca_data(TRANSAKSI_FILE)
+
+    data_v1, waktu_v1, memori_v1 = _ukur(muat_v1)
+    data_v2, waktu_v2, memori_v2 = _ukur(muat_v2)
+    assert len(data_v1) == len(data_v2)
+
+    def iterasi(data):
+        mulai = time.perf_counter()
+        sum(t["total"] + sum(item["qty"] for item in t["items"]) for t in data)
+        return time.perf_counter() - mulai
+
+    print(f"direktori data : {direktori}")
+    print(f"transaksi      : {len(data_v2)}")
+    print(f"disk v1        : {byte_indent / 1e6:.1f} MB (indent), {byte_ringkas / 1e6:.1f} MB (tanpa spasi)")
+    print(f"disk v2        : {byte_v2 / 1e6:.1f} MB ({byte_v2 / byte_ringkas:.0%} dari v1 tanpa spasi)")
+    print(f"memori         : v1 {memori_v1 / 1e6:.1f} MB, v2 {memori_v2 / 1e6:.1f} MB "
+          f"({memori_v2 / memori_v1:.0%})")
+    print(f"waktu muat     : v1 {waktu_v1:.2f} s, v2 {waktu_v2:.2f} s")
+    print(f"iterasi        : v1 {iterasi(data_v1) * 1000:.0f} ms, v2 {iterasi(data_v2) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench/bench_halaman.py
+# Benchmark halaman Kasir.py secara headless dengan AppTest: latensi (pertama
+# dibuka, median, p95) dan puncak memori per halaman pada data sintetis dari
+# bench/generator.py. Hasil bisa disimpan sebagai baseline lalu dibandingkan
+# dengan ambang regresi.
+#
+#   python bench/bench_halaman.py --profil kecil --simpan-baseline
+#   python bench/bench_halaman.py --profil kecil --periksa --ambang 0.25
+import argparse
+import atexit
+import json
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import buat_data  # noqa: E402
+
+APP = os.path.join(ROOT, "Kasir.py")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+PROFIL = {
+    "kecil": dict(barang=1000, transaksi=10000, kasir=5, hapus=200),
+    "sedang": dict(barang=10000, transaksi=200000, kasir=10, hapus=2000),
+    "besar": dict(barang=100000, transaksi=5000000, kasir=20, hapus=20000),
+}
+HALAMAN = ["Dashboard", "Transaksi", "Riwayat", "Laporan", "Statistik", "Profil Saya"]
+CHECKOUT = "Checkout"
+
+
+def _app(timeout):
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    # Peringatan deprecation Streamlit per rerun tidak perlu ikut tercetak
+    set_log_level("error")
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["login"] = {"username": "admin", "role": "admin"}
+    return at
+
+
+def _periksa(at):
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def _waktu(jalankan):
+    mulai = time.perf_counter()
+    jalankan()
+    return (time.perf_counter() - mulai) * 1000
+
+
+def _puncak_memori(jalankan):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        jalankan()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _ringkas(pertama, waktu, puncak):
+    waktu = sorted(waktu)
+    return {
+        "pertama_ms": round(pertama, 1),
+        "median_ms": round(statistics.median(waktu), 1),
+        "p95_ms": round(waktu[min(len(waktu) - 1, int(len(waktu) * 0.95))], 1),
+        "puncak_mb": round(puncak, 2),
+    }
+
+
+def ukur_halaman(halaman, ulang, timeout):
+    at = _app(timeout)
+    at.run()
+    _periksa(at)
+    pertama = _waktu(lambda: at.sidebar.radio[0].set_value(halaman).run())
+    _periksa(at)
+    waktu = []
+    for _ in range(ulang):
+        waktu.append(_waktu(at.run))
+        _periksa(at)
+    puncak = _puncak_memori(at.run)
+    return _ringkas(pertama, waktu, puncak)
+
+
+def ukur_checkout(ulang, timeout):
+    at = _app(timeout)
+    at.run()
+    at.sidebar.radio[0].set_value("Transaksi").run()
+
+    def checkout():
+        next(b for b in at.button if b.label == "➕ Tambah ke Keranjang").click().run()
+        next(r for r in at.radio if r.label == "Pilih Metode Pembayaran").set_value("QRIS/Transfer").run()
+        simpan = next(b for b in at.button if b.label == "💾 Simpan Transaksi")
+        durasi = _waktu(simpan.click().run)
+        _periksa(at)
+        if not any("berhasil" in s.value for s in at.success):
+            raise RuntimeError("Checkout tidak tersimpan")
+        return durasi
+
+    pertama = checkout()
+    waktu = [checkout() for _ in range(ulang)]
+    puncak = _puncak_memori(checkout)
+    return _ringkas(pertama, waktu, puncak)
+
+
+def jalankan(profil, storage, ulang, direktori_data, timeout):
+    os.environ["KASIR_STORAGE"] = storage
+    direktori = tempfile.mkdtemp(prefix="bench_halaman_")
+    # Didaftarkan sebelum modul aplikasi diimpor, jadi dihapus setelah rekap/indeks selesai ditulis saat keluar
+    atexit.register(shutil.rmtree, direktori, True)
+    if direktori_data:
+        shutil.copytree(direktori_data, direktori, dirs_exist_ok=True)
+    else:
+        mulai = time.perf_counter()
+        buat_data(direktori, **PROFIL[profil])
+        print(f"data {profil}: {PROFIL[profil]} dibuat dalam {time.perf_counter() - mulai:.1f} s")
+    os.chdir(direktori)
+    if storage == "sqlite":
+        from penyimpanan import migrasi_json_ke_sqlite
+        migrasi_json_ke_sqlite()
+
+    hasil = {}
+    # Run pertama ikut menanggung impor modul, migrasi partisi dan pembangunan rekap/indeks
+    at = _app(timeout)
+    hasil["awal_ms"] = round(_waktu(at.run), 1)
+    _periksa(at)
+    for halaman in HALAMAN:
+        hasil[halaman] = ukur_halaman(halaman, ulang, timeout)
+        print(f"{halaman:12s} {hasil[halaman]}")
+    hasil[CHECKOUT] = ukur_checkout(ulang, timeout)
+    print(f"{CHECKOUT:12s} {hasil[CHECKOUT]}")
+    hasil["rss_maks_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    print(f"awal {hasil['awal_ms']} ms, RSS maks {hasil['rss_maks_mb']} MB")
+    return hasil
+
+
+def bandingkan(hasil, baseline, ambang, toleransi):
+    # Regresi: median latensi atau puncak memori melebihi baseline x (1 + ambang) + toleransi
+    # absolut (ms / MB), agar derau pada halaman yang sangat cepat tidak dianggap regresi
+    regresi = []
+    for halaman in HALAMAN + [CHECKOUT]:
+        lama = baseline.get(halaman)
+        if lama is None:
+            continue
+        for metrik in ("median_ms", "puncak_mb"):
+            batas = lama[metrik] * (1 + ambang) + toleransi[metrik]
+            if hasil[halaman][metrik] > batas:
+                regresi.append(f"{halaman} {metrik}: {hasil[halaman][metrik]} > {batas:.1f} "
+                               f"(baseline {lama[metrik]})")
+    return regresi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark halaman Aplikasi Kasir dengan AppTest")
+    parser.add_argument("--profil", choices=list(PROFIL), default="kecil")
+    parser.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--ulang", type=int, default=10, help="Rerun per halaman setelah dibuka")
+    parser.add_argument("--data", help="Pakai salinan direktori data yang sudah ada, bukan data baru")
+    parser.add_argument("--timeout", type=float, default=600, help="Batas waktu satu run (detik)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--simpan-baseline", action="store_true")
+    parser.add_argument("--periksa", action="store_true", help="Gagal (exit 1) jika ada regresi")
+    parser.add_argument("--ambang", type=float, default=0.3, help="Toleransi relatif terhadap baseline")
+    parser.add_argument("--toleransi-ms", type=float, default=25, help="Toleransi absolut latensi")
+    parser.add_argument("--toleransi-mb", type=float, default=1, help="Toleransi absolut memori")
+    parser.add_argument("--keluaran", help="Simpan hasil mentah ke file JSON")
+    args = parser.parse_args()
+    # Benchmark berpindah ke direktori data sementara, path dari pengguna dibuat absolut dulu
+    for nama in ("baseline", "keluaran", "data"):
+        if getattr(args, nama):
+            setattr(args, nama, os.path.abspath(getattr(args, nama)))
+
+    hasil = jalankan(args.profil, args.storage, args.ulang, args.data, args.timeout)
+    kunci = f"{args.profil}-{args.storage}"
+    if args.keluaran:
+        with open(args.keluaran, "w") as f:
+            json.dump(hasil, f, indent=2)
+
+    semua = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            semua = json.load(f)
+    if args.simpan_baseline:
+        semua[kunci] = hasil
+        with open(args.baseline, "w") as f:
+            json.dump(semua, f, indent=2)
+        print(f"baseline {kunci} disimpan ke {args.baseline}")
+    if args.periksa:
+        if kunci not in semua:
+            parser.error(f"baseline {kunci} belum ada (jalankan dengan --simpan-baseline)")
+        regresi = bandingkan(hasil, semua[kunci], args.ambang,
+                             {"median_ms": args.toleransi_ms, "puncak_mb": args.toleransi_mb})
+        for r in regresi:
+            print(f"REGRESI {r}")
+        if regresi:
+            sys.exit(1)
+        print(f"OK: tidak ada regresi di atas {args.ambang:.0%} terhadap baseline {kunci}")
+
+
+if __name__ == "__main__":
+    main()
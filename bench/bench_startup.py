@@ -0,0 +1,75 @@
+# bench/bench_startup.py
+# Cold start per halaman: setiap pengukuran memakai proses Python baru (seperti
+# container yang baru dinyalakan), menjalankan Kasir.py sekali dengan AppTest
+# langsung di halaman tertentu, lalu mencatat durasi run pertama dan pustaka
+# berat yang ikut dimuat.
+#
+#   python bench/bench_startup.py --halaman Transaksi --ulang 5
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generator import buat_data  # noqa: E402
+
+PUSTAKA_BERAT = ["pandas", "numpy", "plotly.express", "fpdf", "qrcode", "PIL", "bcrypt", "xlsxwriter", "openpyxl"]
+
+ANAK = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+set_log_level("error")
+sebelum = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.session_state["login"] = {{"username": "admin", "role": {role!r}}}
+at.session_state["menu"] = {halaman!r}
+mulai = time.perf_counter()
+at.run()
+durasi = (time.perf_counter() - mulai) * 1000
+if at.exception:
+    raise SystemExit(at.exception[0].message)
+baru = set(sys.modules) - sebelum
+print(json.dumps({{"ms": durasi, "pustaka": sorted(p for p in {berat!r} if p in baru)}}))
+"""
+
+
+def ukur(direktori, halaman, role):
+    kode = ANAK.format(root=ROOT, app=os.path.join(ROOT, "Kasir.py"), role=role, halaman=halaman,
+                       berat=PUSTAKA_BERAT)
+    keluaran = subprocess.run([sys.executable, "-c", kode], cwd=direktori, capture_output=True, text=True,
+                              check=True)
+    return json.loads(keluaran.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ukur cold start Aplikasi Kasir per halaman")
+    parser.add_argument("--halaman", nargs="+", default=["Transaksi", "Dashboard", "Statistik"])
+    parser.add_argument("--role", default="kasir", choices=["kasir", "admin"])
+    parser.add_argument("--ulang", type=int, default=3, help="Proses baru per halaman")
+    parser.add_argument("--transaksi", type=int, default=2000)
+    args = parser.parse_args()
+
+    direktori = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        buat_data(direktori, barang=200, transaksi=args.transaksi, kasir=3, hapus=20)
+        # Run pertama membangun rekap/indeks; tidak dihitung sebagai cold start
+        ukur(direktori, "Dashboard", args.role)
+        for halaman in args.halaman:
+            hasil = [ukur(direktori, halaman, args.role) for _ in range(args.ulang)]
+            ms = [h["ms"] for h in hasil]
+            print(f"{halaman:12s} median {statistics.median(ms):7.1f} ms  min {min(ms):7.1f} ms  "
+                  f"pustaka: {', '.join(hasil[-1]['pustaka']) or '-'}")
+    finally:
+        shutil.rmtree(direktori, True)
+
+
+if __name__ == "__main__":
+    main()
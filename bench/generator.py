@@ -0,0 +1,150 @@
+# bench/generator.py
+# Pembuat data toko sintetis untuk benchmark: akun.json, barang.json,
+# transaksi.json dan barang_dihapus.json dengan ukuran yang bisa diatur.
+# Transaksi ditulis bertahap sehingga jutaan baris tidak perlu ditampung di memori.
+#
+#   python bench/generator.py --direktori /tmp/toko --barang 10000 --transaksi 1000000
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import bcrypt
+
+PASSWORD = "password"
+KATEGORI = ["Makanan", "Minuman", "Snack", "Rokok", "Sabun", "Bumbu", "ATK", "Obat", "Frozen", "Roti",
+            "Susu", "Beras", "Minyak", "Kopi", "Teh", "Mainan", "Elektronik", "Kosmetik", "Bayi", "Lainnya"]
+# Pembeli lebih ramai siang dan sore
+BOBOT_JAM = {7: 2, 8: 4, 9: 5, 10: 6, 11: 8, 12: 9, 13: 7, 14: 5, 15: 5, 16: 7, 17: 9, 18: 10,
+             19: 9, 20: 6, 21: 3}
+
+
+def _tulis_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def buat_akun(jumlah_kasir):
+    # Cost bcrypt rendah agar pembuatan data cepat; login memperbarui hash ke cost yang dikonfigurasi
+    hash_pw = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(4)).decode()
+    akun = [{"username": "admin", "password": hash_pw, "role": "admin", "nama_lengkap": "Admin Toko",
+             "no_telepon": "", "foto_profil": None}]
+    for i in range(1, jumlah_kasir + 1):
+        akun.append({"username": f"kasir{i}", "password": hash_pw, "role": "kasir",
+                     "nama_lengkap": f"Kasir {i}", "no_telepon": f"0812{i:08d}", "foto_profil": None})
+    return akun
+
+
+def buat_barang(acak, jumlah):
+    barang = []
+    for i in range(jumlah):
+        modal = acak.randrange(1000, 150000, 500)
+        barang.append({
+            "nama": f"Produk {i:06d}",
+            "kategori": KATEGORI[i % len(KATEGORI)],
+            "stok": acak.randint(20, 500),
+            "harga": int(modal * acak.uniform(1.1, 1.4)) // 500 * 500 + 500,
+            "harga_modal": modal,
+            "sku": f"899{i:010d}",
+        })
+    return barang
+
+
+def iter_transaksi(acak, barang, kasir, jumlah, hari):
+    # Popularitas barang mengikuti pola Zipf: sedikit barang laris, banyak yang jarang terjual
+    bobot = [1 / (i + 1) for i in range(len(barang))]
+    urutan = list(range(len(barang)))
+    acak.shuffle(urutan)
+    kumulatif = []
+    total = 0
+    for b in bobot:
+        total += b
+        kumulatif.append(total)
+    jam, bobot_jam = zip(*BOBOT_JAM.items())
+
+    awal = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=hari - 1)
+    per_hari = jumlah / hari
+    dibuat = 0
+    for h in range(hari):
+        target = round(per_hari * (h + 1)) - dibuat
+        detik = sorted(
+            acak.choices(jam, bobot_jam)[0] * 3600 + acak.randrange(3600) for _ in range(target)
+        )
+        for d in detik:
+            items = []
+            for i in set(acak.choices(urutan, cum_weights=kumulatif, k=acak.randint(1, 5))):
+                b = barang[i]
+                qty = acak.choice((1, 1, 1, 2, 2, 3, 5))
+                items.append({"nama": b["nama"], "kategori": b["kategori"], "qty": qty, "harga": b["harga"],
+                              "harga_modal": b["harga_modal"], "subtotal": b["harga"] * qty})
+            total_belanja = sum(item["subtotal"] for item in items)
+            metode = "Cash" if acak.random() < 0.7 else "QRIS/Transfer"
+            bayar = -(-total_belanja // 10000) * 10000 if metode == "Cash" else total_belanja
+            yield {
+                "waktu": (awal + timedelta(days=h, seconds=d)).strftime("%Y-%m-%d %H:%M:%S"),
+                "kasir": acak.choice(kasir),
+                "items": items,
+                "total": total_belanja,
+                "bayar": bayar,
+                "kembalian": bayar - total_belanja,
+                "metode": metode,
+            }
+        dibuat += target
+
+
+def buat_hapus(acak, barang, kasir, jumlah, hari):
+    awal = datetime.now().date() - timedelta(days=hari - 1)
+    hasil = []
+    for _ in range(jumlah):
+        b = acak.choice(barang)
+        hasil.append(dict(b, jumlah_dihapus=acak.randint(1, 5),
+                          keterangan=acak.choice(["Kadaluarsa", "Rusak", "Hilang", ""]),
+                          tanggal_dihapus=(awal + timedelta(days=acak.randrange(hari))).isoformat(),
+                          dihapus_oleh=acak.choice(kasir)))
+    hasil.sort(key=lambda r: r["tanggal_dihapus"])
+    return hasil
+
+
+def buat_data(direktori, barang=1000, transaksi=10000, kasir=5, hapus=200, hari=365, seed=1):
+    os.makedirs(direktori, exist_ok=True)
+    acak = random.Random(seed)
+    akun = buat_akun(kasir)
+    daftar_barang = buat_barang(acak, barang)
+    nama_kasir = [a["username"] for a in akun]
+    _tulis_json(os.path.join(direktori, "akun.json"), akun)
+    _tulis_json(os.path.join(direktori, "barang_dihapus.json"),
+                buat_hapus(acak, daftar_barang, nama_kasir, hapus, hari))
+
+    with open(os.path.join(direktori, "transaksi.json"), "w") as f:
+        f.write("[")
+        for i, t in enumerate(iter_transaksi(acak, daftar_barang, nama_kasir, transaksi, hari)):
+            f.write(",\n" if i else "\n")
+            f.write(json.dumps(t))
+        f.write("\n]")
+
+    # Stok akhir cukup besar agar checkout benchmark tidak kehabisan
+    for b in daftar_barang:
+        b["stok"] += 1000
+    _tulis_json(os.path.join(direktori, "barang.json"), daftar_barang)
+    return {"akun": len(akun), "barang": barang, "transaksi": transaksi, "hapus": hapus}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Buat data toko sintetis untuk benchmark")
+    parser.add_argument("--direktori", required=True)
+    parser.add_argument("--barang", type=int, default=1000)
+    parser.add_argument("--transaksi", type=int, default=10000)
+    parser.add_argument("--kasir", type=int, default=5)
+    parser.add_argument("--hapus", type=int, default=200)
+    parser.add_argument("--hari", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    jumlah = buat_data(args.direktori, args.barang, args.transaksi, args.kasir, args.hapus, args.hari, args.seed)
+    print(", ".join(f"{k}: {v}" for k, v in jumlah.items()), f"-> {args.direktori}")
+    print(f"Login: admin / {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# ekspor.py
+# Ekspor laporan ke Excel langsung ke buffer memori. Workbook memakai mode
+# constant_memory xlsxwriter: setiap baris ditulis berurutan lalu dibuang dari
+# memori, sehingga rentang bertahun-tahun tidak perlu dimuat sebagai DataFrame.
+import io
+
+import xlsxwriter
+
+from penyimpanan import TRANSAKSI_FILE, iter_rentang
+import ringkasan
+
+KOLOM_TRANSAKSI = ["Waktu", "Kasir", "Metode", "Jumlah Item", "Total", "Bayar", "Kembalian"]
+KOLOM_ITEM = ["Waktu", "Kasir", "Nama Barang", "Kategori", "Qty", "Harga", "Harga Modal", "Subtotal"]
+KOLOM_KASIR = ["Kasir", "Total Pendapatan", "Jumlah Transaksi"]
+
+
+def _header(ws, kolom, fmt):
+    ws.write_row(0, 0, kolom, fmt)
+    ws.freeze_panes(1, 0)
+    ws.set_column(0, len(kolom) - 1, 16)
+
+
+def laporan_excel(mulai, akhir):
+    buffer = io.BytesIO()
+    wb = xlsxwriter.Workbook(buffer, {"constant_memory": True})
+    fmt_header = wb.add_format({"bold": True, "bg_color": "#e2e8f0"})
+    fmt_uang = wb.add_format({"num_format": "#,##0"})
+
+    ws_transaksi = wb.add_worksheet("Transaksi")
+    ws_item = wb.add_worksheet("Item")
+    ws_kasir = wb.add_worksheet("Kasir")
+    for ws, kolom in ((ws_transaksi, KOLOM_TRANSAKSI), (ws_item, KOLOM_ITEM), (ws_kasir, KOLOM_KASIR)):
+        _header(ws, kolom, fmt_header)
+
+    baris_transaksi = baris_item = 1
+    for t in iter_rentang(TRANSAKSI_FILE, mulai, akhir):
+        ws_transaksi.write_row(baris_transaksi, 0, [t["waktu"], t["kasir"], t["metode"], len(t["items"])])
+        ws_transaksi.write_row(baris_transaksi, 4, [t["total"], t["bayar"], t["kembalian"]], fmt_uang)
+        baris_transaksi += 1
+        for item in t["items"]:
+            ws_item.write_row(baris_item, 0, [t["waktu"], t["kasir"], item["nama"], item["kategori"], item["qty"]])
+            ws_item.write_row(baris_item, 5, [item["harga"], item.get("harga_modal", 0), item["subtotal"]], fmt_uang)
+            baris_item += 1
+
+    for i, (kasir, m) in enumerate(sorted(ringkasan.per_kasir(mulai, akhir).items()), start=1):
+        ws_kasir.write(i, 0, kasir)
+        ws_kasir.write_row(i, 1, [m["pendapatan"]], fmt_uang)
+        ws_kasir.write(i, 2, m["jumlah"])
+
+    wb.close()
+    return buffer.getvalue()
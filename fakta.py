@@ -0,0 +1,233 @@
+# fakta.py
+# Tabel fakta item transaksi dalam bentuk kolom (array NumPy bertipe tetap):
+# satu baris per item terjual. Nama produk, kasir dan metode disimpan sebagai
+# nomor kamus, sehingga analisis seperti barang terlaris per rentang tanggal
+# cukup berupa operasi vektor, tanpa mengulang seluruh transaksi di Python.
+# Seperti ringkasan, penyelarasan antarproses dan penyimpanan ke disk diatur
+# turunan.DataTurunan.
+import argparse
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from penyimpanan import PUSAT, atur_cabang, geser_tanda, load_dokumen, path_cabang, save_dokumen
+from turunan import DataTurunan
+
+FAKTA_DIR = "fakta_item"
+META_FILE = os.path.join(FAKTA_DIR, "meta.json")
+VERSI = 2
+JEDA_SIMPAN = 2.0
+
+KOLOM = {
+    "waktu": np.int64,        # detik sejak 1970-01-01 (waktu lokal apa adanya)
+    "produk": np.int32,       # nomor kamus (nama, kategori)
+    "kasir": np.int32,        # nomor kamus kasir
+    "metode": np.int16,       # nomor kamus metode bayar
+    "qty": np.int64,
+    "harga": np.float64,
+    "harga_modal": np.float64,
+}
+DIMENSI = ("produk", "kasir", "metode")
+URUTAN = ("qty", "pendapatan", "margin")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _detik(waktu):
+    return (datetime.fromisoformat(waktu) - _EPOCH) // timedelta(seconds=1)
+
+
+def _path_kolom(nama):
+    return path_cabang(os.path.join(FAKTA_DIR, f"{nama}.bin"))
+
+
+class TabelItem:
+    def __init__(self, kamus=None):
+        self.n = 0
+        self.tersimpan = 0  # baris yang sudah ada di disk
+        self.jumlah_transaksi = 0
+        self.tanda = None  # lihat penyimpanan.iter_sesudah
+        # Penanda isi file kolom: jika meta di disk punya token lain, file ditulis proses lain
+        self.token = os.urandom(8).hex()
+        self._kolom = {nama: np.empty(1024, dtype=tipe) for nama, tipe in KOLOM.items()}
+        self.kamus = {d: [] for d in DIMENSI}
+        self._nomor = {d: {} for d in DIMENSI}
+        for d, isi in (kamus or {}).items():
+            for nilai in isi:
+                self._kode(d, tuple(nilai) if d == "produk" else nilai)
+
+    def _kode(self, dimensi, nilai):
+        nomor = self._nomor[dimensi]
+        kode = nomor.get(nilai)
+        if kode is None:
+            kode = nomor[nilai] = len(self.kamus[dimensi])
+            self.kamus[dimensi].append(nilai)
+        return kode
+
+    def cari_kode(self, dimensi, nilai):
+        return self._nomor[dimensi].get(nilai)
+
+    def _pastikan_kapasitas(self, n):
+        kapasitas = len(self._kolom["waktu"])
+        if n <= kapasitas:
+            return
+        while kapasitas < n:
+            kapasitas *= 2
+        for nama, arr in self._kolom.items():
+            baru = np.empty(kapasitas, dtype=arr.dtype)
+            baru[:self.n] = arr[:self.n]
+            self._kolom[nama] = baru
+
+    def isi_kolom(self, nama, nilai):
+        # Dipakai saat memuat dari disk
+        self._pastikan_kapasitas(len(nilai))
+        self._kolom[nama][:len(nilai)] = nilai
+
+    def tambah(self, t):
+        items = t["items"]
+        i, j = self.n, self.n + len(items)
+        self._pastikan_kapasitas(j)
+        k = self._kolom
+        k["waktu"][i:j] = _detik(t["waktu"])
+        k["kasir"][i:j] = self._kode("kasir", t["kasir"])
+        k["metode"][i:j] = self._kode("metode", t["metode"])
+        for p, item in enumerate(items, i):
+            k["produk"][p] = self._kode("produk", (item["nama"], item["kategori"]))
+            k["qty"][p] = item["qty"]
+            k["harga"][p] = item["harga"]
+            k["harga_modal"][p] = item.get("harga_modal", 0)
+        self.n = j
+        self.jumlah_transaksi += 1
+        self.tanda = geser_tanda(self.tanda, t["waktu"])
+
+    def kolom(self, nama):
+        # Tampilan sampai baris terakhir; baris baru ditulis setelahnya, jadi aman dibaca di luar kunci
+        return self._kolom[nama][:self.n]
+
+
+def _muat():
+    meta = load_dokumen(META_FILE)
+    if meta is None or meta.get("versi") != VERSI:
+        return None
+    tabel = TabelItem(meta["kamus"])
+    for nama, tipe in KOLOM.items():
+        path = _path_kolom(nama)
+        if not os.path.exists(path):
+            return None
+        nilai = np.fromfile(path, dtype=tipe, count=-1)
+        # Byte sisa dari tulis yang terputus di belakang meta diabaikan
+        if len(nilai) < meta["baris"]:
+            return None
+        tabel.isi_kolom(nama, nilai[:meta["baris"]])
+    tabel.n = meta["baris"]
+    tabel.jumlah_transaksi = meta["jumlah_transaksi"]
+    tabel.tanda = meta["tanda"]
+    tabel.token = meta["token"]
+    tabel.tersimpan = tabel.n
+    return tabel
+
+
+def _tulis(tabel):
+    # Kolom hanya ditambah baris barunya; meta ditulis terakhir sebagai penanda baris yang sah
+    os.makedirs(path_cabang(FAKTA_DIR), exist_ok=True)
+    meta = load_dokumen(META_FILE)
+    dari = tabel.tersimpan
+    if (meta is None or meta.get("versi") != VERSI or meta.get("token") != tabel.token
+            or meta.get("baris") != dari):
+        dari = 0  # file ditulis proses lain atau belum ada: tulis ulang penuh
+    for nama, tipe in KOLOM.items():
+        with open(_path_kolom(nama), "ab") as f:
+            f.truncate(dari * np.dtype(tipe).itemsize)
+            f.write(tabel.kolom(nama)[dari:].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+    save_dokumen(META_FILE, {
+        "versi": VERSI,
+        "jumlah_transaksi": tabel.jumlah_transaksi,
+        "tanda": tabel.tanda,
+        "token": tabel.token,
+        "baris": tabel.n,
+        "kamus": tabel.kamus,
+    })
+    tabel.tersimpan = tabel.n
+
+
+_fakta = DataTurunan(
+    muat=_muat,
+    kosong=TabelItem,
+    terapkan=TabelItem.tambah,
+    status=lambda tabel: (tabel.jumlah_transaksi, tabel.tanda),
+    tulis=_tulis,
+    jeda=JEDA_SIMPAN,
+)
+
+
+def catat_transaksi(t):
+    # Dipanggil di dalam kunci_data setelah transaksi di-append
+    _fakta.catat_transaksi(t)
+
+
+def bangun_ulang():
+    return _fakta.bangun_ulang()
+
+
+def teratas(mulai=None, akhir=None, n=10, urut="qty", kasir=None):
+    # Barang terlaris dalam rentang tanggal [mulai, akhir], diurutkan menurut qty/pendapatan/margin
+    if urut not in URUTAN:
+        raise ValueError(f"urut harus salah satu dari {URUTAN}")
+    tabel = _fakta.pastikan_termuat()
+    with _fakta.kunci:
+        kolom = {nama: tabel.kolom(nama) for nama in KOLOM}
+        produk = list(tabel.kamus["produk"])
+        kode_kasir = tabel.cari_kode("kasir", kasir)
+    if kasir is not None and kode_kasir is None:
+        return []
+
+    pilih = np.ones(len(kolom["waktu"]), dtype=bool)
+    if mulai is not None:
+        pilih &= kolom["waktu"] >= _detik(mulai.isoformat())
+    if akhir is not None:
+        pilih &= kolom["waktu"] < _detik((akhir + timedelta(days=1)).isoformat())
+    if kasir is not None:
+        pilih &= kolom["kasir"] == kode_kasir
+
+    kode = kolom["produk"][pilih]
+    qty = kolom["qty"][pilih]
+    pendapatan = qty * kolom["harga"][pilih]
+    modal = qty * kolom["harga_modal"][pilih]
+    jumlah = {
+        "qty": np.bincount(kode, weights=qty, minlength=len(produk)),
+        "pendapatan": np.bincount(kode, weights=pendapatan, minlength=len(produk)),
+    }
+    jumlah["margin"] = jumlah["pendapatan"] - np.bincount(kode, weights=modal, minlength=len(produk))
+
+    terjual = np.flatnonzero(np.bincount(kode, minlength=len(produk)))
+    nilai = jumlah[urut][terjual]
+    if len(terjual) > n:
+        bagian = np.argpartition(-nilai, n - 1)[:n]
+        terjual, nilai = terjual[bagian], nilai[bagian]
+    terjual = terjual[np.argsort(-nilai, kind="stable")]
+    return [
+        {
+            "nama": produk[i][0],
+            "kategori": produk[i][1],
+            "qty": int(jumlah["qty"][i]),
+            "pendapatan": float(jumlah["pendapatan"][i]),
+            "margin": float(jumlah["margin"][i]),
+        }
+        for i in terjual
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tabel fakta item transaksi Aplikasi Kasir")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="Bangun ulang tabel fakta dari seluruh transaksi")
+    p_rebuild.add_argument("--cabang", default=PUSAT)
+    args = parser.parse_args()
+
+    if args.perintah == "rebuild":
+        atur_cabang(args.cabang)
+        tabel = bangun_ulang()
+        print(f"{tabel.jumlah_transaksi} transaksi, {tabel.n} item, {len(tabel.kamus['produk'])} produk")
@@ -0,0 +1,113 @@
+# foto.py
+# Penyimpanan foto profil berbasis isi (content-addressed): file disimpan dengan
+# nama hash SHA-256-nya, akun.json hanya menyimpan hash tersebut. Thumbnail
+# berukuran tetap dibuat sekali saat unggah.
+import argparse
+import hashlib
+import io
+import os
+import re
+
+from PIL import Image, ImageOps
+
+from penyimpanan import AKUN_FILE, kunci_data, load_data, save_data
+
+FOTO_DIR = "foto_profil"
+LEBAR_MAKS = 300
+UKURAN_THUMBNAIL = (150, 150)
+
+_POLA_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _path(hash_foto, thumbnail=False):
+    akhiran = "_thumb" if thumbnail else ""
+    return os.path.join(FOTO_DIR, hash_foto[:2], f"{hash_foto}{akhiran}.png")
+
+
+def _tulis(path, isi):
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(isi)
+    os.replace(tmp, path)
+
+
+def _png(image):
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def adalah_hash(nilai):
+    return bool(nilai) and bool(_POLA_HASH.match(nilai))
+
+
+def simpan_foto(image):
+    # Resize ke lebar maks 300px, simpan asli + thumbnail, kembalikan hash
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+    width, height = image.size
+    if width > LEBAR_MAKS:
+        ratio = LEBAR_MAKS / width
+        image = image.resize((LEBAR_MAKS, int(height * ratio)))
+    isi = _png(image)
+    hash_foto = hashlib.sha256(isi).hexdigest()
+    _tulis(_path(hash_foto), isi)
+    _tulis(_path(hash_foto, thumbnail=True), _png(ImageOps.fit(image, UKURAN_THUMBNAIL)))
+    return hash_foto
+
+
+def baca_foto(hash_foto, thumbnail=True):
+    path = _path(hash_foto, thumbnail)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def dari_base64(teks):
+    # Format lama: PNG base64 langsung di akun.json
+    import base64
+    return simpan_foto(Image.open(io.BytesIO(base64.b64decode(teks))))
+
+
+def migrasi():
+    with kunci_data():
+        akun = load_data(AKUN_FILE)
+        jumlah = 0
+        for a in akun:
+            if a.get("foto_profil") and not adalah_hash(a["foto_profil"]):
+                a["foto_profil"] = dari_base64(a["foto_profil"])
+                jumlah += 1
+        if jumlah:
+            save_data(AKUN_FILE, akun)
+    return jumlah
+
+
+def bersihkan():
+    # Hapus file foto yang tidak lagi dirujuk akun mana pun
+    dipakai = {a.get("foto_profil") for a in load_data(AKUN_FILE)}
+    terhapus = 0
+    if not os.path.isdir(FOTO_DIR):
+        return terhapus
+    for akar, _, files in os.walk(FOTO_DIR):
+        for nama in files:
+            if nama.split("_")[0].split(".")[0] not in dipakai:
+                os.remove(os.path.join(akar, nama))
+                terhapus += 1
+    return terhapus
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Foto profil Aplikasi Kasir")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    sub.add_parser("migrasi", help="Pindahkan foto base64 dari akun.json ke folder foto")
+    sub.add_parser("bersihkan", help="Hapus foto yang tidak dirujuk akun")
+    args = parser.parse_args()
+
+    if args.perintah == "migrasi":
+        print(f"{migrasi()} foto dipindahkan ke {FOTO_DIR}/")
+    elif args.perintah == "bersihkan":
+        print(f"{bersihkan()} file dihapus")
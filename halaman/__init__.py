@@ -0,0 +1,78 @@
+# halaman/__init__.py
+# Daftar halaman aplikasi. Modul halaman baru diimpor saat halaman itu pertama
+# kali dibuka, jadi pustaka berat (plotly, fpdf, qrcode, numpy, ...) hanya dimuat
+# oleh proses yang memang membuka halaman yang membutuhkannya.
+import importlib
+import os
+import sys
+import threading
+
+import streamlit as st
+
+import metrik
+from penyimpanan import PUSAT, atur_cabang, daftar_cabang
+
+# Pilihan cabang khusus admin: laporan gabungan semua cabang
+SEMUA = "Semua Cabang"
+
+# nama menu -> (modul di paket halaman, fungsi, ikon, khusus admin, fungsi saat "Semua Cabang").
+# Halaman tanpa fungsi gabungan hanya tampil saat satu cabang dipilih.
+HALAMAN = {
+    "Dashboard": ("dashboard", "halaman_dashboard", "📊", False, "dashboard_gabungan"),
+    "Barang": ("barang", "halaman_barang", "📦", False, None),
+    "Transaksi": ("transaksi", "halaman_transaksi", "💳", False, None),
+    "Riwayat": ("riwayat", "halaman_riwayat", "🕒", False, None),
+    "Laporan": ("laporan", "halaman_laporan", "📄", False, "laporan_gabungan"),
+    "Statistik": ("statistik", "halaman_statistik", "📈", False, "statistik_gabungan"),
+    "Profil Saya": ("profil", "halaman_profil", "👤", False, None),
+    "Manajemen Akun": ("akun", "halaman_akun", "👥", True, "halaman_akun"),
+    "Performa": ("performa", "halaman_performa", "⏱️", True, "halaman_performa"),
+}
+
+_kunci = threading.Lock()
+_render_pertama = True
+
+
+@st.cache_resource
+def daftar_menu(role, gabungan=False):
+    # {nama: label dengan ikon} untuk radio sidebar, sama untuk semua sesi dengan role yang sama
+    return {nama: f"{ikon} {nama}" for nama, (_, _, ikon, admin, fungsi_gabungan) in HALAMAN.items()
+            if (role == "admin" or not admin) and (not gabungan or fungsi_gabungan)}
+
+
+def pasang_cabang():
+    # Cabang aktif ada di contextvar thread skrip, jadi dipasang di awal setiap run dan
+    # fragmen. Mengembalikan pilihan sesi (bisa SEMUA); data dibaca dari PUSAT saat SEMUA.
+    cabang = st.session_state.login.get("cabang", PUSAT)
+    if cabang != SEMUA and cabang not in daftar_cabang():
+        cabang = st.session_state.login["cabang"] = PUSAT
+    atur_cabang(PUSAT if cabang == SEMUA else cabang)
+    return cabang
+
+
+@st.cache_resource
+def css_sidebar():
+    with open(os.path.join(os.path.dirname(__file__), "sidebar.css")) as f:
+        return f"<style>\n{f.read()}</style>"
+
+
+def tampilkan(nama, gabungan=False):
+    modul, fungsi, _, _, fungsi_gabungan = HALAMAN[nama]
+    if gabungan:
+        fungsi = fungsi_gabungan
+    nama_modul = f"{__name__}.{modul}"
+    m = sys.modules.get(nama_modul)
+    if m is None:
+        # Biaya impor pertama dicatat terpisah dari render halaman
+        with metrik.span("impor_halaman", halaman=nama):
+            m = importlib.import_module(nama_modul)
+    with metrik.span("halaman", halaman=nama):
+        getattr(m, fungsi)()
+
+
+def render_pertama():
+    # True hanya untuk run skrip pertama sejak proses dimulai (cold start)
+    global _render_pertama
+    with _kunci:
+        pertama, _render_pertama = _render_pertama, False
+    return pertama
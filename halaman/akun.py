@@ -0,0 +1,95 @@
+# halaman/akun.py
+# Halaman Manajemen Akun (admin): akun, cabang dan penempatan kasir. Akun berlaku
+# untuk semua cabang; kasir dengan field cabang hanya bisa masuk ke cabang itu.
+import pandas as pd
+import streamlit as st
+
+import autentikasi
+from halaman.profil import halaman_profil
+from penyimpanan import AKUN_FILE, baca_data, buat_cabang, cari_akun, daftar_cabang, simpan_akun
+
+SEMUA_CABANG = "(semua cabang)"
+
+
+def halaman_akun():
+    st.subheader("👥 Manajemen Pengguna")
+    
+    akun = baca_data(AKUN_FILE)
+    current_user = st.session_state.login["username"]
+    
+    # Hanya admin yang bisa menambah akun baru
+    if st.session_state.login["role"] == "admin":
+        with st.expander("🏬 Cabang", expanded=False):
+            st.write(", ".join(daftar_cabang()))
+            with st.form("form_cabang_baru", clear_on_submit=True):
+                nama_cabang = st.text_input("Nama Cabang Baru")
+                if st.form_submit_button("Buat Cabang"):
+                    try:
+                        buat_cabang(nama_cabang.strip())
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        st.success(f"Cabang {nama_cabang.strip()} berhasil dibuat!")
+                        st.rerun()
+
+        with st.expander("➕ Tambah Akun Baru", expanded=False):
+            with st.form("form_akun_baru"):
+                username = st.text_input("Username")
+                password = st.text_input("Password", type="password")
+                role = st.selectbox("Role", ["admin", "kasir"])
+                cabang = st.selectbox("Cabang", [SEMUA_CABANG] + daftar_cabang())
+                
+                if st.form_submit_button("Buat Akun"):
+                    if cari_akun(username):
+                        st.error("Username sudah digunakan!")
+                    else:
+                        akun_baru = {
+                            "username": username,
+                            "password": autentikasi.hash_password(password),
+                            "role": role,
+                            "nama_lengkap": "",
+                            "no_telepon": "",
+                            "foto_profil": None
+                        }
+                        if cabang != SEMUA_CABANG:
+                            akun_baru["cabang"] = cabang
+                        simpan_akun(akun_baru)
+                        st.success("Akun berhasil dibuat!")
+                        st.rerun()
+    
+    st.write("### Daftar Pengguna")
+    if not akun:
+        st.info("Belum ada akun terdaftar")
+        return
+    
+    # Tampilkan daftar pengguna tanpa password dan hash foto
+    df = pd.DataFrame(akun).drop(columns=["password", "foto_profil"], errors="ignore")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    
+    # Pilih pengguna untuk dilihat/diedit
+    st.write("### Edit Profil Pengguna")
+    user_list = [a["username"] for a in akun]
+    selected_user = st.selectbox("Pilih Pengguna", user_list)
+    
+    if selected_user:
+        if st.session_state.login["role"] == "admin":
+            atur_cabang_akun(selected_user)
+        halaman_profil(username=selected_user)
+
+
+def atur_cabang_akun(username):
+    # Penempatan cabang: kasir dengan cabang dipaksa masuk ke cabang itu saat login
+    data = cari_akun(username)
+    pilihan = [SEMUA_CABANG] + daftar_cabang()
+    sekarang = data.get("cabang", SEMUA_CABANG)
+    if sekarang not in pilihan:
+        pilihan.append(sekarang)
+    col1, col2 = st.columns([3, 1])
+    cabang = col1.selectbox("Cabang", pilihan, index=pilihan.index(sekarang), key=f"cabang_{username}")
+    if col2.button("Simpan Cabang", key=f"simpan_cabang_{username}") and cabang != sekarang:
+        if cabang == SEMUA_CABANG:
+            data.pop("cabang", None)
+        else:
+            data["cabang"] = cabang
+        simpan_akun(data)
+        st.success("Cabang pengguna diperbarui! Berlaku saat login berikutnya.")
@@ -0,0 +1,194 @@
+# halaman/barang.py
+# Halaman Barang: stok menipis, tambah, restok, impor massal, SKU, penghapusan stok
+# dan kartu stok.
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from halaman.dashboard import stok_menipis
+import impor
+from katalog import katalog
+from operasi import StokBerubahError, atur_sku, hapus_barang, impor_barang, tambah_barang, tambah_stok
+import stok as buku_stok
+
+
+def halaman_barang():
+    st.subheader("📦 Manajemen Barang")
+    kat = katalog()
+
+    with st.expander("⚠️ Stok Menipis", expanded=True):
+        stok_menipis(100)
+
+    with st.expander("➕ Tambah Barang"):
+        nama = st.text_input("Nama Barang")
+        kategori = st.text_input("Kategori")
+        stok = st.number_input("Stok", 0)
+        harga = st.number_input("Harga Satuan", 0)
+        harga_modal = st.number_input("Harga Modal", 0)
+        sku = st.text_input("SKU / Barcode (opsional)").strip()
+        if st.button("Simpan"):
+            barang_baru = {
+                "nama": nama,
+                "kategori": kategori,
+                "stok": stok,
+                "harga": harga,
+                "harga_modal": harga_modal
+            }
+            if sku:
+                barang_baru["sku"] = sku
+            if not tambah_barang(barang_baru, st.session_state.login["username"]):
+                st.warning("Barang dengan nama & kategori sama atau SKU yang sama sudah ada.")
+            else:
+                st.success("Barang ditambahkan.")
+                kat = katalog()
+
+    with st.expander("📥 Impor Massal (CSV / Excel)"):
+        impor_massal()
+
+    barang = kat.barang
+    df = pd.DataFrame(barang)
+    st.dataframe(df)
+
+    st.write("### 📥 Tambah Stok")
+    if barang:
+        index_restok = st.selectbox("Pilih Barang", range(len(barang)), key="pilih_barang_restok",
+                                    format_func=lambda i: f"{barang[i]['nama']} ({barang[i]['kategori']})")
+        col1, col2 = st.columns([1, 2])
+        jumlah_restok = col1.number_input("Jumlah Masuk", min_value=1, step=1, key="jumlah_restok")
+        keterangan_restok = col2.text_input("Keterangan (mis. no. faktur pemasok)", key="keterangan_restok")
+        if st.button("Tambah Stok"):
+            if tambah_stok(barang[index_restok]["nama"], barang[index_restok]["kategori"], jumlah_restok,
+                           st.session_state.login["username"], keterangan_restok or None):
+                st.success("Stok ditambahkan.")
+            else:
+                st.warning("Barang sudah tidak ada. Silakan muat ulang halaman.")
+
+    st.write("### 🏷️ Atur SKU / Barcode")
+    if barang:
+        index_sku = st.selectbox("Pilih Barang", range(len(barang)), key="pilih_barang_sku",
+                                 format_func=lambda i: f"{barang[i]['nama']} ({barang[i]['kategori']})")
+        sku_baru = st.text_input("SKU / Barcode", value=barang[index_sku].get("sku") or "",
+                                 key=f"sku_{index_sku}").strip()
+        if st.button("Simpan SKU"):
+            if atur_sku(barang[index_sku]["nama"], barang[index_sku]["kategori"], sku_baru):
+                st.success("SKU diperbarui.")
+            else:
+                st.warning("SKU sudah dipakai barang lain.")
+
+    st.write("### 🗑️ Hapus Barang")
+    if barang:
+        index = st.selectbox("Pilih Barang", range(len(barang)), format_func=lambda i: f"{barang[i]['nama']} ({barang[i]['kategori']})")
+        jumlah_hapus = st.number_input("Jumlah yang Dihapus", min_value=1, max_value=barang[index]['stok'], step=1)
+        keterangan = st.text_input("Alasan Penghapusan")
+        tanggal = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        st.code(tanggal, language="text")
+        if st.button("Hapus Barang"):
+            try:
+                hapus_barang(barang[index]["nama"], barang[index]["kategori"], jumlah_hapus,
+                             keterangan, st.session_state.login["username"], tanggal)
+                st.success("Barang berhasil dihapus.")
+            except StokBerubahError as e:
+                st.error(f"{e}. Silakan muat ulang halaman dan ulangi penghapusan.")
+
+    with st.expander("📒 Kartu Stok"):
+        kartu_stok()
+
+def kartu_stok():
+    awal = buku_stok.awal_buku()
+    if awal is None:
+        st.info("Buku stok dimulai saat ada perubahan stok pertama.")
+        return
+    st.caption(f"Buku stok dimulai {awal:%Y-%m-%d %H:%M:%S}.")
+    hari_ini = date.today()
+
+    col1, col2 = st.columns(2)
+    mulai = col1.date_input("Dari", max(awal.date(), hari_ini - timedelta(days=30)), min_value=awal.date(),
+                            key="kartu_mulai")
+    akhir = col2.date_input("Sampai", hari_ini, min_value=awal.date(), key="kartu_akhir")
+    gerak = buku_stok.pergerakan(mulai, akhir)
+    if gerak:
+        st.write("Pergerakan stok per barang")
+        st.dataframe(pd.DataFrame(
+            [(p["nama"], p["kategori"], p["awal"], p["masuk"], p["keluar"], p["akhir"]) for p in gerak],
+            columns=["Barang", "Kategori", "Stok Awal", "Masuk", "Keluar", "Stok Akhir"]
+        ), hide_index=True)
+
+        pilihan = sorted({(p["nama"], p["kategori"]) for p in gerak})
+        nama, kategori = st.selectbox("Riwayat mutasi", pilihan, key="kartu_barang",
+                                      format_func=lambda k: f"{k[0]} ({k[1]})")
+        daftar = buku_stok.mutasi(mulai, akhir, nama, kategori)
+        if daftar:
+            st.dataframe(pd.DataFrame(
+                [(m["waktu"][:19], buku_stok.JENIS.get(m["jenis"], m["jenis"]), m["selisih"], m["oleh"],
+                  m["keterangan"]) for m in daftar],
+                columns=["Waktu", "Jenis", "Selisih", "Oleh", "Keterangan"]
+            ), hide_index=True)
+        else:
+            st.caption("Tidak ada mutasi barang ini di rentang tanggal.")
+
+    if st.session_state.login["role"] == "admin" and st.button("🔍 Cek Kesesuaian Stok"):
+        selisih = buku_stok.rekonsiliasi()
+        if selisih:
+            st.error(f"{len(selisih)} barang tidak cocok dengan buku stok.")
+            st.dataframe(pd.DataFrame(selisih).rename(columns={
+                "nama": "Barang", "kategori": "Kategori", "buku": "Buku Stok", "stok": "Stok Barang",
+                "selisih": "Selisih"
+            }), hide_index=True)
+        else:
+            st.success("Stok barang cocok dengan buku stok.")
+
+def impor_massal():
+    st.caption("Kolom: nama, kategori, stok (nilai baru) atau tambah_stok (selisih), harga, harga_modal, sku. "
+               "Barang baru ditambahkan; barang yang sudah ada hanya diubah pada kolom yang diisi.")
+    st.download_button("📄 Contoh CSV", impor.CONTOH_CSV, "contoh_impor_barang.csv", "text/csv",
+                       on_click="ignore")
+    if "impor_pesan" in st.session_state:
+        st.success(st.session_state.pop("impor_pesan"))
+
+    # Kunci uploader diganti setelah impor diterapkan agar file lama hilang dari form
+    berkas = st.file_uploader("File CSV / XLSX", type=["csv", "xlsx"],
+                              key=f"impor_berkas_{st.session_state.get('impor_ke', 0)}")
+    if berkas is None:
+        return
+    # File diparse sekali per unggahan, rencana dihitung ulang tiap rerun terhadap katalog terbaru
+    if st.session_state.get("impor_file_id") != berkas.file_id:
+        try:
+            st.session_state.impor_baris = impor.baca_impor(berkas, berkas.name)
+        except ValueError as e:
+            st.session_state.impor_baris = None
+            st.error(str(e))
+        st.session_state.impor_file_id = berkas.file_id
+    if st.session_state.impor_baris is None:
+        return
+    baris, error_baca = st.session_state.impor_baris
+    rencana = impor.rencanakan(baris, katalog())
+    error = sorted(error_baca + rencana.error)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Barang baru", rencana.jumlah("baru"))
+    col2.metric("Diubah", rencana.jumlah("ubah"))
+    col3.metric("Tidak berubah", rencana.tetap)
+    col4.metric("Baris error", len(error))
+
+    if rencana.perubahan:
+        st.write("Pratinjau perubahan (500 baris pertama)")
+        st.dataframe(pd.DataFrame(
+            [(p["baris"], p["aksi"], p["nama"], p["kategori"], impor.uraian(p)) for p in rencana.perubahan[:500]],
+            columns=["baris", "aksi", "nama", "kategori", "perubahan"]
+        ), hide_index=True)
+    if error:
+        st.write("Baris error")
+        st.dataframe(pd.DataFrame(error, columns=["baris", "pesan"]), hide_index=True)
+
+    lewati = st.checkbox("Lewati baris yang error", key="impor_lewati") if error else False
+    if st.button("✅ Terapkan Impor", disabled=not rencana.perubahan or (bool(error) and not lewati)):
+        hasil = impor_barang(baris, lewati_error=lewati, oleh=st.session_state.login["username"])
+        if hasil.diterapkan:
+            st.session_state.impor_pesan = (f"Impor selesai: {hasil.jumlah('baru')} barang baru, "
+                                            f"{hasil.jumlah('ubah')} diubah.")
+            st.session_state.impor_ke = st.session_state.get("impor_ke", 0) + 1
+            for kunci in ("impor_baris", "impor_file_id"):
+                st.session_state.pop(kunci, None)
+            st.rerun()
+        st.error("Katalog berubah sejak pratinjau dan ada baris yang kini error. Periksa pratinjau lagi.")
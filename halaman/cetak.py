@@ -0,0 +1,37 @@
+# halaman/cetak.py
+# Tampilan struk dan unduhan PDF struk yang dibuat di latar belakang (dipakai
+# halaman Transaksi dan Riwayat).
+import streamlit as st
+
+import struk
+
+
+def tampilkan_struk(transaksi_baru):
+    st.markdown("---")
+    st.subheader("🧾 Struk Transaksi")
+    st.write(f"**Waktu**: {transaksi_baru['waktu']}")
+    st.write(f"**Kasir**: {transaksi_baru['kasir']}")
+    st.write(f"**Metode**: {transaksi_baru['metode']}")
+    for item in transaksi_baru['items']:
+        st.write(f"- {item['nama']} ({item['qty']}x): Rp {item['subtotal']:,.0f}")
+    st.write(f"**Total**: Rp {transaksi_baru['total']:,.0f}")
+    st.write(f"**Dibayar**: Rp {transaksi_baru['bayar']:,.0f}")
+    st.write(f"**Kembalian**: Rp {transaksi_baru['kembalian']:,.0f}")
+
+@st.fragment(run_every=1)
+def tunggu_struk(id_tugas):
+    # Hanya bagian ini yang di-refresh tiap detik sampai PDF selesai, lalu seluruh halaman
+    if struk.hasil(id_tugas)[0] == "proses":
+        st.info("⏳ Menyiapkan struk PDF...")
+    else:
+        st.rerun()
+
+def tampilkan_struk_pdf(id_tugas, nama_file, kunci):
+    status, isi = struk.hasil(id_tugas)
+    if status == "proses":
+        tunggu_struk(id_tugas)
+    elif status == "selesai":
+        st.download_button("🖨️ Unduh Struk PDF", isi, nama_file, "application/pdf",
+                           key=f"{kunci}_unduh", on_click="ignore")
+    elif status == "gagal":
+        st.error(f"Gagal membuat struk PDF: {isi}")
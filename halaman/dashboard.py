@@ -0,0 +1,50 @@
+# halaman/dashboard.py
+# Halaman Dashboard: ringkasan total dari rekap (per cabang atau semua cabang) dan
+# barang yang stoknya menipis.
+import streamlit as st
+
+import konsolidasi
+import ringkasan
+import stok
+
+
+def halaman_dashboard():
+    st.subheader("📊 Dashboard")
+    total = ringkasan.total()
+    total_transaksi = total["jumlah"]
+    total_pendapatan = total["pendapatan"]
+    col1, col2 = st.columns(2)
+    col1.metric("Jumlah Transaksi", total_transaksi)
+    col2.metric("Total Pendapatan", f"Rp {total_pendapatan:,.0f}")
+
+    st.write("### ⚠️ Stok Menipis")
+    stok_menipis(10)
+
+
+def stok_menipis(n):
+    # Tabel n barang yang paling cepat habis menurut kecepatan jual
+    daftar = stok.menipis()
+    if not daftar:
+        st.success(f"Tidak ada barang yang habis dalam {stok.HARI_MENIPIS:g} hari ke depan.")
+        return
+    st.caption(f"{len(daftar)} barang habis atau cukup untuk ≤ {stok.HARI_MENIPIS:g} hari; "
+               f"saran pesan untuk {stok.HARI_TARGET:g} hari.")
+    st.dataframe(
+        [{"Barang": r["nama"], "Kategori": r["kategori"], "Stok": r["stok"],
+          "Terjual/Hari": round(r["per_hari"], 1), "Cukup (Hari)": round(r["hari"], 1),
+          "Saran Pesan": r["saran"]} for r in daftar[:n]],
+        hide_index=True
+    )
+
+
+def dashboard_gabungan():
+    st.subheader("📊 Dashboard Semua Cabang")
+    total = konsolidasi.total()
+    col1, col2 = st.columns(2)
+    col1.metric("Jumlah Transaksi", sum(m["jumlah"] for m in total.values()))
+    col2.metric("Total Pendapatan", f"Rp {sum(m['pendapatan'] for m in total.values()):,.0f}")
+    st.dataframe(
+        [{"Cabang": c, "Jumlah Transaksi": m["jumlah"], "Total Pendapatan": m["pendapatan"]}
+         for c, m in total.items()],
+        hide_index=True
+    )
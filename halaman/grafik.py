@@ -0,0 +1,104 @@
+# halaman/grafik.py
+# Grafik pendapatan dari rekap: jumlah titik dibatasi dengan memilih granularitas
+# (hari/minggu/bulan) sesuai panjang rentang, seri yang rapat memakai trace WebGL,
+# dan figur di-cache per (cabang, halaman, rentang, kasir, versi data) sehingga
+# rerun tanpa transaksi baru tidak membangun ulang figur.
+from datetime import date, timedelta
+
+import plotly.graph_objects as go
+import streamlit as st
+
+import konsolidasi
+from penyimpanan import cabang_aktif
+import ringkasan
+
+GRANULARITAS = {"hari": "Harian", "minggu": "Mingguan", "bulan": "Bulanan"}
+MAKS_TITIK = 370     # di atas ini granularitas dinaikkan satu tingkat
+BATAS_WEBGL = 200    # titik per seri sebelum Scatter diganti Scattergl
+PANJANG = {"hari": 1, "minggu": 7, "bulan": 30}
+
+
+def pilih_granularitas(mulai, akhir):
+    hari = (akhir - mulai).days + 1
+    for granularitas, panjang in PANJANG.items():
+        if hari / panjang <= MAKS_TITIK:
+            return granularitas
+    return "bulan"
+
+
+def _awal_periode(tanggal, granularitas):
+    if granularitas == "minggu":
+        return tanggal - timedelta(days=tanggal.weekday())
+    if granularitas == "bulan":
+        return tanggal.replace(day=1)
+    return tanggal
+
+
+def _per_periode(harian, granularitas):
+    # {"YYYY-MM-DD": metrik} hasil konsolidasi -> {awal periode: metrik}, sama seperti ringkasan.per_periode
+    hasil = {}
+    for hari, m in harian.items():
+        p = hasil.setdefault(_awal_periode(date.fromisoformat(hari), granularitas), {"pendapatan": 0, "jumlah": 0})
+        p["pendapatan"] += m["pendapatan"]
+        p["jumlah"] += m["jumlah"]
+    return dict(sorted(hasil.items()))
+
+
+def _bangun_figur(data, granularitas):
+    if not data:
+        return None
+    x = list(data)
+    jejak = go.Scattergl if len(x) > BATAS_WEBGL else go.Scatter
+    fig = go.Figure(jejak(
+        x=x, y=[m["pendapatan"] for m in data.values()], mode="lines",
+        customdata=[m["jumlah"] for m in data.values()],
+        hovertemplate="%{x}<br>Rp %{y:,.0f}<br>%{customdata} transaksi<extra></extra>",
+    ))
+    fig.update_layout(title=f"Pendapatan {GRANULARITAS[granularitas]}",
+                      xaxis_title="Tanggal", yaxis_title="Pendapatan (Rp)")
+    return fig
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _figur_pendapatan(cabang, halaman, mulai, akhir, kasir, granularitas, versi):
+    # cabang, halaman dan versi hanya bagian kunci cache; figur tidak diubah oleh st.plotly_chart
+    return _bangun_figur(ringkasan.per_periode(mulai, akhir, granularitas, kasir), granularitas)
+
+
+def pendapatan(halaman, mulai, akhir, kasir=None, granularitas=None):
+    # granularitas None = dipilih otomatis dari panjang rentang
+    granularitas = granularitas or pilih_granularitas(mulai, akhir)
+    fig = _figur_pendapatan(cabang_aktif(), halaman, mulai, akhir, kasir, granularitas, ringkasan.versi())
+    return fig, granularitas
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _figur_gabungan(mulai, akhir, granularitas, versi):
+    return _bangun_figur(_per_periode(konsolidasi.gabungan(mulai, akhir)["harian"], granularitas), granularitas)
+
+
+def pendapatan_gabungan(mulai, akhir, granularitas=None):
+    # Pendapatan semua cabang; versi = jumlah transaksi per cabang
+    granularitas = granularitas or pilih_granularitas(mulai, akhir)
+    return _figur_gabungan(mulai, akhir, granularitas, konsolidasi.versi()), granularitas
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _figur_bulanan_kasir(cabang, kasir, versi):
+    bulanan = sorted(ringkasan.per_bulan_kasir(kasir).items())
+    if not bulanan:
+        return None
+    jumlah = [m["jumlah"] for _, m in bulanan]
+    fig = go.Figure(go.Bar(
+        x=[b for b, _ in bulanan], y=[m["pendapatan"] for _, m in bulanan],
+        texttemplate="%{y:.2s}", customdata=jumlah,
+        hovertemplate="%{x}<br>Rp %{y:,.0f}<br>%{customdata} transaksi<extra></extra>",
+        marker=dict(color=jumlah, colorscale="blues", colorbar=dict(title="Jumlah Transaksi")),
+    ))
+    fig.update_layout(title="Pendapatan Bulanan", xaxis_title="Bulan", yaxis_title="Total Pendapatan (Rp)",
+                      xaxis_type="category")
+    return fig
+
+
+def bulanan_kasir(kasir):
+    return _figur_bulanan_kasir(cabang_aktif(), kasir, ringkasan.versi())
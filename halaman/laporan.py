@@ -0,0 +1,93 @@
+# halaman/laporan.py
+# Halaman Laporan: ringkasan pendapatan dan ekspor Excel, serta laporan gabungan
+# semua cabang untuk admin.
+import contextvars
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+from ekspor import laporan_excel
+import konsolidasi
+import ringkasan
+
+
+def halaman_laporan():
+    st.subheader("📈 Laporan Keuangan")
+    min_date, max_date = ringkasan.rentang()
+    
+    if min_date is None:
+        st.info("Belum ada data transaksi.")
+        return
+
+    # Filter Tanggal
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Tanggal Mulai", min_date)
+    with col2:
+        end_date = st.date_input("Tanggal Akhir", max_date)
+
+    # Ringkasan Pendapatan dari rekap harian
+    st.write("### 📊 Ringkasan Pendapatan")
+    harian = ringkasan.per_hari(start_date, end_date)
+    total_pendapatan = sum(m["pendapatan"] for m in harian.values())
+    rata_perhari = total_pendapatan / len(harian) if harian else 0
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Pendapatan", f"Rp {total_pendapatan:,.0f}")
+    col2.metric("Rata-rata per Hari", f"Rp {rata_perhari:,.0f}")
+    col3.metric("Jumlah Transaksi", sum(m["jumlah"] for m in harian.values()))
+
+    # Pendapatan per Kasir
+    st.write("### 🧑‍💼 Pendapatan per Kasir")
+    kasir_df = pd.DataFrame(
+        [(k, m["pendapatan"], m["jumlah"]) for k, m in sorted(ringkasan.per_kasir(start_date, end_date).items())],
+        columns=['Kasir', 'Total Pendapatan', 'Jumlah Transaksi']
+    )
+    st.dataframe(kasir_df, hide_index=True)
+
+    # Export Laporan: dibuat saat tombol diklik, langsung ke memori lalu diunduh. File dibuat
+    # di luar run skrip, jadi context (cabang aktif) ikut dibawa
+    st.download_button(
+        "💾 Ekspor ke Excel",
+        data=partial(contextvars.copy_context().run, laporan_excel, start_date, end_date),
+        file_name=f"laporan_penjualan_{start_date}_{end_date}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        on_click="ignore"
+    )
+
+
+def laporan_gabungan():
+    st.subheader("📈 Laporan Keuangan Semua Cabang")
+    min_date, max_date = konsolidasi.rentang()
+    if min_date is None:
+        st.info("Belum ada data transaksi di cabang mana pun.")
+        return
+
+    col1, col2 = st.columns(2)
+    start_date = col1.date_input("Tanggal Mulai", min_date, key="gabungan_mulai")
+    end_date = col2.date_input("Tanggal Akhir", max_date, key="gabungan_akhir")
+
+    with st.spinner("Menghitung laporan semua cabang..."):
+        data = konsolidasi.gabungan(start_date, end_date)
+    total_pendapatan = sum(m["pendapatan"] for m in data["per_cabang"].values())
+    rata_perhari = total_pendapatan / len(data["harian"]) if data["harian"] else 0
+
+    st.write("### 📊 Ringkasan Pendapatan")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Pendapatan", f"Rp {total_pendapatan:,.0f}")
+    col2.metric("Rata-rata per Hari", f"Rp {rata_perhari:,.0f}")
+    col3.metric("Jumlah Transaksi", sum(m["jumlah"] for m in data["per_cabang"].values()))
+
+    st.write("### 🏬 Pendapatan per Cabang")
+    st.dataframe(pd.DataFrame(
+        [(c, m["pendapatan"], m["jumlah"], m["pendapatan"] - m["modal"]) for c, m in data["per_cabang"].items()],
+        columns=['Cabang', 'Total Pendapatan', 'Jumlah Transaksi', 'Margin']
+    ), hide_index=True)
+
+    st.write("### 🧑‍💼 Pendapatan per Kasir")
+    st.dataframe(pd.DataFrame(
+        [(c, k, m["pendapatan"], m["jumlah"]) for (c, k), m in sorted(data["kasir"].items())],
+        columns=['Cabang', 'Kasir', 'Total Pendapatan', 'Jumlah Transaksi']
+    ), hide_index=True)
+    st.caption("Ekspor Excel tersedia per cabang.")
@@ -0,0 +1,53 @@
+# halaman/performa.py
+# Halaman Performa (admin): metrik span dan statistik cache.
+import json
+
+import pandas as pd
+import streamlit as st
+
+import metrik
+from penyimpanan import statistik_cache
+
+
+def halaman_performa():
+    st.subheader("⏱️ Performa")
+    st.caption(f"Persentil dari {metrik.JENDELA} sampel terakhir per seri, sejak proses ini berjalan.")
+
+    cache = statistik_cache()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Cache hit", cache["hit"])
+    col2.metric("Cache miss", cache["miss"])
+    col3.metric("Entri cache", cache["entri"])
+
+    data = metrik.ringkasan()
+    if not data:
+        st.info("Belum ada metrik yang tercatat.")
+        return
+
+    jenis = st.selectbox("Jenis", ["Semua"] + sorted({r["nama"] for r in data}), key="performa_jenis")
+    df = pd.DataFrame([
+        {
+            "span": r["nama"],
+            "label": ", ".join(f"{k}={v}" for k, v in r["label"].items()),
+            "jumlah": r["jumlah"],
+            "p50 (ms)": r["p50_detik"] * 1000,
+            "p90 (ms)": r["p90_detik"] * 1000,
+            "p99 (ms)": r["p99_detik"] * 1000,
+            "maks (ms)": r["maks_detik"] * 1000,
+            "total (s)": r["total_detik"],
+            "byte": r["byte"],
+        }
+        for r in data if jenis == "Semua" or r["nama"] == jenis
+    ]).sort_values("total (s)", ascending=False)
+    st.dataframe(df, hide_index=True, column_config={
+        k: st.column_config.NumberColumn(format="%.1f") for k in ["p50 (ms)", "p90 (ms)", "p99 (ms)", "maks (ms)"]
+    })
+
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("📥 Prometheus", metrik.teks_prometheus, "kasir_metrik.prom", "text/plain",
+                         on_click="ignore")
+    col2.download_button("📥 JSON", lambda: json.dumps(metrik.ringkasan(), indent=2), "kasir_metrik.json",
+                         "application/json", on_click="ignore")
+    if col3.button("🔄 Reset Metrik"):
+        metrik.reset()
+        st.rerun()
@@ -0,0 +1,124 @@
+# halaman/profil.py
+# Halaman Profil: data pengguna, foto profil dan performa penjualan.
+import streamlit as st
+from PIL import Image
+
+import foto
+from halaman import grafik
+from penyimpanan import cabang_aktif, cari_akun, daftar_cabang, simpan_akun
+import ringkasan
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def thumbnail_foto(hash_foto):
+    # Isi file tidak pernah berubah untuk hash yang sama, aman di-cache permanen
+    return foto.baca_foto(hash_foto)
+
+def halaman_profil(username=None):
+    # Default ke user yang login jika tidak ada parameter
+    target_user = username if username else st.session_state.login["username"]
+    is_admin = st.session_state.login["role"] == "admin"
+    is_own_profile = target_user == st.session_state.login["username"]
+    
+    st.subheader(f"👤 Profil {target_user}")
+    user_data = cari_akun(target_user)
+
+    if not user_data:
+        st.error("Data pengguna tidak ditemukan")
+        return
+
+    # Inisialisasi data jika kosong
+    user_data.setdefault("nama_lengkap", "")
+    user_data.setdefault("no_telepon", "")
+    user_data.setdefault("foto_profil", None)
+
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.write("### Foto Profil")
+        if user_data["foto_profil"]:
+            try:
+                # Foto format lama (base64 di akun.json) dipindahkan ke folder foto saat pertama dibuka
+                if not foto.adalah_hash(user_data["foto_profil"]):
+                    user_data["foto_profil"] = foto.dari_base64(user_data["foto_profil"])
+                    simpan_akun(user_data)
+                st.image(thumbnail_foto(user_data["foto_profil"]), width=150)
+            except Exception:
+                st.warning("Gagal memuat foto profil")
+        
+        if is_own_profile:
+            uploaded_file = st.file_uploader("Ubah foto profil", type=["jpg", "png", "jpeg"], key=f"upload_{target_user}")
+            if uploaded_file is not None and st.session_state.get("foto_terunggah") != uploaded_file.file_id:
+                try:
+                    # Simpan ke folder foto (resize + thumbnail), akun hanya menyimpan hash
+                    user_data["foto_profil"] = foto.simpan_foto(Image.open(uploaded_file))
+                    st.session_state.foto_terunggah = uploaded_file.file_id
+                    simpan_akun(user_data)
+                    st.success("Foto profil berhasil diperbarui!")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Gagal memproses gambar: {str(e)}")
+            
+            if user_data["foto_profil"] and st.button("Hapus Foto Profil", key=f"delete_{target_user}"):
+                user_data["foto_profil"] = None
+                simpan_akun(user_data)
+                st.success("Foto profil dihapus!")
+                st.rerun()
+    
+    with col2:
+        st.write("### Informasi Pengguna")
+        st.text_input("Username", value=user_data["username"], disabled=True)
+        
+        # Hanya admin atau pemilik profil yang bisa edit
+        if is_admin or is_own_profile:
+            nama_lengkap = st.text_input("Nama Lengkap", value=user_data["nama_lengkap"], 
+                                       disabled=not (is_admin or is_own_profile))
+            no_telepon = st.text_input("Nomor Telepon", value=user_data["no_telepon"], 
+                                     disabled=not is_admin)  # Hanya admin yang bisa edit no telepon
+            
+            if st.button("Simpan Perubahan", key=f"save_{target_user}"):
+                user_data["nama_lengkap"] = nama_lengkap
+                user_data["no_telepon"] = no_telepon
+                simpan_akun(user_data)
+                st.success("Profil berhasil diperbarui!")
+        else:
+            st.text_input("Nama Lengkap", value=user_data["nama_lengkap"], disabled=True)
+            st.text_input("Nomor Telepon", value=user_data["no_telepon"], disabled=True)
+        
+        st.text_input("Role", value=user_data["role"], disabled=True)
+    
+    st.markdown("---")
+    # Rekap dibaca dari cabang aktif
+    cabang = f" ({cabang_aktif()})" if len(daftar_cabang()) > 1 else ""
+    st.write(f"### 📊 Statistik Performa{cabang}")
+    
+    # Load rekap pengguna ini
+    try:
+        rekap_saya = ringkasan.rekap_kasir(target_user)
+    except Exception as e:
+        st.error(f"Gagal memuat data: {str(e)}")
+        return
+    
+    if not rekap_saya:
+        st.info("Pengguna ini belum melakukan transaksi.")
+        return
+    
+    # 1. Statistik Dasar
+    st.write("#### 📌 Ringkasan")
+    total_transaksi = rekap_saya["jumlah"]
+    total_pendapatan = rekap_saya["pendapatan"]
+    rata_transaksi = total_pendapatan / total_transaksi
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Transaksi", total_transaksi)
+    col2.metric("Total Pendapatan", f"Rp {total_pendapatan:,.0f}")
+    col3.metric("Rata-rata/Transaksi", f"Rp {rata_transaksi:,.0f}")
+
+    # 2. Grafik Performa Bulanan (di-cache sampai ada transaksi baru)
+    st.write("### 📈 Grafik Performa")
+    try:
+        fig = grafik.bulanan_kasir(target_user)
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+    except Exception as e:
+        st.error(f"Gagal membuat grafik: {str(e)}")
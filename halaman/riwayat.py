@@ -0,0 +1,128 @@
+# halaman/riwayat.py
+# Halaman Riwayat: transaksi dan penghapusan barang per halaman dengan filter.
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+import struk
+from halaman.cetak import tampilkan_struk_pdf
+from penyimpanan import AKUN_FILE, BARANG_HAPUS_FILE, TRANSAKSI_FILE, baca_data, halaman_data, rentang_waktu
+
+
+def paginasi(prefix, tanda_filter, ambil):
+    # Tumpukan kursor per halaman di session_state; kembali ke halaman 1 jika filter berubah
+    if st.session_state.get(f"{prefix}_filter") != tanda_filter:
+        st.session_state[f"{prefix}_filter"] = tanda_filter
+        st.session_state[f"{prefix}_kursor"] = [None]
+    tumpukan = st.session_state[f"{prefix}_kursor"]
+    data, berikut = ambil(tumpukan[-1])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    col1.button("⬅️ Sebelumnya", key=f"{prefix}_sebelum", disabled=len(tumpukan) == 1,
+                on_click=tumpukan.pop)
+    col2.markdown(f"Halaman **{len(tumpukan)}**")
+    col3.button("Berikutnya ➡️", key=f"{prefix}_berikut", disabled=berikut is None,
+                on_click=partial(tumpukan.append, berikut))
+    return data
+
+def halaman_riwayat():
+    st.subheader("📜 Riwayat Transaksi")
+    min_transaksi, max_transaksi = rentang_waktu(TRANSAKSI_FILE)
+
+    if min_transaksi is None:
+        st.info("Belum ada transaksi.")
+    else:
+        # Filter diterapkan di server, hanya satu halaman yang dikirim ke browser
+        st.markdown("### 🔎 Filter Transaksi")
+        col1, col2 = st.columns(2)
+        tanggal_mulai = col1.date_input("📅 Tanggal Mulai", min_transaksi, key="transaksi_mulai")
+        tanggal_akhir = col2.date_input("📅 Tanggal Akhir", max_transaksi, key="transaksi_akhir")
+        with st.expander("Filter lainnya"):
+            col1, col2, col3 = st.columns(3)
+            kasir = col1.selectbox("Kasir", ["Semua"] + [a["username"] for a in baca_data(AKUN_FILE)],
+                                   key="transaksi_kasir")
+            metode = col2.selectbox("Metode", ["Semua", "Cash", "QRIS/Transfer"], key="transaksi_metode")
+            produk = col3.text_input("Nama barang", key="transaksi_produk").strip().lower()
+            col1, col2, col3 = st.columns(3)
+            total_min = col1.number_input("Total minimal", 0, step=1000, key="transaksi_total_min")
+            total_maks = col2.number_input("Total maksimal (0 = tanpa batas)", 0, step=1000,
+                                           key="transaksi_total_maks")
+            ukuran = col3.selectbox("Baris per halaman", [25, 50, 100], index=1, key="transaksi_ukuran")
+
+        def saring(t):
+            return ((metode == "Semua" or t["metode"] == metode)
+                    and t["total"] >= total_min
+                    and (not total_maks or t["total"] <= total_maks)
+                    and (not produk or any(produk in item["nama"].lower() for item in t["items"])))
+
+        transaksi = paginasi(
+            "riwayat_transaksi",
+            (tanggal_mulai, tanggal_akhir, kasir, metode, produk, total_min, total_maks, ukuran),
+            lambda kursor: halaman_data(
+                TRANSAKSI_FILE, tanggal_mulai, tanggal_akhir, None if kasir == "Semua" else kasir,
+                saring, kursor, ukuran)
+        )
+
+        if not transaksi:
+            st.info("Tidak ada transaksi yang cocok dengan filter.")
+        else:
+            df = pd.DataFrame(
+                [(t["waktu"], t["kasir"], t["metode"], len(t["items"]), t["total"], t["bayar"], t["kembalian"])
+                 for t in transaksi],
+                columns=["waktu", "kasir", "metode", "jumlah item", "total", "bayar", "kembalian"]
+            )
+            df["waktu"] = pd.to_datetime(df["waktu"])
+            pilihan = st.dataframe(df, hide_index=True, on_select="rerun", selection_mode="single-row",
+                                   key="tabel_riwayat_transaksi")
+            # Item hanya ditampilkan untuk transaksi yang dipilih
+            baris = pilihan.selection.rows
+            if baris and baris[0] < len(transaksi):
+                t = transaksi[baris[0]]
+                st.markdown(f"**Item transaksi {t['waktu']} ({t['kasir']})**")
+                st.dataframe(pd.DataFrame(t["items"]), hide_index=True)
+                if st.button("🖨️ Cetak Ulang Struk Ini", key="cetak_ulang_satu"):
+                    st.session_state.struk_riwayat = struk.kirim([t])
+            else:
+                st.caption("Pilih satu baris untuk melihat item transaksinya.")
+
+            if st.button("🖨️ Cetak Ulang Semua Struk Sesuai Filter", key="cetak_ulang_semua"):
+                st.session_state.struk_riwayat = struk.kirim_rentang(
+                    tanggal_mulai, tanggal_akhir, None if kasir == "Semua" else kasir, saring)
+            if "struk_riwayat" in st.session_state:
+                tampilkan_struk_pdf(st.session_state.struk_riwayat, "struk_riwayat.pdf", "struk_riwayat")
+
+    st.subheader("🗑️ Riwayat Penghapusan Barang")
+    min_hapus, max_hapus = rentang_waktu(BARANG_HAPUS_FILE)
+    if min_hapus is None:
+        st.info("Belum ada riwayat penghapusan.")
+    else:
+        # Filter tanggal penghapusan
+        st.markdown("### 🔎 Filter Penghapusan Barang")
+        col1, col2 = st.columns(2)
+        hapus_mulai = col1.date_input("📅 Tanggal Mulai", min_hapus, key="hapus_mulai")
+        hapus_akhir = col2.date_input("📅 Tanggal Akhir", max_hapus, key="hapus_akhir")
+        with st.expander("Filter lainnya"):
+            col1, col2, col3 = st.columns(3)
+            oleh = col1.selectbox("Dihapus oleh", ["Semua"] + [a["username"] for a in baca_data(AKUN_FILE)],
+                                  key="hapus_oleh")
+            nama = col2.text_input("Nama barang", key="hapus_nama").strip().lower()
+            ukuran_hapus = col3.selectbox("Baris per halaman", [25, 50, 100], index=1, key="hapus_ukuran")
+
+        def saring_hapus(r):
+            return ((oleh == "Semua" or r.get("dihapus_oleh") == oleh)
+                    and (not nama or nama in r["nama"].lower()))
+
+        hapus = paginasi(
+            "riwayat_hapus",
+            (hapus_mulai, hapus_akhir, oleh, nama, ukuran_hapus),
+            lambda kursor: halaman_data(
+                BARANG_HAPUS_FILE, hapus_mulai, hapus_akhir, saring=saring_hapus, kursor=kursor,
+                ukuran=ukuran_hapus)
+        )
+        if not hapus:
+            st.info("Tidak ada penghapusan yang cocok dengan filter.")
+        else:
+            df_hapus = pd.DataFrame(hapus)
+            df_hapus["tanggal_dihapus"] = pd.to_datetime(df_hapus["tanggal_dihapus"])
+            st.dataframe(df_hapus, hide_index=True)
@@ -0,0 +1,95 @@
+# halaman/statistik.py
+# Halaman Statistik: grafik pendapatan harian dan barang terlaris, per cabang atau
+# gabungan semua cabang.
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import fakta
+from halaman import grafik
+import konsolidasi
+import ringkasan
+
+URUTAN = {"Jumlah Terjual": "qty", "Pendapatan": "pendapatan", "Margin": "margin"}
+
+
+def halaman_statistik():
+    st.subheader("📊 Statistik Penjualan")
+    min_date, max_date = ringkasan.rentang()
+    
+    if min_date is None:
+        st.info("Belum ada data transaksi.")
+        return
+
+    # Filter Tanggal
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("Tanggal Mulai", min_date, key="stat_start")
+    with col2:
+        end_date = st.date_input("Tanggal Akhir", max_date, key="stat_end")
+
+    # Grafik Pendapatan: rentang panjang otomatis diringkas per minggu/bulan
+    pilihan = {"Otomatis": None, **{label: g for g, label in grafik.GRANULARITAS.items()}}
+    col1, col2 = st.columns([2, 1])
+    col1.write("### 📈 Pendapatan")
+    label_periode = col2.selectbox("Periode", list(pilihan), key="stat_periode")
+    fig, granularitas = grafik.pendapatan("statistik", start_date, end_date,
+                                          granularitas=pilihan[label_periode])
+    tampilkan_pendapatan(fig, granularitas, pilihan[label_periode] is None)
+
+    # Grafik Barang Terlaris
+    st.write("### 🏆 Barang Terlaris")
+    label = st.radio("Urutkan menurut", list(URUTAN), horizontal=True, key="stat_urut")
+    grafik_terlaris(fakta.teratas(start_date, end_date, n=10, urut=URUTAN[label]), label)
+
+
+def grafik_terlaris(terlaris, label):
+    if terlaris:
+        item_counts = pd.DataFrame(terlaris).rename(columns={
+            'nama': 'Barang', 'kategori': 'Kategori', 'qty': 'Jumlah Terjual',
+            'pendapatan': 'Pendapatan', 'margin': 'Margin'
+        })
+        fig = px.bar(
+            item_counts,
+            x='Barang',
+            y=label,
+            hover_data=['Kategori', 'Jumlah Terjual', 'Pendapatan', 'Margin'],
+            title=f"10 Barang Terlaris ({label})"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("Belum ada barang yang terjual.")
+
+
+def tampilkan_pendapatan(fig, granularitas, otomatis):
+    if fig is not None:
+        if otomatis and granularitas != "hari":
+            st.caption(f"Rentang panjang ditampilkan {grafik.GRANULARITAS[granularitas].lower()}.")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.warning("Tidak ada data pendapatan di rentang tanggal ini.")
+
+
+def statistik_gabungan():
+    st.subheader("📊 Statistik Penjualan Semua Cabang")
+    min_date, max_date = konsolidasi.rentang()
+    if min_date is None:
+        st.info("Belum ada data transaksi di cabang mana pun.")
+        return
+
+    col1, col2 = st.columns(2)
+    start_date = col1.date_input("Tanggal Mulai", min_date, key="stat_gabungan_mulai")
+    end_date = col2.date_input("Tanggal Akhir", max_date, key="stat_gabungan_akhir")
+
+    pilihan = {"Otomatis": None, **{label: g for g, label in grafik.GRANULARITAS.items()}}
+    col1, col2 = st.columns([2, 1])
+    col1.write("### 📈 Pendapatan")
+    label_periode = col2.selectbox("Periode", list(pilihan), key="stat_periode")
+    with st.spinner("Menghitung statistik semua cabang..."):
+        fig, granularitas = grafik.pendapatan_gabungan(start_date, end_date, pilihan[label_periode])
+    tampilkan_pendapatan(fig, granularitas, pilihan[label_periode] is None)
+
+    st.write("### 🏆 Barang Terlaris")
+    label = st.radio("Urutkan menurut", list(URUTAN), horizontal=True, key="stat_urut")
+    data = konsolidasi.gabungan(start_date, end_date)
+    grafik_terlaris(konsolidasi.teratas(data, n=10, urut=URUTAN[label]), label)
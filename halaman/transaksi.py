@@ -0,0 +1,201 @@
+# halaman/transaksi.py
+# Halaman Transaksi: pilih/scan barang, keranjang dan pembayaran.
+import streamlit as st
+
+import struk
+from halaman import pasang_cabang
+from halaman.cetak import tampilkan_struk, tampilkan_struk_pdf
+from katalog import katalog, uraikan_scan
+from operasi import StokBerubahError, commit_transaksi
+
+
+# Keranjang disimpan sebagai dict (nama, kategori) -> item agar penambahan dan
+# pengeditan tidak perlu mencari baris satu per satu
+def tambah_ke_keranjang(b, qty):
+    kunci = (b['nama'], b['kategori'])
+    existing = st.session_state.keranjang.get(kunci)
+    if existing:
+        existing['qty'] += qty
+        existing['subtotal'] = existing['qty'] * existing['harga']
+    else:
+        st.session_state.keranjang[kunci] = {
+            "nama": b['nama'],
+            "kategori": b['kategori'],
+            "qty": qty,
+            "harga": b['harga'],
+            "harga_modal": b.get("harga_modal", 0),
+            "subtotal": b['harga'] * qty
+        }
+        if b.get("id"):
+            st.session_state.keranjang[kunci]["id"] = b["id"]
+
+def proses_scan():
+    # Callback input scan: setiap kode dicari lewat indeks SKU lalu langsung masuk keranjang.
+    # Callback berjalan sebelum skrip memasang cabang, jadi cabang sesi dipasang di sini
+    pasang_cabang()
+    kat = katalog()
+    pesan = []
+    hasil, salah = uraikan_scan(st.session_state.input_scan)
+    for qty, kode in hasil:
+        b = kat.cari_sku(kode)
+        if b is None:
+            pesan.append(("error", f"Kode {kode} tidak ditemukan"))
+            continue
+        item = st.session_state.keranjang.get((b['nama'], b['kategori']))
+        di_keranjang = item['qty'] if item else 0
+        if di_keranjang + qty > b['stok']:
+            pesan.append(("error", f"Stok {b['nama']} tidak cukup ({b['stok']} tersedia)"))
+            continue
+        tambah_ke_keranjang(b, qty)
+        pesan.append(("success", f"{b['nama']} +{qty}"))
+    for token in salah:
+        pesan.append(("error", f"Format scan tidak valid: {token}"))
+    st.session_state.pesan_scan = pesan
+    st.session_state.input_scan = ""
+
+def ubah_keranjang(kunci_editor, daftar_kunci):
+    # Callback data_editor: perubahan qty/hapus baris diterapkan ke keranjang lalu editor
+    # diganti kuncinya, karena delta editor berbasis posisi baris data lama
+    pasang_cabang()
+    perubahan = st.session_state[kunci_editor]
+    keranjang = st.session_state.keranjang
+    kat = katalog()
+    pesan = []
+    for posisi, kolom in perubahan["edited_rows"].items():
+        item = keranjang.get(daftar_kunci[int(posisi)])
+        if item is None or kolom.get("qty") is None:
+            continue
+        qty = max(0, int(kolom["qty"]))
+        b = kat.cari(item["nama"], item["kategori"])
+        if b is not None and qty > b["stok"]:
+            pesan.append(f"Stok {item['nama']} hanya {b['stok']}")
+            qty = b["stok"]
+        item["qty"] = qty
+        item["subtotal"] = qty * item["harga"]
+    for posisi in perubahan["deleted_rows"]:
+        keranjang.pop(daftar_kunci[int(posisi)], None)
+    st.session_state.keranjang = {k: item for k, item in keranjang.items() if item["qty"] > 0}
+    st.session_state.pesan_keranjang = pesan
+    st.session_state.versi_keranjang = st.session_state.get("versi_keranjang", 0) + 1
+
+def halaman_transaksi():
+    st.subheader("🛒 Transaksi")
+    kat = katalog()
+
+    if "keranjang" not in st.session_state:
+        st.session_state.keranjang = {}
+
+    if st.toggle("📷 Mode Scan Barcode", key="mode_scan"):
+        st.text_input("Scan SKU / Barcode", key="input_scan", on_change=proses_scan,
+                      help="Beberapa kode dipisah spasi; gunakan 3*KODE untuk jumlah 3.")
+        for jenis, teks in st.session_state.get("pesan_scan", []):
+            getattr(st, jenis)(teks)
+    else:
+        kategori_terpilih = st.selectbox("Pilih Kategori", kat.daftar_kategori())
+        nama_barang = st.selectbox("Pilih Barang", kat.nama_per_kategori(kategori_terpilih))
+
+        b_dipilih = kat.cari(nama_barang, kategori_terpilih)
+        if not b_dipilih:
+            st.warning("Barang tidak ditemukan.")
+            return
+
+        if b_dipilih['stok'] <= 0:
+            st.warning("Stok barang ini habis.")
+        else:
+            qty = st.number_input(f"Jumlah ({b_dipilih['stok']} tersedia)", 1, b_dipilih['stok'])
+
+            if st.button("➕ Tambah ke Keranjang"):
+                tambah_ke_keranjang(b_dipilih, qty)
+
+    keranjang_belanja()
+
+@st.fragment
+def keranjang_belanja():
+    # Mengedit keranjang dan pembayaran hanya menjalankan ulang fragmen ini, bukan seluruh aplikasi
+    pasang_cabang()
+    if st.session_state.keranjang:
+        # pandas baru dimuat saat keranjang pertama kali berisi
+        import pandas as pd
+
+        st.write("### 🧺 Keranjang Belanja")
+        daftar_kunci = list(st.session_state.keranjang)
+        items = list(st.session_state.keranjang.values())
+        kunci_editor = f"editor_keranjang_{st.session_state.get('versi_keranjang', 0)}"
+        st.data_editor(
+            pd.DataFrame(items, columns=["nama", "kategori", "qty", "harga", "subtotal"]),
+            key=kunci_editor, hide_index=True, num_rows="delete", use_container_width=True,
+            disabled=["nama", "kategori", "harga", "subtotal"],
+            column_config={
+                "nama": "Barang",
+                "kategori": "Kategori",
+                "qty": st.column_config.NumberColumn("Qty", min_value=0, step=1,
+                                                     help="Ubah jumlah; 0 atau hapus baris untuk membuang"),
+                "harga": st.column_config.NumberColumn("Harga", format="Rp %d"),
+                "subtotal": st.column_config.NumberColumn("Subtotal", format="Rp %d"),
+            },
+            on_change=ubah_keranjang, args=(kunci_editor, daftar_kunci),
+        )
+        for teks in st.session_state.pop("pesan_keranjang", []):
+            st.warning(teks)
+        total = sum(item['subtotal'] for item in items)
+
+        st.markdown(f"### 💰 Total: Rp {total:,.0f} ({len(items)} barang)")
+
+        # Keranjang ditolak karena stok diubah sesi/kasir lain
+        if st.session_state.get("stok_berubah"):
+            kurang = st.session_state.stok_berubah
+            st.error("Stok berubah sejak barang dimasukkan ke keranjang: " + ", ".join(
+                f"{k['nama']} ({k['kategori']}) diminta {k['diminta']}, sisa {k['tersedia']}" for k in kurang
+            ))
+            if st.button("🔄 Sesuaikan Keranjang dengan Stok"):
+                for k in kurang:
+                    item = st.session_state.keranjang.get((k["nama"], k["kategori"]))
+                    if item:
+                        item["qty"] = k["tersedia"]
+                        item["subtotal"] = item["qty"] * item["harga"]
+                st.session_state.keranjang = {k: item for k, item in st.session_state.keranjang.items()
+                                              if item["qty"] > 0}
+                st.session_state.versi_keranjang = st.session_state.get("versi_keranjang", 0) + 1
+                del st.session_state.stok_berubah
+                st.rerun()
+
+        metode = st.radio("Pilih Metode Pembayaran", ["Cash", "QRIS/Transfer"])
+        if metode == "QRIS/Transfer" and struk.QRIS_MERCHANT:
+            st.image(struk.qr_png(struk.QRIS_MERCHANT), caption="Scan QRIS untuk membayar", width=220)
+
+        uang_dibayar = 0
+        kembalian = 0
+        if metode == "Cash":
+            uang_dibayar = st.number_input("💵 Uang Diterima", min_value=0)
+            if uang_dibayar >= total:
+                kembalian = uang_dibayar - total
+                st.success(f"Kembalian: Rp {kembalian:,.0f}")
+            else:
+                st.warning("Uang diterima kurang dari total belanja.")
+
+        if metode == "QRIS/Transfer" or uang_dibayar >= total:
+            if st.button("💾 Simpan Transaksi"):
+                # Stok dicek ulang dan dikurangi secara atomik bersama penyimpanan transaksi
+                try:
+                    transaksi_baru = commit_transaksi(
+                        items, st.session_state.login["username"], metode, uang_dibayar
+                    )
+                except StokBerubahError as e:
+                    st.session_state.stok_berubah = e.kurang
+                    st.rerun()
+
+                st.session_state.pop("stok_berubah", None)
+                st.success("Transaksi berhasil disimpan ✅")
+                # PDF dibuat di latar belakang, tombol simpan tidak menunggu fpdf
+                st.session_state.struk_terakhir = {
+                    "transaksi": transaksi_baru,
+                    "tugas": struk.kirim([transaksi_baru])
+                }
+
+                # Reset keranjang
+                st.session_state.keranjang = {}
+                st.session_state.versi_keranjang = st.session_state.get("versi_keranjang", 0) + 1
+
+    if "struk_terakhir" in st.session_state:
+        tampilkan_struk(st.session_state.struk_terakhir["transaksi"])
+        tampilkan_struk_pdf(st.session_state.struk_terakhir["tugas"], "struk.pdf", "struk_terakhir")
@@ -0,0 +1,200 @@
+# impor.py
+# Impor massal barang dari CSV/XLSX: baris dibaca satu per satu (tanpa memuat
+# seluruh file sebagai DataFrame), divalidasi dengan pesan error per baris, lalu
+# dibandingkan dengan katalog menjadi rencana perubahan. Rencana bisa ditampilkan
+# sebagai pratinjau (dry run) sebelum diterapkan oleh operasi.impor_barang.
+import csv
+import io
+import re
+
+KOLOM_WAJIB = ("nama", "kategori")
+KOLOM_ANGKA = {"stok": True, "tambah_stok": True, "harga": False, "harga_modal": False}  # True = harus bulat
+ALIAS = {
+    "nama_barang": "nama",
+    "harga_jual": "harga",
+    "harga_satuan": "harga",
+    "modal": "harga_modal",
+    "barcode": "sku",
+    "kode": "sku",
+    "tambah": "tambah_stok",
+}
+CONTOH_CSV = (
+    "nama,kategori,stok,tambah_stok,harga,harga_modal,sku\n"
+    "Teh Botol,Minuman,24,,5000,3500,8991234567890\n"
+    "Roti Tawar,Roti,,12,15000,11000,\n"
+)
+
+_RIBUAN = re.compile(r"-?\d{1,3}(\.\d{3})+(,\d+)?")
+# Pemisah ribuan koma (format spreadsheet Inggris): "5,000", "1,250,000.50"
+_RIBUAN_KOMA = re.compile(r"-?\d{1,3}(,\d{3})+(\.\d+)?")
+
+
+def _nama_kolom(teks):
+    nama = re.sub(r"\s+", "_", str(teks or "").strip().lower())
+    return ALIAS.get(nama, nama)
+
+
+def _baris_csv(berkas):
+    teks = io.TextIOWrapper(berkas, encoding="utf-8-sig", newline="")
+    contoh = teks.read(4096)
+    teks.seek(0)
+    try:
+        dialek = csv.Sniffer().sniff(contoh, delimiters=",;\t")
+    except csv.Error:
+        dialek = csv.excel
+    yield from csv.reader(teks, dialek)
+
+
+def _baris_xlsx(berkas):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(berkas, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _angka(nilai, bulat):
+    # Menerima angka Excel, "5000", "5.000", "5.000,50", "5,000", "1,250.50", "Rp 5,5".
+    # Koma diikuti tepat tiga digit dibaca sebagai pemisah ribuan, bukan desimal.
+    if isinstance(nilai, (int, float)):
+        angka = float(nilai)
+    else:
+        teks = str(nilai).replace("Rp", "").replace(" ", "")
+        if _RIBUAN.fullmatch(teks):
+            teks = teks.replace(".", "")
+        elif _RIBUAN_KOMA.fullmatch(teks):
+            teks = teks.replace(",", "")
+        angka = float(teks.replace(",", "."))
+    if angka != angka or angka in (float("inf"), float("-inf")):
+        raise ValueError
+    if angka.is_integer():
+        return int(angka)
+    if bulat:
+        raise ValueError
+    return angka
+
+
+def _kosong(nilai):
+    return nilai is None or (isinstance(nilai, str) and not nilai.strip())
+
+
+def baca_impor(berkas, nama_file):
+    # Mengembalikan (baris valid, error); error = list (nomor baris, pesan).
+    # ValueError jika kolom wajib tidak ada di header.
+    xlsx = nama_file.lower().endswith((".xlsx", ".xlsm"))
+    sumber = _baris_xlsx(berkas) if xlsx else _baris_csv(berkas)
+    header = [_nama_kolom(h) for h in next(sumber, [])]
+    kurang = [k for k in KOLOM_WAJIB if k not in header]
+    if kurang:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(kurang)}")
+
+    valid, error = [], []
+    baris_pertama = {}
+    for nomor, isi in enumerate(sumber, start=2):
+        if all(_kosong(v) for v in isi):
+            continue
+        mentah = {k: v for k, v in zip(header, isi) if k and not _kosong(v)}
+        nama = str(mentah.get("nama", "")).strip()
+        kategori = str(mentah.get("kategori", "")).strip()
+        if not nama or not kategori:
+            error.append((nomor, "nama dan kategori wajib diisi"))
+            continue
+        kunci = (nama, kategori)
+        if kunci in baris_pertama:
+            error.append((nomor, f"duplikat dari baris {baris_pertama[kunci]}"))
+            continue
+
+        r = {"baris": nomor, "nama": nama, "kategori": kategori}
+        salah = []
+        for kolom, bulat in KOLOM_ANGKA.items():
+            if kolom in mentah:
+                try:
+                    r[kolom] = _angka(mentah[kolom], bulat)
+                except ValueError:
+                    salah.append(f"{kolom} bukan {'bilangan bulat' if bulat else 'angka'}: {mentah[kolom]}")
+                    continue
+                if kolom != "tambah_stok" and r[kolom] < 0:
+                    salah.append(f"{kolom} tidak boleh negatif")
+        if "stok" in r and "tambah_stok" in r:
+            salah.append("isi salah satu dari stok atau tambah_stok")
+        if "sku" in mentah:
+            sku = mentah["sku"]
+            # Barcode dari Excel sering terbaca sebagai angka
+            r["sku"] = str(int(sku)) if isinstance(sku, float) and sku.is_integer() else str(sku).strip()
+        if salah:
+            error.append((nomor, "; ".join(salah)))
+            continue
+        baris_pertama[kunci] = nomor
+        valid.append(r)
+    return valid, error
+
+
+class Rencana:
+    def __init__(self):
+        self.perubahan = []  # dict: baris, aksi ("baru"/"ubah"), nama, kategori, sebelum, sesudah
+        self.error = []      # (nomor baris, pesan)
+        self.tetap = 0
+        self.diterapkan = False
+
+    def jumlah(self, aksi):
+        return sum(1 for p in self.perubahan if p["aksi"] == aksi)
+
+
+def rencanakan(baris, kat):
+    # Membandingkan baris valid dengan katalog tanpa mengubah apa pun
+    rencana = Rencana()
+    pemilik_sku = {b["sku"]: (b["nama"], b["kategori"]) for b in kat.barang if b.get("sku")}
+    for r in baris:
+        kunci = (r["nama"], r["kategori"])
+        lama = kat.cari(*kunci)
+        if lama is None:
+            if "harga" not in r:
+                rencana.error.append((r["baris"], "barang baru wajib punya harga"))
+                continue
+            sesudah = {"nama": r["nama"], "kategori": r["kategori"],
+                       "stok": r.get("stok", r.get("tambah_stok", 0)),
+                       "harga": r["harga"], "harga_modal": r.get("harga_modal", 0)}
+            if sesudah["stok"] < 0:
+                rencana.error.append((r["baris"], "stok barang baru tidak boleh negatif"))
+                continue
+        else:
+            sesudah = dict(lama)
+            for kolom in ("stok", "harga", "harga_modal"):
+                if kolom in r:
+                    sesudah[kolom] = r[kolom]
+            if "tambah_stok" in r:
+                sesudah["stok"] = lama["stok"] + r["tambah_stok"]
+                if sesudah["stok"] < 0:
+                    rencana.error.append((r["baris"], f"stok menjadi negatif (sisa {lama['stok']})"))
+                    continue
+
+        sku = r.get("sku")
+        if sku:
+            pemilik = pemilik_sku.get(sku)
+            if pemilik is not None and pemilik != kunci:
+                rencana.error.append((r["baris"], f"SKU {sku} sudah dipakai {pemilik[0]} ({pemilik[1]})"))
+                continue
+            if lama is not None and lama.get("sku") and lama["sku"] != sku:
+                pemilik_sku.pop(lama["sku"], None)
+            pemilik_sku[sku] = kunci
+            sesudah["sku"] = sku
+
+        if lama is None:
+            rencana.perubahan.append({"baris": r["baris"], "aksi": "baru", "nama": r["nama"],
+                                      "kategori": r["kategori"], "sebelum": None, "sesudah": sesudah})
+        elif sesudah != dict(lama):
+            rencana.perubahan.append({"baris": r["baris"], "aksi": "ubah", "nama": r["nama"],
+                                      "kategori": r["kategori"], "sebelum": dict(lama), "sesudah": sesudah})
+        else:
+            rencana.tetap += 1
+    return rencana
+
+
+def uraian(p):
+    # Ringkasan satu perubahan untuk tabel pratinjau
+    if p["aksi"] == "baru":
+        return ", ".join(f"{k}={v}" for k, v in p["sesudah"].items() if k not in ("nama", "kategori"))
+    return "; ".join(f"{k}: {p['sebelum'].get(k)} → {v}" for k, v in p["sesudah"].items()
+                     if p["sebelum"].get(k) != v)
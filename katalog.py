@@ -0,0 +1,95 @@
+# katalog.py
+# Indeks barang per (nama, kategori), per kategori dan per SKU/barcode agar
+# pencarian barang, scan kasir, pengecekan duplikat dan update stok tidak perlu
+# memindai seluruh katalog.
+import threading
+
+from penyimpanan import BARANG_FILE, baca_data, cabang_aktif
+
+_kunci = threading.Lock()
+_cache = {}
+
+
+class Katalog:
+    def __init__(self, barang):
+        self.barang = barang
+        self._bangun_indeks()
+
+    def _bangun_indeks(self):
+        self._posisi = {}
+        self._per_kategori = {}
+        self._sku = {}
+        for i, b in enumerate(self.barang):
+            self._posisi[(b["nama"], b["kategori"])] = i
+            self._per_kategori.setdefault(b["kategori"], []).append(b["nama"])
+            if b.get("sku"):
+                self._sku[b["sku"]] = i
+
+    def __len__(self):
+        return len(self.barang)
+
+    def __contains__(self, kunci):
+        return kunci in self._posisi
+
+    def cari(self, nama, kategori):
+        i = self._posisi.get((nama, kategori))
+        return None if i is None else self.barang[i]
+
+    def cari_sku(self, sku):
+        i = self._sku.get(sku)
+        return None if i is None else self.barang[i]
+
+    def daftar_kategori(self):
+        return sorted(self._per_kategori)
+
+    def nama_per_kategori(self, kategori):
+        return self._per_kategori.get(kategori, [])
+
+    def tambah(self, record):
+        self._posisi[(record["nama"], record["kategori"])] = len(self.barang)
+        self._per_kategori.setdefault(record["kategori"], []).append(record["nama"])
+        if record.get("sku"):
+            self._sku[record["sku"]] = len(self.barang)
+        self.barang.append(record)
+
+    def atur_sku(self, nama, kategori, sku):
+        i = self._posisi[(nama, kategori)]
+        lama = self.barang[i].get("sku")
+        if lama:
+            self._sku.pop(lama, None)
+        if sku:
+            self.barang[i]["sku"] = sku
+            self._sku[sku] = i
+        else:
+            self.barang[i].pop("sku", None)
+
+    def hapus(self, nama, kategori):
+        self.barang.pop(self._posisi[(nama, kategori)])
+        self._bangun_indeks()
+
+
+def katalog():
+    # Katalog dibangun sekali per versi data barang (objek cache baca_data berganti saat data berubah),
+    # disimpan per cabang
+    barang = baca_data(BARANG_FILE)
+    cabang = cabang_aktif()
+    with _kunci:
+        sumber, k = _cache.get(cabang, (None, None))
+        if sumber is not barang:
+            k = Katalog(barang)
+            _cache[cabang] = (barang, k)
+        return k
+
+
+def uraikan_scan(teks):
+    # "KODE1 3*KODE2, KODE3" -> [(1, "KODE1"), (3, "KODE2"), (1, "KODE3")], token tidak valid dipisah
+    hasil, salah = [], []
+    for token in teks.replace(",", " ").split():
+        qty, tanda, kode = token.rpartition("*")
+        if not tanda:
+            hasil.append((1, kode))
+        elif qty.isdigit() and int(qty) > 0 and kode:
+            hasil.append((int(qty), kode))
+        else:
+            salah.append(token)
+    return hasil, salah
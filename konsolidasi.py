@@ -0,0 +1,158 @@
+# konsolidasi.py
+# Laporan gabungan semua cabang. Rentang dipecah per (cabang, bulan) dan setiap
+# bagian diringkas di proses terpisah langsung dari data transaksi cabang itu,
+# lalu hasil parsialnya dijumlahkan, sehingga waktu hitung mengikuti jumlah core,
+# bukan total data. Hasil gabungan di-cache selama jumlah transaksi tiap cabang
+# tidak berubah.
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from penyimpanan import TRANSAKSI_FILE, daftar_cabang, iter_rentang, jumlah_data, pakai_cabang, rentang_waktu
+import ringkasan
+
+PEKERJA = int(os.environ.get("KASIR_KONSOLIDASI_WORKERS", str(os.cpu_count() or 2)))
+CACHE_MAKS = 32
+
+_kunci = threading.Lock()
+_pool = None
+_cache = OrderedDict()
+
+
+def _metrik():
+    return {"jumlah": 0, "pendapatan": 0, "qty": 0, "modal": 0}
+
+
+def _tambah(tujuan, sumber):
+    for k in tujuan:
+        tujuan[k] += sumber[k]
+
+
+def _ringkas_bagian(cabang, mulai, akhir):
+    # Dijalankan di proses pekerja: satu cabang, satu bulan
+    harian, kasir, produk = {}, {}, {}
+    with pakai_cabang(cabang):
+        for t in iter_rentang(TRANSAKSI_FILE, mulai, akhir):
+            qty = sum(item["qty"] for item in t["items"])
+            modal = sum(item.get("harga_modal", 0) * item["qty"] for item in t["items"])
+            m = {"jumlah": 1, "pendapatan": t["total"], "qty": qty, "modal": modal}
+            _tambah(harian.setdefault(t["waktu"][:10], _metrik()), m)
+            _tambah(kasir.setdefault(t["kasir"], _metrik()), m)
+            for item in t["items"]:
+                p = produk.setdefault((item["nama"], item["kategori"]), _metrik())
+                _tambah(p, {"jumlah": 1, "pendapatan": item["subtotal"], "qty": item["qty"],
+                            "modal": item.get("harga_modal", 0) * item["qty"]})
+    return cabang, harian, kasir, produk
+
+
+def _bagian_bulan(mulai, akhir):
+    while mulai <= akhir:
+        awal_berikut = (mulai.replace(day=1) + timedelta(days=32)).replace(day=1)
+        yield mulai, min(akhir, awal_berikut - timedelta(days=1))
+        mulai = awal_berikut
+
+
+def _pekerja():
+    # Proses di-spawn (bukan fork) karena proses Streamlit punya banyak thread aktif
+    global _pool
+    with _kunci:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PEKERJA, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _hitung(mulai, akhir, cabang):
+    tugas = []
+    for c in cabang:
+        with pakai_cabang(c):
+            awal, ujung = rentang_waktu(TRANSAKSI_FILE)
+        if awal is None:
+            continue
+        for a, b in _bagian_bulan(max(mulai, awal), min(akhir, ujung)):
+            tugas.append((c, a, b))
+
+    hasil = {"per_cabang": {c: _metrik() for c in cabang}, "harian": {}, "kasir": {}, "produk": {}}
+    if not tugas:
+        return hasil
+    for c, harian, kasir, produk in _pekerja().map(_ringkas_bagian, *zip(*tugas)):
+        for h, m in harian.items():
+            _tambah(hasil["per_cabang"][c], m)
+            _tambah(hasil["harian"].setdefault(h, _metrik()), m)
+        for k, m in kasir.items():
+            _tambah(hasil["kasir"].setdefault((c, k), _metrik()), m)
+        for p, m in produk.items():
+            _tambah(hasil["produk"].setdefault(p, _metrik()), m)
+    hasil["harian"] = dict(sorted(hasil["harian"].items()))
+    return hasil
+
+
+def versi():
+    # (cabang, jumlah transaksi) semua cabang; berubah setiap ada transaksi baru di cabang mana pun
+    hasil = []
+    for c in daftar_cabang():
+        with pakai_cabang(c):
+            hasil.append((c, jumlah_data(TRANSAKSI_FILE)))
+    return tuple(hasil)
+
+
+def gabungan(mulai, akhir):
+    # {"per_cabang": {cabang: metrik}, "harian": {"YYYY-MM-DD": metrik},
+    #  "kasir": {(cabang, kasir): metrik}, "produk": {(nama, kategori): metrik}}
+    v = versi()
+    kunci = (mulai, akhir, v)
+    with _kunci:
+        if kunci in _cache:
+            _cache.move_to_end(kunci)
+            return _cache[kunci]
+    hasil = _hitung(mulai, akhir, [c for c, _ in v])
+    with _kunci:
+        _cache[kunci] = hasil
+        while len(_cache) > CACHE_MAKS:
+            _cache.popitem(last=False)
+    return hasil
+
+
+def rentang():
+    # Tanggal transaksi pertama dan terakhir di semua cabang
+    awal, akhir = [], []
+    for c in daftar_cabang():
+        with pakai_cabang(c):
+            a, b = rentang_waktu(TRANSAKSI_FILE)
+        if a is not None:
+            awal.append(a)
+            akhir.append(b)
+    return (min(awal), max(akhir)) if awal else (None, None)
+
+
+def teratas(data, n=10, urut="qty"):
+    # Barang terlaris dari hasil gabungan(), urut = qty/pendapatan/margin
+    baris = [
+        {"nama": nama, "kategori": kategori, "qty": m["qty"], "pendapatan": m["pendapatan"],
+         "margin": m["pendapatan"] - m["modal"]}
+        for (nama, kategori), m in data["produk"].items()
+    ]
+    baris.sort(key=lambda r: -r[urut])
+    return baris[:n]
+
+
+def total():
+    # Total per cabang dari rekap masing-masing (tanpa pool, rekap sudah kecil)
+    hasil = {}
+    for c in daftar_cabang():
+        with pakai_cabang(c):
+            hasil[c] = ringkasan.total()
+    return hasil
+
+
+if __name__ == "__main__":
+    mulai, akhir = rentang()
+    if mulai is None:
+        print("Belum ada transaksi di cabang mana pun")
+    else:
+        data = gabungan(mulai, akhir)
+        for c, m in data["per_cabang"].items():
+            print(f"{c}: {m['jumlah']} transaksi, Rp {m['pendapatan']:,.0f}")
+        print(f"{len(data['harian'])} hari, {len(data['produk'])} produk ({mulai} - {akhir})")
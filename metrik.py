@@ -0,0 +1,156 @@
+# metrik.py
+# Instrumentasi ringan: span waktu (dan jumlah byte untuk I/O) dicatat per nama +
+# label, disimpan sebagai jendela bergulir di memori untuk persentil. Opsional
+# ditulis berkala ke file teks format Prometheus (untuk textfile collector
+# node_exporter) dan/atau log JSON per baris.
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Jumlah sampel terakhir per seri yang dipakai untuk persentil
+JENDELA = int(os.environ.get("KASIR_METRIK_JENDELA", "1000"))
+PROMETHEUS_FILE = os.environ.get("KASIR_METRIK_PROM")
+LOG_FILE = os.environ.get("KASIR_METRIK_LOG")
+INTERVAL_TULIS = float(os.environ.get("KASIR_METRIK_INTERVAL", "15"))
+KUANTIL = (0.5, 0.9, 0.99)
+
+_kunci = threading.Lock()
+_seri = {}
+_mulai = time.time()
+_penulis = None
+
+
+class _Seri:
+    __slots__ = ("durasi", "jumlah", "total", "byte", "maks")
+
+    def __init__(self):
+        self.durasi = deque(maxlen=JENDELA)
+        self.jumlah = 0
+        self.total = 0.0
+        self.byte = 0
+        self.maks = 0.0
+
+
+def catat(nama, durasi, byte=None, **label):
+    kunci = (nama, tuple(sorted(label.items())))
+    with _kunci:
+        s = _seri.get(kunci)
+        if s is None:
+            s = _seri[kunci] = _Seri()
+        s.durasi.append(durasi)
+        s.jumlah += 1
+        s.total += durasi
+        s.maks = max(s.maks, durasi)
+        if byte:
+            s.byte += byte
+    _pastikan_penulis()
+
+
+@contextmanager
+def span(nama, **label):
+    # Durasi dicatat juga saat blok keluar karena exception (mis. st.stop/st.rerun)
+    mulai = time.perf_counter()
+    try:
+        yield
+    finally:
+        catat(nama, time.perf_counter() - mulai, **label)
+
+
+def _kuantil(urut, q):
+    return urut[min(len(urut) - 1, int(q * len(urut)))]
+
+
+def ringkasan():
+    # Satu baris per seri: jumlah, total, persentil (detik) dari jendela terakhir, byte
+    with _kunci:
+        salinan = [(nama, label, list(s.durasi), s.jumlah, s.total, s.maks, s.byte)
+                   for (nama, label), s in _seri.items()]
+    hasil = []
+    for nama, label, durasi, jumlah, total, maks, byte in sorted(salinan):
+        urut = sorted(durasi)
+        baris = {"nama": nama, "label": dict(label), "jumlah": jumlah, "total_detik": total,
+                 "maks_detik": maks, "byte": byte}
+        for q in KUANTIL:
+            baris[f"p{int(q * 100)}_detik"] = _kuantil(urut, q) if urut else 0.0
+        hasil.append(baris)
+    return hasil
+
+
+def reset():
+    with _kunci:
+        _seri.clear()
+
+
+def _label_prom(label, **tambahan):
+    isi = dict(label, **tambahan)
+    if not isi:
+        return ""
+    bagian = []
+    for k, v in isi.items():
+        v = str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        bagian.append(f'{k}="{v}"')
+    return "{" + ",".join(bagian) + "}"
+
+
+def teks_prometheus():
+    baris = [
+        "# HELP kasir_durasi_detik Durasi span aplikasi kasir (jendela bergulir untuk kuantil)",
+        "# TYPE kasir_durasi_detik summary",
+    ]
+    data = ringkasan()
+    for r in data:
+        label = dict(span=r["nama"], **r["label"])
+        for q in KUANTIL:
+            baris.append(f"kasir_durasi_detik{_label_prom(label, quantile=q)} {r[f'p{int(q * 100)}_detik']:.6f}")
+        baris.append(f"kasir_durasi_detik_sum{_label_prom(label)} {r['total_detik']:.6f}")
+        baris.append(f"kasir_durasi_detik_count{_label_prom(label)} {r['jumlah']}")
+    baris += ["# HELP kasir_byte_total Byte yang dibaca/ditulis oleh span I/O",
+              "# TYPE kasir_byte_total counter"]
+    for r in data:
+        if r["byte"]:
+            baris.append(f"kasir_byte_total{_label_prom(dict(span=r['nama'], **r['label']))} {r['byte']}")
+    baris += ["# TYPE kasir_uptime_detik gauge", f"kasir_uptime_detik {time.time() - _mulai:.0f}"]
+    return "\n".join(baris) + "\n"
+
+
+def tulis_keluaran():
+    if PROMETHEUS_FILE:
+        # Ditulis atomik agar collector tidak membaca file setengah jadi
+        tmp = f"{PROMETHEUS_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(teks_prometheus())
+        os.replace(tmp, PROMETHEUS_FILE)
+    if LOG_FILE:
+        with open(LOG_FILE, "a") as f:
+            f.write(json.dumps({"waktu": time.time(), "pid": os.getpid(), "metrik": ringkasan()}) + "\n")
+
+
+def _ulang_tulis():
+    while True:
+        time.sleep(INTERVAL_TULIS)
+        try:
+            tulis_keluaran()
+        except OSError:
+            pass  # metrik tidak boleh mengganggu aplikasi
+
+
+def _pastikan_penulis():
+    global _penulis
+    if _penulis is None and (PROMETHEUS_FILE or LOG_FILE):
+        with _kunci:
+            if _penulis is None:
+                _penulis = threading.Thread(target=_ulang_tulis, daemon=True, name="metrik")
+                _penulis.start()
+
+
+@atexit.register
+def _tulis_saat_keluar():
+    if _penulis is not None:
+        try:
+            tulis_keluaran()
+        except OSError:
+            pass
@@ -0,0 +1,163 @@
+# operasi.py
+# Jalur simpan yang aman dipakai banyak kasir sekaligus: semua baca-cek-tulis
+# stok dan transaksi berjalan di dalam kunci_data(), dan file ditulis atomik
+# (file sementara + rename) oleh penyimpanan. Setiap perubahan stok dicatat ke
+# buku stok sebelum stoknya diubah.
+from datetime import datetime
+
+from katalog import Katalog
+from penyimpanan import (
+    BARANG_FILE, BARANG_HAPUS_FILE, TRANSAKSI_FILE,
+    append_data, cari_barang, id_produk, kunci_data, load_data, registri, save_data, transaksi, ubah_stok
+)
+import impor
+import metrik
+import ringkasan
+import stok
+
+
+class StokBerubahError(Exception):
+    # Stok di penyimpanan sudah berubah (dijual/dihapus sesi lain) sejak barang dipilih
+    def __init__(self, kurang):
+        self.kurang = kurang
+        daftar = ", ".join(f"{k['nama']} ({k['kategori']}): sisa {k['tersedia']}" for k in kurang)
+        super().__init__(f"Stok berubah: {daftar}")
+
+
+def _cek_stok(kebutuhan):
+    # Hanya barang yang dibutuhkan yang dibaca (SQLite: per kunci, bukan seluruh katalog)
+    barang = cari_barang(list(kebutuhan))
+    kurang = []
+    for (nama, kategori), qty in kebutuhan.items():
+        b = barang.get((nama, kategori))
+        tersedia = b["stok"] if b else 0
+        if tersedia < qty:
+            kurang.append({"nama": nama, "kategori": kategori, "diminta": qty, "tersedia": tersedia})
+    if kurang:
+        raise StokBerubahError(kurang)
+
+
+def commit_transaksi(keranjang, kasir, metode, bayar):
+    # fakta memuat NumPy; diimpor saat checkout pertama, bukan saat halaman Transaksi dibuka
+    import fakta
+
+    kebutuhan = {}
+    for item in keranjang:
+        kunci = (item["nama"], item["kategori"])
+        kebutuhan[kunci] = kebutuhan.get(kunci, 0) + item["qty"]
+    total = sum(item["subtotal"] for item in keranjang)
+
+    with metrik.span("checkout"), kunci_data():
+        # Stok dibaca ulang di dalam kunci; keranjang hanya disimpan jika stok masih cukup
+        _cek_stok(kebutuhan)
+        waktu = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        perubahan = [(nama, kategori, -qty) for (nama, kategori), qty in kebutuhan.items()]
+        transaksi_baru = {
+            "waktu": waktu,
+            "kasir": kasir,
+            "items": [dict(item) for item in keranjang],
+            "total": total,
+            "bayar": bayar if metode == "Cash" else total,
+            "kembalian": bayar - total if metode == "Cash" else 0,
+            "metode": metode
+        }
+        # Buku stok, stok dan transaksi tersimpan bersama atau tidak sama sekali; transaksi
+        # ditambahkan ke jurnal, bukan menulis ulang seluruh riwayat
+        with transaksi():
+            stok.catat(perubahan, "penjualan", kasir, f"Transaksi {waktu}")
+            ubah_stok(perubahan)
+            append_data(TRANSAKSI_FILE, transaksi_baru)
+        ringkasan.catat_transaksi(transaksi_baru)
+        fakta.catat_transaksi(transaksi_baru)
+    return transaksi_baru
+
+
+def tambah_barang(record, oleh=None):
+    with kunci_data():
+        barang = load_data(BARANG_FILE)
+        kat = Katalog(barang)
+        if (record["nama"], record["kategori"]) in kat:
+            return False
+        if record.get("sku") and kat.cari_sku(record["sku"]) is not None:
+            return False
+        stok.catat([(record["nama"], record["kategori"], record["stok"])], "barang_baru", oleh)
+        # ID produk tetap untuk format transaksi ringkas
+        record["id"] = id_produk(record["nama"], record["kategori"])
+        kat.tambah(record)
+        save_data(BARANG_FILE, barang)
+    return True
+
+
+def tambah_stok(nama, kategori, jumlah, oleh, keterangan=None):
+    # Restok barang yang sudah ada; False jika barang sudah tidak ada
+    with kunci_data():
+        if not cari_barang([(nama, kategori)]):
+            return False
+        stok.catat([(nama, kategori, jumlah)], "restok", oleh, keterangan)
+        ubah_stok([(nama, kategori, jumlah)])
+    return True
+
+
+def impor_barang(baris, lewati_error=False, oleh=None):
+    # Rencana dihitung ulang terhadap katalog terbaru di dalam kunci, lalu semua
+    # perubahan ditulis dengan satu save_data. Tidak ada yang ditulis jika ada error
+    # dan lewati_error False.
+    with kunci_data():
+        barang = load_data(BARANG_FILE)
+        kat = Katalog(barang)
+        rencana = impor.rencanakan(baris, kat)
+        if (rencana.error and not lewati_error) or not rencana.perubahan:
+            return rencana
+        stok.catat([(p["nama"], p["kategori"],
+                     p["sesudah"]["stok"] - (p["sebelum"]["stok"] if p["sebelum"] else 0))
+                    for p in rencana.perubahan], "impor", oleh, "Impor massal")
+        reg = registri()
+        for p in rencana.perubahan:
+            if p["aksi"] == "baru":
+                p["sesudah"]["id"] = reg.id(p["nama"], p["kategori"], simpan=False)
+                kat.tambah(p["sesudah"])
+            else:
+                b = kat.cari(p["nama"], p["kategori"])
+                sku = p["sesudah"].get("sku")
+                if sku != b.get("sku"):
+                    kat.atur_sku(p["nama"], p["kategori"], sku)
+                b.update(p["sesudah"])
+        reg.simpan()
+        save_data(BARANG_FILE, barang)
+        rencana.diterapkan = True
+    return rencana
+
+
+def atur_sku(nama, kategori, sku):
+    with kunci_data():
+        barang = load_data(BARANG_FILE)
+        kat = Katalog(barang)
+        pemilik = kat.cari_sku(sku) if sku else None
+        if pemilik is not None and (pemilik["nama"], pemilik["kategori"]) != (nama, kategori):
+            return False
+        kat.atur_sku(nama, kategori, sku)
+        save_data(BARANG_FILE, barang)
+    return True
+
+
+def hapus_barang(nama, kategori, jumlah, keterangan, oleh, tanggal):
+    with kunci_data():
+        _cek_stok({(nama, kategori): jumlah})
+        b = cari_barang([(nama, kategori)])[(nama, kategori)]
+        data_dihapus = dict(b)
+        data_dihapus.update({
+            "jumlah_dihapus": jumlah,
+            "keterangan": keterangan,
+            "tanggal_dihapus": tanggal,
+            "dihapus_oleh": oleh
+        })
+        stok.catat([(nama, kategori, -jumlah)], "hapus", oleh, keterangan)
+
+        if jumlah == b["stok"]:
+            kat = Katalog(load_data(BARANG_FILE))
+            kat.hapus(nama, kategori)
+            save_data(BARANG_FILE, kat.barang)
+        else:
+            ubah_stok([(nama, kategori, -jumlah)])
+        append_data(BARANG_HAPUS_FILE, data_dihapus)
+    return data_dihapus
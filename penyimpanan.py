@@ -0,0 +1,1580 @@
+# penyimpanan.py
+# Modul ini diimpor (bukan dijalankan ulang) oleh Streamlit, sehingga kunci,
+# penghitung, koneksi dan thread kompaksi di sini berlaku untuk seluruh proses.
+import argparse
+import contextvars
+import gzip
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import date, timedelta
+from types import MappingProxyType
+
+import metrik
+import skema
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya kunci antar-thread
+    fcntl = None
+
+AKUN_FILE = "akun.json"
+BARANG_FILE = "barang.json"
+TRANSAKSI_FILE = "transaksi.json"
+BARANG_HAPUS_FILE = "barang_dihapus.json"
+MUTASI_FILE = "mutasi_stok.json"
+# Registri ID produk tetap, dipakai format transaksi ringkas (skema.py)
+PRODUK_FILE = "produk.json"
+KUNCI_FILE = "kasir.lock"
+# Log pembatalan transaksi JSON yang sedang berjalan, lihat PenyimpananJson.transaksi
+BATAL_FILE = "kasir.batal"
+
+# "json" (default) atau "sqlite"
+STORAGE = os.environ.get("KASIR_STORAGE", "json")
+# Path relatif dibuka di direktori masing-masing cabang
+DB_FILE = os.environ.get("KASIR_DB", "kasir.db")
+
+# Jumlah baris jurnal sebelum snapshot dipadatkan di latar belakang
+BATAS_KOMPAKSI = int(os.environ.get("KASIR_BATAS_KOMPAKSI", "500"))
+
+# Kolom waktu untuk data yang bisa difilter per rentang tanggal; di backend JSON
+# data ini disimpan per bulan (transaksi/2024-05.json) dengan manifest.json
+KOLOM_WAKTU = {
+    TRANSAKSI_FILE: "waktu",
+    BARANG_HAPUS_FILE: "tanggal_dihapus",
+    MUTASI_FILE: "waktu",
+}
+VERSI_PARTISI = 1
+
+# Arsip: partisi bulan yang sudah tutup dipadatkan menjadi segmen gzip (transaksi/2024-05.json.gz,
+# header ringkasan lalu satu record per baris). BULAN_TERBUKA bulan terakhir tetap berupa
+# partisi biasa; segmen hanya didekompres saat rentang yang dibaca mencapainya.
+BULAN_TERBUKA = int(os.environ.get("KASIR_BULAN_TERBUKA", "1"))
+ARSIP_OTOMATIS = os.environ.get("KASIR_ARSIP_OTOMATIS", "1") == "1"
+VERSI_ARSIP = 1
+
+# Cabang: setiap cabang punya direktori data sendiri di CABANG_DIR/<nama>; data di
+# direktori kerja tetap dipakai sebagai cabang PUSAT. Akun (AKUN_FILE) berlaku untuk
+# semua cabang. Cabang aktif disimpan di contextvar, jadi setiap sesi/thread Streamlit
+# bisa bekerja di cabang berbeda dalam satu proses.
+CABANG_DIR = os.environ.get("KASIR_CABANG_DIR", "cabang")
+PUSAT = "Pusat"
+_cabang = contextvars.ContextVar("cabang", default=PUSAT)
+
+# Kunci data: RLock antar-thread + flock pada KUNCI_FILE antar-proses.
+# Semua baca-ubah-tulis dan langkah kritis jurnal/kompaksi berjalan di dalamnya.
+_kunci_proses = threading.RLock()
+_kedalaman_kunci = 0
+_file_kunci = None
+_jumlah_jurnal = {}
+_thread_kompaksi = {}
+_thread_arsip = {}
+
+# Cache baca: path -> (cap file, data beku). Data beku dibagi ke semua sesi,
+# sehingga halaman hanya menerima salinan atau tampilan yang tidak bisa diubah.
+_kunci_cache = threading.Lock()
+_cache = {}
+_statistik_cache = {"hit": 0, "miss": 0}
+
+# Indeks waktu per partisi dan gabungan semua partisi, berlaku selama objek cache sama
+_cache_indeks_waktu = {}
+_gabungan = {}
+_manifest_diperiksa = set()
+
+# Indeks username -> akun, dibangun ulang hanya saat objek cache akun berganti
+_indeks_akun = (None, {})
+# Per file barang: (objek cache, {(nama, kategori): posisi}), sama seperti indeks akun
+_indeks_barang = {}
+# Baris jurnal barang berisi selisih stok, bukan record baru: {UBAH_STOK: [[nama, kategori, selisih], ...]}
+UBAH_STOK = "_ubah_stok"
+
+
+@contextmanager
+def kunci_data():
+    global _kedalaman_kunci, _file_kunci
+    with _kunci_proses:
+        if _kedalaman_kunci == 0 and fcntl is not None:
+            _file_kunci = open(KUNCI_FILE, "a")
+            fcntl.flock(_file_kunci, fcntl.LOCK_EX)
+        _kedalaman_kunci += 1
+        try:
+            # Transaksi yang terputus karena prosesnya mati dibatalkan sebelum data dipakai lagi
+            if _kedalaman_kunci == 1 and os.path.exists(BATAL_FILE):
+                _pulihkan()
+            yield
+        finally:
+            _kedalaman_kunci -= 1
+            if _kedalaman_kunci == 0 and _file_kunci is not None:
+                fcntl.flock(_file_kunci, fcntl.LOCK_UN)
+                _file_kunci.close()
+                _file_kunci = None
+
+
+def _pulihkan():
+    baris = _parse_jurnal(_baca_teks(BATAL_FILE))
+    if baris:
+        PenyimpananJson(baris[0]["direktori"])._batalkan(baris[1:])
+    os.remove(BATAL_FILE)
+
+
+def _indent(file):
+    # Partisi bulanan ditulis tanpa indentasi; file kecil lain tetap mudah dibaca
+    return None if re.fullmatch(r"\d{4}-\d{2}\.json", os.path.basename(file)) else 2
+
+
+def _path_jurnal(file):
+    return os.path.splitext(file)[0] + ".jsonl"
+
+
+def _path_kompaksi(file):
+    return _path_jurnal(file) + ".kompaksi"
+
+
+def _jenis_file(path):
+    # Label metrik per penyimpanan logis (barang, transaksi, snapshot_stok, arsip, ...), bukan per
+    # path: partisi bulanan, segmen arsip dan snapshot bertanggal akan menambah seri tanpa batas
+    if path.endswith(".gz"):
+        return "arsip"
+    bagian = os.path.normpath(path).split(os.sep)
+    awalan = os.path.normpath(CABANG_DIR).split(os.sep)
+    if bagian[:len(awalan)] == awalan:
+        bagian = bagian[len(awalan) + 1:]
+    return bagian[0].split(".")[0]
+
+
+def _baca_teks(path):
+    if not os.path.exists(path):
+        return ""
+    mulai = time.perf_counter()
+    with open(path, "r") as f:
+        teks = f.read()
+    metrik.catat("io_baca", time.perf_counter() - mulai, byte=len(teks), file=_jenis_file(path))
+    return teks
+
+
+def _parse_jurnal(teks):
+    hasil = []
+    baris = teks.splitlines()
+    for i, b in enumerate(baris):
+        if not b.strip():
+            continue
+        try:
+            hasil.append(json.loads(b))
+        except json.JSONDecodeError:
+            # Baris terakhir bisa terpotong jika proses mati saat append
+            if i == len(baris) - 1:
+                break
+            raise
+    return hasil
+
+
+def _terapkan_jurnal(data, records):
+    # Record jurnal ditambahkan ke data; baris UBAH_STOK mengubah stok barang yang sudah ada.
+    # Barang yang sudah dihapus (tidak ada di data) dilewati.
+    posisi = None
+    for r in records:
+        if not (isinstance(r, dict) and UBAH_STOK in r):
+            data.append(r)
+            if posisi is not None:
+                posisi[(r["nama"], r["kategori"])] = len(data) - 1
+            continue
+        if posisi is None:
+            posisi = {(b["nama"], b["kategori"]): i for i, b in enumerate(data)}
+        for nama, kategori, selisih in r[UBAH_STOK]:
+            i = posisi.get((nama, kategori))
+            if i is not None:
+                data[i]["stok"] += selisih
+    return data
+
+
+def _posisi_barang(file, data):
+    # {(nama, kategori): posisi} untuk objek data barang ini, dibangun sekali per objek cache
+    with _kunci_cache:
+        sumber, posisi = _indeks_barang.get(file, (None, None))
+        if sumber is not data:
+            posisi = {(b["nama"], b["kategori"]): i for i, b in enumerate(data)}
+            _indeks_barang[file] = (data, posisi)
+        return posisi
+
+
+def _terapkan_cache(file, data, records):
+    # Write-through untuk data beku di cache: record baru disambung, selisih stok mengganti
+    # record barangnya saja. Indeks posisi dipakai ulang oleh objek baru, tanpa dibangun ulang.
+    if not any(isinstance(r, MappingProxyType) and UBAH_STOK in r for r in records):
+        return data + tuple(records)
+    hasil = list(data)
+    posisi = _posisi_barang(file, data)
+    disalin = False
+    for r in records:
+        if UBAH_STOK not in r:
+            # Indeks disalin sebelum ditambah agar pemakai objek lama tidak melihat posisi baru
+            if not disalin:
+                posisi, disalin = dict(posisi), True
+            posisi[(r["nama"], r["kategori"])] = len(hasil)
+            hasil.append(r)
+            continue
+        for nama, kategori, selisih in r[UBAH_STOK]:
+            i = posisi.get((nama, kategori))
+            if i is not None:
+                hasil[i] = MappingProxyType(dict(hasil[i], stok=hasil[i]["stok"] + selisih))
+    hasil = tuple(hasil)
+    with _kunci_cache:
+        _indeks_barang[file] = (hasil, posisi)
+    return hasil
+
+
+def _tulis_atomik(file, data, indent=2):
+    mulai = time.perf_counter()
+    tmp = f"{file}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+        ukuran = f.tell()
+    os.replace(tmp, file)
+    metrik.catat("io_tulis", time.perf_counter() - mulai, byte=ukuran, file=_jenis_file(file))
+
+
+def _cap_file(file):
+    cap = []
+    for path in (file, _path_kompaksi(file), _path_jurnal(file)):
+        try:
+            st = os.stat(path)
+            cap.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            cap.append(None)
+    return tuple(cap)
+
+
+def _beku(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _beku(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_beku(v) for v in obj)
+    return obj
+
+
+def _cair(obj):
+    if isinstance(obj, skema.Rekaman):
+        return obj.ke_dict()
+    if isinstance(obj, MappingProxyType):
+        return {k: _cair(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [_cair(v) for v in obj]
+    return obj
+
+
+def _simpan_cache(file, cap, data):
+    with _kunci_cache:
+        _cache[file] = (cap, data)
+
+
+def statistik_cache():
+    with _kunci_cache:
+        return dict(_statistik_cache, entri=len(_cache))
+
+
+def hapus_cache(file=None):
+    with _kunci_cache:
+        if file is None:
+            _cache.clear()
+        else:
+            _cache.pop(file, None)
+
+
+def _batas_rentang(mulai, akhir):
+    bawah = mulai.isoformat() if mulai else None
+    atas = (akhir + timedelta(days=1)).isoformat() if akhir else None
+    return bawah, atas
+
+
+def _ke_tanggal(waktu):
+    return date.fromisoformat(waktu[:10]) if waktu else None
+
+
+def _dir_partisi(file):
+    return os.path.splitext(file)[0]
+
+
+def _path_partisi(file, bulan):
+    return os.path.join(_dir_partisi(file), f"{bulan}.json")
+
+
+def _path_arsip(file, bulan):
+    return _path_partisi(file, bulan) + ".gz"
+
+
+def _bulan_tutup(bulan_terbuka):
+    # Bulan (YYYY-MM) pertama yang masih terbuka; bulan sebelumnya boleh diarsipkan
+    hari = date.today().replace(day=1)
+    for _ in range(bulan_terbuka - 1):
+        hari = (hari - timedelta(days=1)).replace(day=1)
+    return hari.strftime("%Y-%m")
+
+
+def _tulis_arsip(path, header, data):
+    mulai = time.perf_counter()
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    teks = "".join([json.dumps(header) + "\n"] + [json.dumps(r, separators=(",", ":")) + "\n" for r in data])
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(teks.encode(), mtime=0))
+        f.flush()
+        os.fsync(f.fileno())
+        ukuran = f.tell()
+    metrik.catat("io_tulis", time.perf_counter() - mulai, byte=ukuran, file=_jenis_file(path))
+    return tmp
+
+
+def header_arsip(path):
+    # Baris pertama segmen; hanya awal file yang didekompres
+    with gzip.open(path, "rt") as f:
+        return json.loads(f.readline())
+
+
+def _path_manifest(file):
+    return os.path.join(_dir_partisi(file), "manifest.json")
+
+
+def _daftar_partisi(file):
+    # Bulan yang punya file partisi di disk (snapshot atau jurnal saja)
+    folder = _dir_partisi(file)
+    if not os.path.isdir(folder):
+        return []
+    bulan = set()
+    for nama in os.listdir(folder):
+        dasar = nama.split(".", 1)[0]
+        if (nama != "manifest.json" and len(dasar) == 7 and dasar[4] == "-"
+                and nama.endswith((".json", ".jsonl", ".kompaksi", ".json.gz"))):
+            bulan.add(dasar)
+    return sorted(bulan)
+
+
+def jadwalkan_kompaksi(file):
+    t = _thread_kompaksi.get(file)
+    if t is not None and t.is_alive():
+        return t
+    t = threading.Thread(target=kompaksi, args=(file,), daemon=True, name=f"kompaksi-{file}")
+    _thread_kompaksi[file] = t
+    t.start()
+    return t
+
+
+def kompaksi(file):
+    # Jurnal aktif dipindahkan agar kasir lain tetap bisa append selama snapshot ditulis
+    with kunci_data():
+        path = _path_jurnal(file)
+        path_kompaksi = _path_kompaksi(file)
+        if not os.path.exists(path_kompaksi):
+            if not os.path.exists(path):
+                return
+            os.replace(path, path_kompaksi)
+        _jumlah_jurnal[file] = 0
+        snapshot_awal = _cap_file(file)[0]
+        snapshot = _baca_teks(file)
+        teks_kompaksi = _baca_teks(path_kompaksi)
+
+    data = _terapkan_jurnal(json.loads(snapshot) if snapshot.strip() else [], _parse_jurnal(teks_kompaksi))
+    tmp = f"{file}.kompaksi.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=_indent(file))
+        f.flush()
+        os.fsync(f.fileno())
+
+    with kunci_data():
+        # Jika save_data atau kompaksi lain sudah mengganti snapshot, hasil ini dibuang
+        cap_lama = _cap_file(file)
+        if cap_lama[0] != snapshot_awal or cap_lama[1] is None:
+            os.remove(tmp)
+            return
+        os.replace(tmp, file)
+        os.remove(path_kompaksi)
+        # Isi tidak berubah, cukup perbarui cap agar cache tetap berlaku
+        with _kunci_cache:
+            entri = _cache.get(file)
+            if entri is not None and entri[0] == cap_lama:
+                _cache[file] = (_cap_file(file), entri[1])
+
+
+class RegistriProduk:
+    # ID produk tetap: (nama, kategori) -> id. Tidak pernah dihapus walau barangnya dihapus,
+    # sehingga transaksi lama tetap bisa diuraikan. File dibaca ulang jika diubah proses lain.
+
+    def __init__(self, path):
+        self.path = path
+        self._kunci = threading.Lock()
+        self._cap = None
+        self._nama = {}
+        self._id = {}
+        self._kotor = False
+
+    def _muat(self):
+        try:
+            st = os.stat(self.path)
+            cap = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            cap = None
+        if cap == self._cap or self._kotor:
+            return
+        with open(self.path) as f:
+            daftar = json.load(f)["produk"]
+        for id_produk, nama, kategori in daftar:
+            if id_produk not in self._nama:
+                kunci = (sys.intern(nama), sys.intern(kategori))
+                self._nama[id_produk] = kunci
+                self._id[kunci] = id_produk
+        self._cap = cap
+
+    def cari(self, nama, kategori):
+        # Entri tidak pernah diubah atau dihapus, jadi yang sudah ada dibaca tanpa kunci
+        id_produk = self._id.get((nama, kategori))
+        if id_produk is None:
+            with self._kunci:
+                self._muat()
+                id_produk = self._id.get((nama, kategori))
+        return id_produk
+
+    def nama(self, id_produk):
+        kunci = self._nama.get(id_produk)
+        if kunci is None:
+            with self._kunci:
+                self._muat()
+                kunci = self._nama.get(id_produk, (f"#{id_produk}", "?"))
+        return kunci
+
+    def id(self, nama, kategori, simpan=True):
+        # Dibuat jika belum ada; simpan=False untuk banyak produk sekaligus, lalu simpan()
+        # di dalam kunci_data yang sama dengan alokasinya
+        with kunci_data(), self._kunci:
+            self._muat()
+            id_produk = self._id.get((nama, kategori))
+            if id_produk is None:
+                id_produk = max(self._nama, default=0) + 1
+                kunci = (sys.intern(nama), sys.intern(kategori))
+                self._nama[id_produk] = kunci
+                self._id[kunci] = id_produk
+                self._kotor = True
+        if simpan:
+            self.simpan()
+        return id_produk
+
+    def simpan(self):
+        with kunci_data(), self._kunci:
+            if not self._kotor:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            _tulis_atomik(self.path, {"versi": 1, "produk": [[i, n, k] for i, (n, k) in sorted(self._nama.items())]},
+                          indent=None)
+            st = os.stat(self.path)
+            self._cap = (st.st_mtime_ns, st.st_size)
+            self._kotor = False
+
+
+_registri = {}
+
+
+def registri(direktori=None):
+    # Registri produk per direktori cabang (default cabang aktif)
+    direktori = direktori_cabang() if direktori is None else direktori
+    with _kunci_cache:
+        r = _registri.get(direktori)
+        if r is None:
+            r = _registri[direktori] = RegistriProduk(os.path.join(direktori, PRODUK_FILE))
+        return r
+
+
+def id_produk(nama, kategori):
+    return registri().id(nama, kategori)
+
+
+class PenyimpananJson:
+    # File JSON berisi list, ditambah jurnal append-only per file. Data berwaktu
+    # (KOLOM_WAKTU) dipecah per bulan menjadi partisi dengan manifest batas waktu.
+    # Nama file di method publik relatif terhadap direktori cabang backend ini.
+
+    def __init__(self, direktori=""):
+        self.direktori = direktori
+        self._lokal = threading.local()
+
+    def _path(self, file):
+        return os.path.join(self.direktori, file)
+
+    @contextmanager
+    def transaksi(self):
+        # Append di dalamnya tersimpan semua atau tidak sama sekali. Sebelum jurnal dan manifest
+        # diubah, ukuran jurnal dan bulan manifestnya dicatat (fsync) ke BATAL_FILE. Jika terjadi
+        # exception, atau proses mati lalu kunci_data berikutnya menemukan file itu, jurnal dipotong
+        # kembali dan manifest dihitung ulang. save() penuh di dalamnya tidak ikut dibatalkan.
+        if getattr(self._lokal, "batal", None) is not None:
+            yield
+            return
+        with kunci_data():
+            self._lokal.batal = []
+            try:
+                yield
+            except BaseException:
+                # Jika pembatalan sendiri gagal, BATAL_FILE tetap ada dan dicoba lagi oleh kunci_data
+                batal, self._lokal.batal = self._lokal.batal, None
+                self._batalkan(batal)
+                if os.path.exists(BATAL_FILE):
+                    os.remove(BATAL_FILE)
+                raise
+            self._lokal.batal = None
+            if os.path.exists(BATAL_FILE):
+                os.remove(BATAL_FILE)
+
+    def _catat_batal(self, entri):
+        # Di dalam kunci_data, sebelum file yang dicatat diubah; di luar transaksi() tidak dicatat
+        batal = getattr(self._lokal, "batal", None)
+        if batal is None:
+            return
+        baris = entri if batal else [{"direktori": self.direktori}] + entri
+        with open(BATAL_FILE, "a") as f:
+            f.write("".join(json.dumps(b) + "\n" for b in baris))
+            f.flush()
+            os.fsync(f.fileno())
+        batal.extend(entri)
+
+    def _batalkan(self, entri):
+        # Di dalam kunci_data: jurnal dipotong ke ukuran sebelum transaksi, lalu bulan manifest yang
+        # disentuh dihitung ulang dari partisinya
+        for e in reversed(entri):
+            if "jurnal" in e:
+                path = _path_jurnal(e["jurnal"])
+                if e["ukuran"] is None:
+                    if os.path.exists(path):
+                        os.remove(path)
+                elif os.path.exists(path) and os.path.getsize(path) > e["ukuran"]:
+                    os.truncate(path, e["ukuran"])
+                hapus_cache(e["jurnal"])
+                _jumlah_jurnal.pop(e["jurnal"], None)
+        for e in entri:
+            if "manifest" in e:
+                file = e["manifest"]
+                hapus_cache(_path_manifest(file))
+                partisi = _cair(self._manifest(file))
+                for bulan in e["bulan"]:
+                    partisi.pop(bulan, None)
+                    if self._ada_partisi(file, bulan) or os.path.exists(_path_arsip(file, bulan)):
+                        partisi.update(self._hitung_manifest(file, [bulan]))
+                self._tulis_manifest(file, partisi)
+
+    def _kodek(self, path):
+        # Partisi transaksi memakai format ringkas skema.py; file lain disimpan apa adanya
+        return os.path.abspath(os.path.dirname(path)) == os.path.abspath(_dir_partisi(self._path(TRANSAKSI_FILE)))
+
+    def _uraikan(self, path, data):
+        if not self._kodek(path):
+            return _beku(data)
+        reg = registri(self.direktori)
+        return tuple(skema.baca_transaksi(r, reg) for r in data)
+
+    def _kode(self, path, data):
+        # Baris untuk ditulis ke disk; ID produk baru disimpan sebelum datanya ditulis.
+        # Alokasi dan simpan registri dalam satu kunci_data agar proses lain tidak
+        # memberikan ID yang sama (juga saat dipanggil dari arsipkan di luar kunci).
+        if not self._kodek(path):
+            return data
+        reg = registri(self.direktori)
+        with kunci_data():
+            baris = [skema.kode_transaksi(r, lambda n, k: reg.id(n, k, simpan=False)) for r in data]
+            reg.simpan()
+        return baris
+
+    def _kodekan(self, path, data):
+        # -> (baris di disk, data di memori)
+        baris = self._kode(path, data)
+        return baris, self._uraikan(path, baris)
+
+    def _baca_file(self, file):
+        if not os.path.exists(file):
+            os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+            with open(file, "w") as f:
+                json.dump([], f)
+        # Snapshot dan jurnal dibaca bersamaan agar tidak bertabrakan dengan kompaksi
+        with kunci_data():
+            cap = _cap_file(file)
+            with _kunci_cache:
+                entri = _cache.get(file)
+                if entri is not None and entri[0] == cap:
+                    _statistik_cache["hit"] += 1
+                    return entri[1]
+                _statistik_cache["miss"] += 1
+            snapshot = _baca_teks(file)
+            kompaksi = _baca_teks(_path_kompaksi(file))
+            jurnal = _baca_teks(_path_jurnal(file))
+        data = json.loads(snapshot) if snapshot.strip() else []
+        data = _terapkan_jurnal(data, _parse_jurnal(kompaksi) + _parse_jurnal(jurnal))
+        data = self._uraikan(file, data)
+        _simpan_cache(file, cap, data)
+        return data
+
+    def _save_file(self, file, data):
+        # Snapshot penuh menggantikan jurnal yang ada
+        with kunci_data():
+            baris, data = self._kodekan(file, data)
+            _tulis_atomik(file, baris, _indent(file))
+            for path in (_path_jurnal(file), _path_kompaksi(file)):
+                if os.path.exists(path):
+                    os.remove(path)
+            _jumlah_jurnal[file] = 0
+            _simpan_cache(file, _cap_file(file), data)
+
+    def _append_file(self, file, records, batal=()):
+        # Beberapa record sekaligus: satu tulis dan satu fsync jurnal. batal = entri log pembatalan
+        # lain yang dicatat bersama ukuran jurnal ini (lihat transaksi)
+        with kunci_data():
+            kode, records = self._kodekan(file, records)
+            baris = "".join(json.dumps(k, separators=(",", ":")) + "\n" for k in kode)
+            path = _path_jurnal(file)
+            self._catat_batal(list(batal) + [
+                {"jurnal": file, "ukuran": os.path.getsize(path) if os.path.exists(path) else None}])
+            if file not in _jumlah_jurnal:
+                _jumlah_jurnal[file] = len(_parse_jurnal(_baca_teks(path)))
+            cap_lama = _cap_file(file)
+            mulai = time.perf_counter()
+            with open(path, "a") as f:
+                f.write(baris)
+                f.flush()
+                os.fsync(f.fileno())
+            metrik.catat("io_append", time.perf_counter() - mulai, byte=len(baris), file=_jenis_file(path))
+            _jumlah_jurnal[file] += len(records)
+            # Write-through: record baru ditambahkan ke data yang sudah di-cache
+            with _kunci_cache:
+                entri = _cache.get(file)
+            if entri is not None and entri[0] == cap_lama:
+                _simpan_cache(file, _cap_file(file), _terapkan_cache(file, entri[1], records))
+            else:
+                hapus_cache(file)
+            perlu_kompaksi = _jumlah_jurnal[file] >= BATAS_KOMPAKSI
+        if perlu_kompaksi:
+            jadwalkan_kompaksi(file)
+
+    def _baca_arsip(self, path):
+        st = os.stat(path)
+        cap = (st.st_mtime_ns, st.st_size)
+        with _kunci_cache:
+            entri = _cache.get(path)
+            if entri is not None and entri[0] == cap:
+                _statistik_cache["hit"] += 1
+                return entri[1]
+            _statistik_cache["miss"] += 1
+        mulai = time.perf_counter()
+        with gzip.open(path, "rt") as f:
+            f.readline()
+            data = [json.loads(b) for b in f]
+        metrik.catat("io_baca", time.perf_counter() - mulai, byte=cap[1], file=_jenis_file(path))
+        data = self._uraikan(path, data)
+        _simpan_cache(path, cap, data)
+        return data
+
+    def _baca_bulan(self, file, bulan, arsip):
+        if arsip:
+            return self._baca_arsip(_path_arsip(file, bulan))
+        return self._baca_file(_path_partisi(file, bulan))
+
+    def _ada_partisi(self, file, bulan):
+        path = _path_partisi(file, bulan)
+        return any(os.path.exists(p) for p in (path, _path_jurnal(path), _path_kompaksi(path)))
+
+    def _manifest(self, file):
+        # Manifest partisi: bulan -> {min, max, jumlah[, arsip]}; dibuat dari file lama saat pertama dipakai
+        path = _path_manifest(file)
+        with kunci_data():
+            if not os.path.exists(path):
+                self._bagi_partisi(file)
+            st = os.stat(path)
+            cap = (st.st_mtime_ns, st.st_size)
+            with _kunci_cache:
+                entri = _cache.get(path)
+                if entri is not None and entri[0] == cap:
+                    return entri[1]
+            with open(path) as f:
+                partisi = json.load(f)["partisi"]
+            # Sekali per proses: partisi yang ada di disk tapi tidak tercatat (mis. mati di
+            # antara append dan tulis manifest) membuat manifest dihitung ulang
+            if path not in _manifest_diperiksa:
+                _manifest_diperiksa.add(path)
+                if set(_daftar_partisi(file)) != set(partisi):
+                    partisi = self._tulis_manifest(file, self._hitung_manifest(file, _daftar_partisi(file)))
+                    return partisi
+            partisi = _beku(partisi)
+            _simpan_cache(path, cap, partisi)
+            return partisi
+
+    def _hitung_manifest(self, file, daftar_bulan):
+        kolom = KOLOM_WAKTU[os.path.basename(file)]
+        partisi = {}
+        for bulan in daftar_bulan:
+            # Partisi biasa menang jika arsip dan partisi sama-sama ada (proses mati di tengah arsip/buka)
+            if not self._ada_partisi(file, bulan):
+                h = header_arsip(_path_arsip(file, bulan))
+                partisi[bulan] = {"min": h["min"], "max": h["max"], "jumlah": h["jumlah"], "arsip": True}
+                continue
+            waktu = [r[kolom] for r in self._baca_file(_path_partisi(file, bulan))]
+            if waktu:
+                partisi[bulan] = {"min": min(waktu), "max": max(waktu), "jumlah": len(waktu)}
+        return partisi
+
+    def _tulis_manifest(self, file, partisi):
+        path = _path_manifest(file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _tulis_atomik(path, {"versi": VERSI_PARTISI, "partisi": partisi}, indent=None)
+        st = os.stat(path)
+        partisi = _beku(partisi)
+        _simpan_cache(path, (st.st_mtime_ns, st.st_size), partisi)
+        return partisi
+
+    def _bagi_partisi(self, file):
+        # Dijalankan di dalam kunci_data: file lama (snapshot + jurnal) dipecah per bulan,
+        # lalu disimpan sebagai cadangan *.pra-partisi
+        data = self._baca_file(file) if os.path.exists(file) or os.path.exists(_path_jurnal(file)) else ()
+        self._save_partisi(file, _cair(data))
+        for path in (file, _path_kompaksi(file), _path_jurnal(file)):
+            if os.path.exists(path):
+                os.replace(path, path + ".pra-partisi")
+        hapus_cache(file)
+
+    def _save_partisi(self, file, data):
+        kolom = KOLOM_WAKTU[os.path.basename(file)]
+        per_bulan = {}
+        for r in data:
+            per_bulan.setdefault(r[kolom][:7], []).append(r)
+        for bulan in _daftar_partisi(file):
+            if bulan not in per_bulan:
+                path = _path_partisi(file, bulan)
+                for p in (path, _path_jurnal(path), _path_kompaksi(path)):
+                    if os.path.exists(p):
+                        os.remove(p)
+                hapus_cache(path)
+        os.makedirs(_dir_partisi(file), exist_ok=True)
+        for bulan, isi in per_bulan.items():
+            isi.sort(key=lambda r: r[kolom])
+            self._save_file(_path_partisi(file, bulan), isi)
+        # Simpan penuh menulis semua bulan sebagai partisi biasa; arsip dibuat ulang oleh arsipkan()
+        for bulan in _daftar_partisi(file):
+            if os.path.exists(_path_arsip(file, bulan)):
+                os.remove(_path_arsip(file, bulan))
+                hapus_cache(_path_arsip(file, bulan))
+        return self._tulis_manifest(file, {
+            bulan: {"min": isi[0][kolom], "max": isi[-1][kolom], "jumlah": len(isi)}
+            for bulan, isi in per_bulan.items()
+        })
+
+    def _indeks_waktu(self, path, data, kolom):
+        # Kunci waktu terurut per partisi untuk bisect; urutan None jika data sudah urut
+        with _kunci_cache:
+            entri = _cache_indeks_waktu.get(path)
+        if entri is not None and entri[0] is data:
+            return entri[1], entri[2]
+        kunci = [r[kolom] for r in data]
+        urutan = None
+        if any(kunci[i] > kunci[i + 1] for i in range(len(kunci) - 1)):
+            urutan = sorted(range(len(kunci)), key=kunci.__getitem__)
+            kunci = [kunci[i] for i in urutan]
+        with _kunci_cache:
+            _cache_indeks_waktu[path] = (data, kunci, urutan)
+        return kunci, urutan
+
+    def baca(self, file):
+        if file not in KOLOM_WAKTU:
+            return self._baca_file(self._path(file))
+        file = self._path(file)
+        with kunci_data():
+            bagian = [self._baca_bulan(file, b, m.get("arsip")) for b, m in sorted(self._manifest(file).items())]
+        # Gabungan semua partisi di-cache selama tidak ada partisi yang berganti
+        with _kunci_cache:
+            entri = _gabungan.get(file)
+            if entri is not None and len(entri[0]) == len(bagian) and all(
+                    a is b for a, b in zip(entri[0], bagian)):
+                return entri[1]
+        data = tuple(r for isi in bagian for r in isi)
+        with _kunci_cache:
+            _gabungan[file] = (bagian, data)
+        return data
+
+    def load(self, file):
+        return _cair(self.baca(file))
+
+    def save(self, file, data):
+        if file not in KOLOM_WAKTU:
+            self._save_file(self._path(file), data)
+            return
+        file = self._path(file)
+        with kunci_data():
+            self._manifest(file)
+            self._save_partisi(file, data)
+
+    def append(self, file, record):
+        self.append_banyak(file, [record])
+
+    def append_banyak(self, file, records):
+        # Per bulan satu tulis jurnal, dan manifest ditulis sekali untuk semua record
+        if file not in KOLOM_WAKTU:
+            self._append_file(self._path(file), records)
+            return
+        nama_file = file
+        kolom = KOLOM_WAKTU[file]
+        file = self._path(file)
+        per_bulan = {}
+        for r in records:
+            per_bulan.setdefault(r[kolom][:7], []).append(r)
+        with kunci_data():
+            partisi = _cair(self._manifest(file))
+            bulan_baru = any(bulan not in partisi for bulan in per_bulan)
+            batal = [{"manifest": file, "bulan": list(per_bulan)}]
+            for bulan, isi in per_bulan.items():
+                if partisi.get(bulan, {}).pop("arsip", False):
+                    # Record untuk bulan yang sudah diarsipkan (jarang): arsip dibuka lagi
+                    self._buka_arsip(file, bulan)
+                self._append_file(_path_partisi(file, bulan), isi, batal)
+                batal = ()
+                waktu = [r[kolom] for r in isi]
+                m = partisi.setdefault(bulan, {"min": min(waktu), "max": max(waktu), "jumlah": 0})
+                m["min"], m["max"] = min(m["min"], *waktu), max(m["max"], *waktu)
+                m["jumlah"] += len(isi)
+            self._tulis_manifest(file, partisi)
+        # Bulan baru dimulai: bulan yang sudah tutup diarsipkan di latar belakang
+        if bulan_baru and ARSIP_OTOMATIS:
+            self._jadwalkan_arsip(nama_file)
+
+    def _buka_arsip(self, file, bulan):
+        # Di dalam kunci_data: segmen ditulis kembali sebagai partisi biasa, lalu arsipnya dihapus
+        path_arsip = _path_arsip(file, bulan)
+        self._save_file(_path_partisi(file, bulan), _cair(self._baca_arsip(path_arsip)))
+        os.remove(path_arsip)
+        hapus_cache(path_arsip)
+
+    def _jadwalkan_arsip(self, file):
+        path = self._path(file)
+        t = _thread_arsip.get(path)
+        if t is not None and t.is_alive():
+            return t
+        t = threading.Thread(target=self.arsipkan, args=(file,), daemon=True, name=f"arsip-{path}")
+        _thread_arsip[path] = t
+        t.start()
+        return t
+
+    def arsipkan(self, file, bulan_terbuka=BULAN_TERBUKA):
+        # Partisi bulan sebelum bulan_terbuka bulan terakhir dipadatkan ke segmen gzip.
+        # Seperti kompaksi, kompresi berjalan di luar kunci dan hasilnya dibuang jika partisi
+        # berubah sementara itu. Mengembalikan {bulan: (byte sebelum, byte arsip)}.
+        kolom = KOLOM_WAKTU[file]
+        file = self._path(file)
+        batas = _bulan_tutup(bulan_terbuka)
+        hasil = {}
+        for bulan, m in sorted(self._manifest(file).items()):
+            if bulan >= batas or m.get("arsip"):
+                continue
+            path = _path_partisi(file, bulan)
+            with kunci_data():
+                cap = _cap_file(path)
+                data = self._baca_file(path)
+            sebelum = sum(c[1] for c in cap if c is not None)
+            urut = sorted(data, key=lambda r: r[kolom])
+            header = {"versi": VERSI_ARSIP, "bulan": bulan, "min": urut[0][kolom] if urut else None,
+                      "max": urut[-1][kolom] if urut else None, "jumlah": len(urut), "byte_asli": sebelum}
+            tmp = _tulis_arsip(_path_arsip(file, bulan), header, self._kode(path, [_cair(r) for r in urut]))
+            with kunci_data():
+                partisi = _cair(self._manifest(file))
+                if _cap_file(path) != cap or bulan not in partisi:
+                    os.remove(tmp)
+                    continue
+                os.replace(tmp, _path_arsip(file, bulan))
+                partisi[bulan]["arsip"] = True
+                self._tulis_manifest(file, partisi)
+                for p in (path, _path_jurnal(path), _path_kompaksi(path)):
+                    if os.path.exists(p):
+                        os.remove(p)
+                hapus_cache(path)
+                _jumlah_jurnal.pop(path, None)
+            hasil[bulan] = (sebelum, os.path.getsize(_path_arsip(file, bulan)))
+        return hasil
+
+    def daftar_arsip(self, file):
+        # Header semua segmen arsip, tanpa mendekompres isinya
+        file = self._path(file)
+        return [header_arsip(_path_arsip(file, bulan))
+                for bulan, m in sorted(self._manifest(file).items()) if m.get("arsip")]
+
+    def ubah_format(self):
+        # Tulis ulang semua partisi transaksi (termasuk arsip) ke format skema.VERSI.
+        # Record lama tetap terbaca tanpa ini; hanya menghemat disk dan waktu baca.
+        file = self._path(TRANSAKSI_FILE)
+        jumlah = 0
+        for bulan, m in sorted(self._manifest(file).items()):
+            with kunci_data():
+                if m.get("arsip"):
+                    path = _path_arsip(file, bulan)
+                    data = self._baca_arsip(path)
+                    os.replace(_tulis_arsip(path, header_arsip(path), self._kode(path, data)), path)
+                else:
+                    path = _path_partisi(file, bulan)
+                    data = self._baca_file(path)
+                    self._save_file(path, data)
+            jumlah += len(data)
+        return jumlah
+
+    def ubah_stok(self, perubahan):
+        # Selisih stok hanya ditambahkan ke jurnal barang (satu baris per panggilan); kompaksi
+        # melipatnya ke barang.json, jadi biayanya tidak bergantung pada jumlah barang
+        path = self._path(BARANG_FILE)
+        with kunci_data():
+            posisi = _posisi_barang(path, self.baca(BARANG_FILE))
+            for nama, kategori, _ in perubahan:
+                if (nama, kategori) not in posisi:
+                    raise KeyError((nama, kategori))
+            self._append_file(path, [{UBAH_STOK: [list(p) for p in perubahan]}])
+
+    def cari_barang(self, daftar_kunci):
+        barang = self.baca(BARANG_FILE)
+        posisi = _posisi_barang(self._path(BARANG_FILE), barang)
+        return {k: _cair(barang[posisi[k]]) for k in daftar_kunci if k in posisi}
+
+    def cari_akun(self, username):
+        global _indeks_akun
+        akun = self.baca(AKUN_FILE)
+        with _kunci_cache:
+            sumber, indeks = _indeks_akun
+            if sumber is not akun:
+                indeks = {a["username"]: a for a in akun}
+                _indeks_akun = (akun, indeks)
+        return _cair(indeks.get(username))
+
+    def simpan_akun(self, record):
+        with kunci_data():
+            akun = self.load(AKUN_FILE)
+            for i, a in enumerate(akun):
+                if a["username"] == record["username"]:
+                    akun[i] = record
+                    break
+            else:
+                akun.append(record)
+            self.save(AKUN_FILE, akun)
+
+    def jumlah_data(self, file):
+        if file in KOLOM_WAKTU:
+            return sum(m["jumlah"] for m in self._manifest(self._path(file)).values())
+        return len(self.baca(file))
+
+    def rentang_waktu(self, file):
+        partisi = self._manifest(self._path(file)).values()
+        if not partisi:
+            return None, None
+        return _ke_tanggal(min(m["min"] for m in partisi)), _ke_tanggal(max(m["max"] for m in partisi))
+
+    def _iter_partisi(self, file, mulai, akhir, kasir, mundur=False, sampai=None):
+        # Hanya partisi yang beririsan dengan rentang yang dibuka, lalu dipotong dengan bisect
+        kolom = KOLOM_WAKTU[os.path.basename(file)]
+        bawah, atas = _batas_rentang(mulai, akhir)
+        partisi = self._manifest(file)
+        for bulan in sorted(partisi, reverse=mundur):
+            m = partisi[bulan]
+            if ((bawah is not None and m["max"] < bawah) or (atas is not None and m["min"] >= atas)
+                    or (sampai is not None and m["min"] > sampai)):
+                continue
+            path = _path_arsip(file, bulan) if m.get("arsip") else _path_partisi(file, bulan)
+            data = self._baca_bulan(file, bulan, m.get("arsip"))
+            kunci, urutan = self._indeks_waktu(path, data, kolom)
+            i = bisect_left(kunci, bawah) if bawah is not None else 0
+            j = bisect_left(kunci, atas) if atas is not None else len(kunci)
+            if sampai is not None:
+                j = min(j, bisect_right(kunci, sampai))
+            for k in (range(j - 1, i - 1, -1) if mundur else range(i, j)):
+                r = data[k] if urutan is None else data[urutan[k]]
+                if kasir is None or r.get("kasir") == kasir:
+                    yield r
+
+    def iter_rentang(self, file, mulai=None, akhir=None, kasir=None):
+        return self._iter_partisi(self._path(file), mulai, akhir, kasir)
+
+    def iter_mundur(self, file, mulai=None, akhir=None, kasir=None, sampai=None):
+        return self._iter_partisi(self._path(file), mulai, akhir, kasir, mundur=True, sampai=sampai)
+
+    def load_rentang(self, file, mulai=None, akhir=None, kasir=None):
+        return [_cair(r) for r in self.iter_rentang(file, mulai, akhir, kasir)]
+
+
+# Skema SQLite: kolom utama per tabel, field tambahan disimpan di kolom "lain" (JSON)
+TABEL = {
+    AKUN_FILE: "akun",
+    BARANG_FILE: "barang",
+    TRANSAKSI_FILE: "transaksi",
+    BARANG_HAPUS_FILE: "barang_dihapus",
+    MUTASI_FILE: "mutasi_stok",
+}
+KOLOM = {
+    "akun": ["username", "password", "role", "nama_lengkap", "no_telepon", "foto_profil"],
+    "barang": ["nama", "kategori", "stok", "harga", "harga_modal"],
+    "transaksi": ["waktu", "kasir", "total", "bayar", "kembalian", "metode"],
+    "transaksi_item": ["nama", "kategori", "qty", "harga", "harga_modal", "subtotal"],
+    "barang_dihapus": ["nama", "kategori", "stok", "harga", "harga_modal", "jumlah_dihapus",
+                       "keterangan", "tanggal_dihapus", "dihapus_oleh"],
+    "mutasi_stok": ["waktu", "nama", "kategori", "selisih", "jenis", "oleh", "keterangan"],
+}
+SKEMA = """
+CREATE TABLE IF NOT EXISTS akun (
+    username TEXT PRIMARY KEY, password TEXT, role TEXT, nama_lengkap TEXT,
+    no_telepon TEXT, foto_profil TEXT, lain TEXT
+);
+CREATE TABLE IF NOT EXISTS barang (
+    id INTEGER PRIMARY KEY, nama TEXT, kategori TEXT, stok NUMERIC, harga NUMERIC,
+    harga_modal NUMERIC, lain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_barang_nama_kategori ON barang (nama, kategori);
+CREATE INDEX IF NOT EXISTS idx_barang_kategori ON barang (kategori);
+CREATE TABLE IF NOT EXISTS transaksi (
+    id INTEGER PRIMARY KEY, waktu TEXT, kasir TEXT, total NUMERIC, bayar NUMERIC,
+    kembalian NUMERIC, metode TEXT, lain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transaksi_waktu ON transaksi (waktu);
+CREATE INDEX IF NOT EXISTS idx_transaksi_kasir ON transaksi (kasir, waktu);
+CREATE TABLE IF NOT EXISTS transaksi_item (
+    transaksi_id INTEGER REFERENCES transaksi (id) ON DELETE CASCADE, urutan INTEGER,
+    nama TEXT, kategori TEXT, qty NUMERIC, harga NUMERIC, harga_modal NUMERIC,
+    subtotal NUMERIC, lain TEXT, PRIMARY KEY (transaksi_id, urutan)
+);
+CREATE INDEX IF NOT EXISTS idx_item_nama_kategori ON transaksi_item (nama, kategori);
+CREATE TABLE IF NOT EXISTS barang_dihapus (
+    id INTEGER PRIMARY KEY, nama TEXT, kategori TEXT, stok NUMERIC, harga NUMERIC,
+    harga_modal NUMERIC, jumlah_dihapus NUMERIC, keterangan TEXT, tanggal_dihapus TEXT,
+    dihapus_oleh TEXT, lain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_barang_dihapus_tanggal ON barang_dihapus (tanggal_dihapus);
+CREATE TABLE IF NOT EXISTS mutasi_stok (
+    id INTEGER PRIMARY KEY, waktu TEXT, nama TEXT, kategori TEXT, selisih NUMERIC, jenis TEXT,
+    oleh TEXT, keterangan TEXT, lain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_mutasi_stok_waktu ON mutasi_stok (waktu);
+"""
+
+
+def _ke_baris(tabel, record, abaikan=()):
+    kolom = KOLOM[tabel]
+    lain = {k: v for k, v in record.items() if k not in kolom and k not in abaikan}
+    return [record.get(k) for k in kolom] + [json.dumps(lain) if lain else None]
+
+
+def _dari_baris(tabel, baris):
+    kolom = KOLOM[tabel]
+    record = dict(zip(kolom, baris))
+    if baris[len(kolom)]:
+        record.update(json.loads(baris[len(kolom)]))
+    return record
+
+
+class PenyimpananSqlite:
+    # Satu koneksi per thread; Streamlit menjalankan tiap sesi di thread sendiri
+
+    def __init__(self, path):
+        self.path = path
+        self._lokal = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SKEMA)
+
+    def _conn(self):
+        conn = getattr(self._lokal, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._lokal.conn = conn
+        return conn
+
+    @contextmanager
+    def _tulis(self):
+        # Koneksi untuk menulis: di-commit sendiri, kecuali di dalam transaksi()
+        conn = self._conn()
+        if getattr(self._lokal, "transaksi", False):
+            yield conn
+            return
+        with conn:
+            yield conn
+
+    @contextmanager
+    def transaksi(self):
+        # Semua tulis di dalamnya satu transaksi SQLite: di-commit bersama, atau di-rollback
+        # bersama jika terjadi exception (dan oleh SQLite sendiri jika prosesnya mati)
+        if getattr(self._lokal, "transaksi", False):
+            yield
+            return
+        conn = self._conn()
+        self._lokal.transaksi = True
+        try:
+            with conn:
+                yield
+        finally:
+            self._lokal.transaksi = False
+
+    def _iter_select(self, tabel, where="", params=(), urut=None):
+        kolom = ", ".join(KOLOM[tabel] + ["lain"])
+        urut = urut or ("username" if tabel == "akun" else "id")
+        sql = f"SELECT {kolom} FROM {tabel} {where} ORDER BY {urut}"
+        return (_dari_baris(tabel, b) for b in self._conn().execute(sql, params))
+
+    def _select(self, tabel, where="", params=()):
+        return list(self._iter_select(tabel, where, params))
+
+    def _iter_transaksi(self, where="", params=()):
+        # Merge join dua cursor yang sama-sama urut id, tanpa memuat semua baris sekaligus
+        kolom = ", ".join(["id"] + KOLOM["transaksi"] + ["lain"])
+        kolom_item = ", ".join(["transaksi_id"] + KOLOM["transaksi_item"] + ["lain"])
+        conn = self._conn()
+        cur_transaksi = conn.execute(f"SELECT {kolom} FROM transaksi {where} ORDER BY id", params)
+        cur_item = conn.execute(
+            f"SELECT {kolom_item} FROM transaksi_item WHERE transaksi_id IN "
+            f"(SELECT id FROM transaksi {where}) ORDER BY transaksi_id, urutan", params)
+        item = next(cur_item, None)
+        for b in cur_transaksi:
+            t = _dari_baris("transaksi", b[1:])
+            t["items"] = []
+            while item is not None and item[0] == b[0]:
+                t["items"].append(_dari_baris("transaksi_item", item[1:]))
+                item = next(cur_item, None)
+            yield t
+
+    def _iter_transaksi_mundur(self, where="", params=(), blok=100):
+        # Terbaru dulu; item diambil per blok transaksi agar halaman pertama tidak menunggu sort semua item
+        kolom = ", ".join(["id"] + KOLOM["transaksi"] + ["lain"])
+        kolom_item = ", ".join(["transaksi_id"] + KOLOM["transaksi_item"] + ["lain"])
+        conn = self._conn()
+        cur = conn.execute(f"SELECT {kolom} FROM transaksi {where} ORDER BY waktu DESC, id DESC", params)
+        while True:
+            baris = cur.fetchmany(blok)
+            if not baris:
+                return
+            items = {}
+            tanda = ", ".join("?" * len(baris))
+            for item in conn.execute(
+                    f"SELECT {kolom_item} FROM transaksi_item WHERE transaksi_id IN ({tanda}) "
+                    f"ORDER BY transaksi_id, urutan", [b[0] for b in baris]):
+                items.setdefault(item[0], []).append(_dari_baris("transaksi_item", item[1:]))
+            for b in baris:
+                t = _dari_baris("transaksi", b[1:])
+                t["items"] = items.get(b[0], [])
+                yield t
+
+    def _select_transaksi(self, where="", params=()):
+        return list(self._iter_transaksi(where, params))
+
+    def _insert(self, conn, tabel, record):
+        if tabel == "transaksi":
+            cur = conn.execute(
+                "INSERT INTO transaksi (waktu, kasir, total, bayar, kembalian, metode, lain) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                _ke_baris("transaksi", record, abaikan=("items",)),
+            )
+            conn.executemany(
+                "INSERT INTO transaksi_item (transaksi_id, urutan, nama, kategori, qty, harga, "
+                "harga_modal, subtotal, lain) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [[cur.lastrowid, i] + _ke_baris("transaksi_item", item)
+                 for i, item in enumerate(record.get("items", []))],
+            )
+            return
+        kolom = KOLOM[tabel] + ["lain"]
+        tanda = ", ".join("?" * len(kolom))
+        conn.execute(f"INSERT INTO {tabel} ({', '.join(kolom)}) VALUES ({tanda})",
+                     _ke_baris(tabel, record))
+
+    def load(self, file):
+        tabel = TABEL[file]
+        if tabel == "transaksi":
+            return self._select_transaksi()
+        return self._select(tabel)
+
+    def baca(self, file):
+        return self.load(file)
+
+    def save(self, file, data):
+        tabel = TABEL[file]
+        with self._tulis() as conn:
+            if tabel == "transaksi":
+                conn.execute("DELETE FROM transaksi_item")
+            conn.execute(f"DELETE FROM {tabel}")
+            for record in data:
+                self._insert(conn, tabel, record)
+
+    def append(self, file, record):
+        self.append_banyak(file, [record])
+
+    def append_banyak(self, file, records):
+        with self._tulis() as conn:
+            for record in records:
+                self._insert(conn, TABEL[file], record)
+
+    def ubah_stok(self, perubahan):
+        with self._tulis() as conn:
+            conn.executemany(
+                "UPDATE barang SET stok = stok + ? WHERE nama = ? AND kategori = ?",
+                [(selisih, nama, kategori) for nama, kategori, selisih in perubahan],
+            )
+
+    def cari_barang(self, daftar_kunci):
+        # Lewat indeks (nama, kategori), tanpa memuat seluruh tabel barang
+        hasil = {}
+        for nama, kategori in daftar_kunci:
+            baris = self._select("barang", "WHERE nama = ? AND kategori = ?", (nama, kategori))
+            if baris:
+                hasil[(nama, kategori)] = baris[0]
+        return hasil
+
+    def cari_akun(self, username):
+        hasil = self._select("akun", "WHERE username = ?", (username,))
+        return hasil[0] if hasil else None
+
+    def simpan_akun(self, record):
+        kolom = KOLOM["akun"] + ["lain"]
+        tanda = ", ".join("?" * len(kolom))
+        with self._tulis() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO akun ({', '.join(kolom)}) VALUES ({tanda})",
+                         _ke_baris("akun", record))
+
+    def jumlah_data(self, file):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {TABEL[file]}").fetchone()[0]
+
+    def rentang_waktu(self, file):
+        kolom = KOLOM_WAKTU[file]
+        mulai, akhir = self._conn().execute(
+            f"SELECT MIN({kolom}), MAX({kolom}) FROM {TABEL[file]}").fetchone()
+        return _ke_tanggal(mulai), _ke_tanggal(akhir)
+
+    def _where_rentang(self, file, mulai, akhir, kasir, sampai=None):
+        kolom = KOLOM_WAKTU[file]
+        bawah, atas = _batas_rentang(mulai, akhir)
+        syarat, params = [], []
+        if sampai is not None:
+            syarat.append(f"{kolom} <= ?")
+            params.append(sampai)
+        if bawah is not None:
+            syarat.append(f"{kolom} >= ?")
+            params.append(bawah)
+        if atas is not None:
+            syarat.append(f"{kolom} < ?")
+            params.append(atas)
+        if kasir is not None:
+            syarat.append("kasir = ?")
+            params.append(kasir)
+        where = "WHERE " + " AND ".join(syarat) if syarat else ""
+        return where, params
+
+    def iter_rentang(self, file, mulai=None, akhir=None, kasir=None):
+        where, params = self._where_rentang(file, mulai, akhir, kasir)
+        if TABEL[file] == "transaksi":
+            return self._iter_transaksi(where, params)
+        return iter(self._select(TABEL[file], where, params))
+
+    def iter_mundur(self, file, mulai=None, akhir=None, kasir=None, sampai=None):
+        where, params = self._where_rentang(file, mulai, akhir, kasir, sampai)
+        if TABEL[file] == "transaksi":
+            return self._iter_transaksi_mundur(where, params)
+        return self._iter_select(TABEL[file], where, params, f"{KOLOM_WAKTU[file]} DESC, id DESC")
+
+    def load_rentang(self, file, mulai=None, akhir=None, kasir=None):
+        return list(self.iter_rentang(file, mulai, akhir, kasir))
+
+
+# Cabang
+def daftar_cabang():
+    if not os.path.isdir(CABANG_DIR):
+        return [PUSAT]
+    return [PUSAT] + sorted(d for d in os.listdir(CABANG_DIR) if os.path.isdir(os.path.join(CABANG_DIR, d)))
+
+
+def direktori_cabang(nama=None):
+    nama = nama or _cabang.get()
+    return "" if nama == PUSAT else os.path.join(CABANG_DIR, nama)
+
+
+def path_cabang(file):
+    # Path file pendukung (rekap, tabel fakta, ...) di direktori cabang aktif
+    return os.path.join(direktori_cabang(), file)
+
+
+def cabang_aktif():
+    return _cabang.get()
+
+
+def atur_cabang(nama):
+    if nama not in daftar_cabang():
+        raise ValueError(f"Cabang tidak dikenal: {nama}")
+    _cabang.set(nama)
+
+
+@contextmanager
+def pakai_cabang(nama):
+    token = _cabang.set(nama)
+    try:
+        yield
+    finally:
+        _cabang.reset(token)
+
+
+def buat_cabang(nama):
+    nama = nama.strip()
+    if not re.fullmatch(r"[\w][\w .-]*", nama) or nama == PUSAT:
+        raise ValueError("Nama cabang hanya boleh huruf, angka, spasi, titik, - dan _")
+    if nama in daftar_cabang():
+        raise ValueError(f"Cabang {nama} sudah ada")
+    os.makedirs(os.path.join(CABANG_DIR, nama))
+    return nama
+
+
+_backend = {}
+_kunci_backend = threading.Lock()
+
+
+def backend(file=None):
+    # Satu backend per direktori cabang; akun selalu dari direktori pusat
+    direktori = "" if file == AKUN_FILE else direktori_cabang()
+    with _kunci_backend:
+        b = _backend.get(direktori)
+        if b is None:
+            if STORAGE == "sqlite":
+                b = PenyimpananSqlite(os.path.join(direktori, DB_FILE))
+            else:
+                b = PenyimpananJson(direktori)
+            _backend[direktori] = b
+        return b
+
+
+def pakai_backend(penyimpanan):
+    with _kunci_backend:
+        _backend[direktori_cabang()] = penyimpanan
+
+
+# Utilitas
+def load_data(file):
+    with metrik.span("penyimpanan", operasi="load", file=_jenis_file(file)):
+        return backend(file).load(file)
+
+
+def baca_data(file):
+    # Tampilan baca-saja (tuple berisi MappingProxyType) untuk halaman yang tidak mengubah data
+    with metrik.span("penyimpanan", operasi="baca", file=_jenis_file(file)):
+        return backend(file).baca(file)
+
+
+def save_data(file, data):
+    with metrik.span("penyimpanan", operasi="save", file=_jenis_file(file)):
+        backend(file).save(file, data)
+
+
+def append_data(file, record):
+    with metrik.span("penyimpanan", operasi="append", file=_jenis_file(file)):
+        backend(file).append(file, record)
+
+
+def append_banyak(file, records):
+    # Seperti append_data untuk banyak record sekaligus (satu fsync/transaksi)
+    if not records:
+        return
+    with metrik.span("penyimpanan", operasi="append", file=_jenis_file(file)):
+        backend(file).append_banyak(file, records)
+
+
+def ubah_stok(perubahan):
+    # perubahan: list (nama, kategori, selisih stok)
+    backend().ubah_stok(perubahan)
+
+
+@contextmanager
+def transaksi():
+    # Tulis di dalamnya (cabang aktif) tersimpan semua atau tidak sama sekali; lihat transaksi()
+    # di masing-masing backend
+    with kunci_data(), backend().transaksi():
+        yield
+
+
+def cari_barang(daftar_kunci):
+    # {(nama, kategori): salinan barang} untuk kunci yang ada di katalog cabang aktif
+    return backend(BARANG_FILE).cari_barang(daftar_kunci)
+
+
+def cari_akun(username):
+    return backend(AKUN_FILE).cari_akun(username)
+
+
+def simpan_akun(record):
+    backend(AKUN_FILE).simpan_akun(record)
+
+
+def jumlah_data(file):
+    return backend(file).jumlah_data(file)
+
+
+def rentang_waktu(file):
+    return backend().rentang_waktu(file)
+
+
+def load_rentang(file, mulai=None, akhir=None, kasir=None):
+    return backend().load_rentang(file, mulai, akhir, kasir)
+
+
+def iter_rentang(file, mulai=None, akhir=None, kasir=None):
+    # Iterasi record dalam rentang tanpa menyalin; record diperlakukan baca-saja
+    return backend().iter_rentang(file, mulai, akhir, kasir)
+
+
+def iter_mundur(file, mulai=None, akhir=None, kasir=None, sampai=None):
+    # Seperti iter_rentang tetapi terbaru lebih dulu, opsional dibatasi waktu <= sampai
+    return backend().iter_mundur(file, mulai, akhir, kasir, sampai)
+
+
+def iter_sesudah(file, tanda):
+    # Record yang belum tercakup tanda [waktu terakhir, jumlah record pada waktu itu] (None = semua).
+    # Waktu transaksi diambil di dalam kunci_data sehingga urutan waktu = urutan append; record
+    # dengan waktu mundur tidak ikut dan harus ditangkap pemanggil lewat jumlah_data.
+    if tanda is None:
+        yield from iter_rentang(file)
+        return
+    waktu, lewati = tanda
+    kolom = KOLOM_WAKTU[file]
+    for r in iter_rentang(file, _ke_tanggal(waktu)):
+        if r[kolom] < waktu:
+            continue
+        if r[kolom] == waktu and lewati > 0:
+            lewati -= 1
+            continue
+        yield r
+
+
+def geser_tanda(tanda, waktu):
+    # Tanda setelah record dengan waktu tersebut diterapkan
+    if tanda is None or waktu > tanda[0]:
+        return [waktu, 1]
+    if waktu == tanda[0]:
+        return [waktu, tanda[1] + 1]
+    return tanda
+
+
+def ubah_format():
+    # Beri ID produk ke barang yang belum punya lalu tulis ulang transaksi ke format ringkas;
+    # mengembalikan jumlah transaksi. Hanya backend JSON (SQLite tetap memakai tabelnya).
+    b = backend()
+    if not isinstance(b, PenyimpananJson):
+        raise ValueError("Format ringkas hanya untuk penyimpanan JSON")
+    reg = registri()
+    with kunci_data():
+        barang = load_data(BARANG_FILE)
+        if any(not x.get("id") for x in barang):
+            for x in barang:
+                x["id"] = x.get("id") or reg.id(x["nama"], x["kategori"], simpan=False)
+            reg.simpan()
+            save_data(BARANG_FILE, barang)
+    return b.ubah_format()
+
+
+def arsipkan(file=None, bulan_terbuka=BULAN_TERBUKA):
+    # {file: {bulan: (byte sebelum, byte arsip)}} untuk cabang aktif; hanya backend JSON
+    # (SQLite tidak membaca ulang seluruh file, jadi tidak perlu diarsipkan)
+    b = backend()
+    if not isinstance(b, PenyimpananJson):
+        raise ValueError("Arsip hanya untuk penyimpanan JSON")
+    return {f: b.arsipkan(f, bulan_terbuka) for f in ([file] if file else KOLOM_WAKTU)}
+
+
+def halaman_data(file, mulai=None, akhir=None, kasir=None, saring=None, kursor=None, ukuran=50):
+    # Satu halaman record (terbaru dulu) yang lolos saring(record). kursor = (waktu, jumlah
+    # record berwaktu sama yang sudah dilewati) dari halaman sebelumnya; kursor berikut None
+    # jika tidak ada halaman lagi
+    kolom = KOLOM_WAKTU[file]
+    sampai, lewati = kursor if kursor else (None, 0)
+    hasil, berikut = [], None
+    terakhir, posisi = None, 0
+    for r in iter_mundur(file, mulai, akhir, kasir, sampai):
+        waktu = r[kolom]
+        if waktu != terakhir:
+            terakhir, posisi = waktu, 0
+        posisi += 1
+        if waktu == sampai and posisi <= lewati:
+            continue
+        if saring is not None and not saring(r):
+            continue
+        if len(hasil) == ukuran:
+            return hasil, berikut
+        hasil.append(_cair(r))
+        berikut = (waktu, posisi)
+    return hasil, None
+
+
+def load_dokumen(file):
+    # Dokumen pendukung (bukan list data utama) di direktori cabang aktif, None jika belum ada
+    file = path_cabang(file)
+    if not os.path.exists(file):
+        return None
+    with open(file, "r") as f:
+        return json.load(f)
+
+
+def save_dokumen(file, data):
+    file = path_cabang(file)
+    os.makedirs(os.path.dirname(file) or ".", exist_ok=True)
+    _tulis_atomik(file, data, indent=None)
+
+
+def migrasi_json_ke_sqlite(db_path=None, paksa=False):
+    # Untuk cabang aktif; db_path default kasir.db di direktori cabang
+    sumber = PenyimpananJson(direktori_cabang())
+    db_path = db_path or path_cabang(DB_FILE)
+    tujuan = PenyimpananSqlite(db_path)
+    if not paksa:
+        for file, tabel in TABEL.items():
+            if tujuan._conn().execute(f"SELECT 1 FROM {tabel} LIMIT 1").fetchone():
+                raise RuntimeError(f"Tabel {tabel} di {db_path} sudah berisi data (gunakan --paksa)")
+    jumlah = {}
+    for file in TABEL:
+        data = sumber.load(file) if os.path.exists(sumber._path(file)) or file in KOLOM_WAKTU else []
+        tujuan.save(file, data)
+        jumlah[file] = len(data)
+    return jumlah
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Utilitas penyimpanan Aplikasi Kasir")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_migrasi = sub.add_parser("migrasi", help="Salin data JSON ke database SQLite")
+    p_migrasi.add_argument("--db", help=f"Default {DB_FILE} di direktori cabang")
+    p_migrasi.add_argument("--cabang", default=PUSAT)
+    p_migrasi.add_argument("--paksa", action="store_true", help="Timpa isi database yang sudah ada")
+    p_arsip = sub.add_parser("arsip", help="Padatkan bulan yang sudah tutup menjadi segmen gzip")
+    p_arsip.add_argument("--cabang", default=PUSAT)
+    p_arsip.add_argument("--bulan-terbuka", type=int, default=BULAN_TERBUKA,
+                         help="Jumlah bulan terakhir yang tidak diarsipkan")
+    p_format = sub.add_parser("format", help="Tulis ulang transaksi ke format ringkas dengan ID produk")
+    p_format.add_argument("--cabang", default=PUSAT)
+    args = parser.parse_args()
+
+    if args.perintah == "migrasi":
+        try:
+            atur_cabang(args.cabang)
+            jumlah = migrasi_json_ke_sqlite(args.db, args.paksa)
+        except (RuntimeError, ValueError) as e:
+            parser.error(str(e))
+        for file, n in jumlah.items():
+            print(f"{file}: {n} baris")
+
+    if args.perintah == "arsip":
+        try:
+            atur_cabang(args.cabang)
+            hasil = arsipkan(bulan_terbuka=max(1, args.bulan_terbuka))
+        except ValueError as e:
+            parser.error(str(e))
+        for file, per_bulan in hasil.items():
+            for bulan, (sebelum, sesudah) in per_bulan.items():
+                print(f"{file} {bulan}: {sebelum:,} -> {sesudah:,} byte")
+        if not any(hasil.values()):
+            print("Tidak ada bulan yang perlu diarsipkan")
+
+    if args.perintah == "format":
+        try:
+            atur_cabang(args.cabang)
+            jumlah = ubah_format()
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"{jumlah} transaksi ditulis dalam format versi {skema.VERSI}")
@@ -0,0 +1,223 @@
+# ringkasan.py
+# Rekap penjualan per hari, bulan, kasir dan produk yang diperbarui setiap kali
+# transaksi disimpan, sehingga Dashboard/Laporan/Statistik tidak perlu
+# menjumlahkan ulang seluruh riwayat transaksi. Penyelarasan antarproses dan
+# penyimpanan ke disk diatur turunan.DataTurunan.
+import argparse
+import os
+from datetime import date, timedelta
+
+from penyimpanan import PUSAT, atur_cabang, geser_tanda, load_dokumen, save_dokumen
+from turunan import DataTurunan
+
+RINGKASAN_FILE = "ringkasan_penjualan.json"
+VERSI = 3
+# Jeda sebelum rekap ditulis ke disk; beberapa transaksi berdekatan digabung dalam satu tulis
+JEDA_SIMPAN = 2.0
+# Kecepatan jual per produk: rata-rata qty harian berbobot eksponensial (EWMA) dengan
+# waktu paruh PARUH_KECEPATAN hari, hanya dari hari yang sudah lewat
+PARUH_KECEPATAN = float(os.environ.get("KASIR_PARUH_KECEPATAN", "14"))
+ALPHA = 1 - 0.5 ** (1 / PARUH_KECEPATAN)
+
+
+def _kosong():
+    return {
+        "versi": VERSI,
+        "jumlah_transaksi": 0,
+        "total": _metrik(),
+        "harian": {},
+        "bulanan": {},
+        "kasir": {},
+        "harian_kasir": {},
+        "bulanan_kasir": {},
+        "produk": {},
+        # "nama|kategori" -> [hari terakhir, qty hari itu, EWMA s.d. hari sebelumnya, hari pertama]
+        "kecepatan": {},
+        # [waktu transaksi terakhir, jumlah transaksi pada waktu itu], lihat penyimpanan.iter_sesudah
+        "tanda": None,
+    }
+
+
+def _metrik():
+    return {"jumlah": 0, "pendapatan": 0, "qty": 0, "modal": 0}
+
+
+def _tambah(tujuan, jumlah, pendapatan, qty, modal):
+    tujuan["jumlah"] += jumlah
+    tujuan["pendapatan"] += pendapatan
+    tujuan["qty"] += qty
+    tujuan["modal"] += modal
+
+
+def _terapkan(data, t):
+    tanggal = t["waktu"][:10]
+    bulan = t["waktu"][:7]
+    kasir = t["kasir"]
+    qty = sum(item["qty"] for item in t["items"])
+    modal = sum(item.get("harga_modal", 0) * item["qty"] for item in t["items"])
+
+    for tujuan in (
+        data["total"],
+        data["harian"].setdefault(tanggal, _metrik()),
+        data["bulanan"].setdefault(bulan, _metrik()),
+        data["kasir"].setdefault(kasir, _metrik()),
+        data["harian_kasir"].setdefault(tanggal, {}).setdefault(kasir, _metrik()),
+        data["bulanan_kasir"].setdefault(kasir, {}).setdefault(bulan, _metrik()),
+    ):
+        _tambah(tujuan, 1, t["total"], qty, modal)
+
+    for item in t["items"]:
+        kunci = f"{item['nama']}|{item['kategori']}"
+        produk = data["produk"].setdefault(kunci, dict(_metrik(), nama=item["nama"], kategori=item["kategori"]))
+        _tambah(produk, 1, item["subtotal"], item["qty"], item.get("harga_modal", 0) * item["qty"])
+        _catat_kecepatan(data["kecepatan"], kunci, tanggal, item["qty"])
+
+    data["jumlah_transaksi"] += 1
+    data["tanda"] = geser_tanda(data["tanda"], t["waktu"])
+
+
+def _catat_kecepatan(kecepatan, kunci, tanggal, qty):
+    k = kecepatan.get(kunci)
+    if k is None:
+        kecepatan[kunci] = [tanggal, qty, 0.0, tanggal]
+        return
+    # Transaksi dengan tanggal mundur (jam tidak sinkron) dihitung ke hari terakhir
+    if tanggal > k[0]:
+        k[2] = _ewma(k, date.fromisoformat(tanggal))
+        k[0], k[1] = tanggal, 0
+    k[1] += qty
+
+
+def _ewma(k, hari):
+    # EWMA s.d. akhir hari sebelum `hari`: hari terakhir ditutup, lalu hari tanpa penjualan meluruh
+    terakhir = date.fromisoformat(k[0])
+    if hari <= terakhir:
+        return k[2]
+    return (ALPHA * k[1] + (1 - ALPHA) * k[2]) * (1 - ALPHA) ** ((hari - terakhir).days - 1)
+
+
+def _muat():
+    data = load_dokumen(RINGKASAN_FILE)
+    return data if data is not None and data.get("versi") == VERSI else None
+
+
+_rekap = DataTurunan(
+    muat=_muat,
+    kosong=_kosong,
+    terapkan=_terapkan,
+    status=lambda data: (data["jumlah_transaksi"], data["tanda"]),
+    tulis=lambda data: save_dokumen(RINGKASAN_FILE, data),
+    jeda=JEDA_SIMPAN,
+)
+
+
+def catat_transaksi(t):
+    # Dipanggil di dalam kunci_data setelah transaksi di-append
+    _rekap.catat_transaksi(t)
+
+
+def bangun_ulang():
+    return _rekap.bangun_ulang()
+
+
+def versi():
+    # Berubah setiap ada transaksi baru; dipakai sebagai bagian kunci cache grafik
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        return data["jumlah_transaksi"]
+
+
+def total():
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        return dict(data["total"])
+
+
+def rentang():
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        if not data["harian"]:
+            return None, None
+        return date.fromisoformat(min(data["harian"])), date.fromisoformat(max(data["harian"]))
+
+
+def per_hari(mulai, akhir, kasir=None):
+    bawah, atas = mulai.isoformat(), akhir.isoformat()
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        if kasir is None:
+            return {h: dict(m) for h, m in data["harian"].items() if bawah <= h <= atas}
+        return {
+            h: dict(per_kasir[kasir])
+            for h, per_kasir in data["harian_kasir"].items()
+            if bawah <= h <= atas and kasir in per_kasir
+        }
+
+
+def per_periode(mulai, akhir, granularitas="hari", kasir=None):
+    # Rekap harian digabung per minggu (kunci = hari Senin) atau per bulan (kunci = tanggal 1)
+    hasil = {}
+    for h, m in per_hari(mulai, akhir, kasir).items():
+        tanggal = date.fromisoformat(h)
+        if granularitas == "minggu":
+            tanggal -= timedelta(days=tanggal.weekday())
+        elif granularitas == "bulan":
+            tanggal = tanggal.replace(day=1)
+        _tambah(hasil.setdefault(tanggal, _metrik()), m["jumlah"], m["pendapatan"], m["qty"], m["modal"])
+    return dict(sorted(hasil.items()))
+
+
+def per_kasir(mulai, akhir):
+    bawah, atas = mulai.isoformat(), akhir.isoformat()
+    data = _rekap.pastikan_termuat()
+    hasil = {}
+    with _rekap.kunci:
+        for h, per_kasir in data["harian_kasir"].items():
+            if bawah <= h <= atas:
+                for kasir, m in per_kasir.items():
+                    _tambah(hasil.setdefault(kasir, _metrik()), m["jumlah"], m["pendapatan"], m["qty"], m["modal"])
+    return hasil
+
+
+def rekap_kasir(username):
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        m = data["kasir"].get(username)
+        return dict(m) if m else None
+
+
+def kecepatan(hari=None):
+    # {(nama, kategori): qty per hari} s.d. kemarin (atau s.d. sebelum `hari`). EWMA dikoreksi
+    # untuk produk yang riwayatnya masih pendek agar tidak dianggap lambat hanya karena baru;
+    # koreksinya dibatasi (riwayat dianggap minimal satu waktu paruh) agar lonjakan satu hari
+    # tidak langsung dianggap laju harian.
+    hari = hari or date.today()
+    data = _rekap.pastikan_termuat()
+    hasil = {}
+    with _rekap.kunci:
+        for kunci, k in data["kecepatan"].items():
+            umur = (hari - date.fromisoformat(k[3])).days
+            if umur <= 0:
+                continue
+            p = data["produk"][kunci]
+            hasil[(p["nama"], p["kategori"])] = _ewma(k, hari) / (1 - (1 - ALPHA) ** max(umur, PARUH_KECEPATAN))
+    return hasil
+
+
+def per_bulan_kasir(kasir):
+    data = _rekap.pastikan_termuat()
+    with _rekap.kunci:
+        return {b: dict(m) for b, m in data["bulanan_kasir"].get(kasir, {}).items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rekap penjualan Aplikasi Kasir")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="Bangun ulang rekap dari seluruh transaksi")
+    p_rebuild.add_argument("--cabang", default=PUSAT)
+    args = parser.parse_args()
+
+    if args.perintah == "rebuild":
+        atur_cabang(args.cabang)
+        data = bangun_ulang()
+        print(f"{data['jumlah_transaksi']} transaksi, {len(data['harian'])} hari, {len(data['produk'])} produk")
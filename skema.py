@@ -0,0 +1,145 @@
+# skema.py
+# Format ringkas transaksi (versi 2). Di disk satu transaksi adalah array
+#   [2, detik, kasir, metode, total, bayar, kembalian, [[id, qty, harga, harga_modal, subtotal], ...]]
+# (ditambah dict field lain di ujung jika ada) dengan uang dalam rupiah bulat, waktu
+# dalam detik sejak 1970-01-01 00:00 waktu lokal toko (tanpa zona, sama seperti
+# fakta.py) dan barang sebagai ID produk tetap dari registri produk. Record lama
+# (dict, versi 1) tetap bisa dibaca. Di memori transaksi dan item disimpan sebagai
+# objek __slots__ read-only yang dipakai seperti dict (t["total"], item.get("harga_modal", 0),
+# dict(t)); nama barang, kategori, kasir dan metode dibagi antar record, tidak disalin.
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+VERSI = 2
+FORMAT_WAKTU = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+
+
+def rupiah(nilai):
+    # Uang disimpan sebagai rupiah bulat
+    return int(round(nilai)) if isinstance(nilai, float) else nilai
+
+
+def ke_detik(waktu):
+    return (datetime.fromisoformat(waktu) - _EPOCH) // timedelta(seconds=1)
+
+
+def dari_detik(detik):
+    return (_EPOCH + timedelta(seconds=detik)).strftime(FORMAT_WAKTU)
+
+
+class Rekaman(Mapping):
+    # Field bernilai None dianggap tidak ada; field di luar KOLOM disimpan di `lain`.
+    # ATRIBUT: kolom -> nama slot (beda hanya jika nama kolom bentrok dengan metode Mapping)
+    __slots__ = ()
+    KOLOM = ()
+    ATRIBUT = {}
+
+    def __getitem__(self, kunci):
+        try:
+            nilai = getattr(self, self.ATRIBUT[kunci])
+        except KeyError:
+            if self.lain and kunci in self.lain:
+                return self.lain[kunci]
+            raise
+        if nilai is None:
+            raise KeyError(kunci)
+        return nilai
+
+    def __iter__(self):
+        for kunci, atribut in self.ATRIBUT.items():
+            if getattr(self, atribut) is not None:
+                yield kunci
+        if self.lain:
+            yield from self.lain
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.ke_dict()!r})"
+
+    def ke_dict(self):
+        return {k: self[k] for k in self}
+
+
+class Item(Rekaman):
+    __slots__ = ("nama", "kategori", "qty", "harga", "harga_modal", "subtotal", "id", "lain")
+    KOLOM = ("nama", "kategori", "qty", "harga", "harga_modal", "subtotal", "id")
+    ATRIBUT = {k: k for k in KOLOM}
+
+    def __init__(self, nama, kategori, qty, harga, harga_modal, subtotal, id=None, lain=None):
+        self.nama = nama
+        self.kategori = kategori
+        self.qty = qty
+        self.harga = harga
+        self.harga_modal = harga_modal
+        self.subtotal = subtotal
+        self.id = id
+        self.lain = lain
+
+
+class Transaksi(Rekaman):
+    # t["items"]; atributnya `barang` karena items() adalah metode Mapping
+    __slots__ = ("waktu", "kasir", "barang", "total", "bayar", "kembalian", "metode", "lain")
+    KOLOM = ("waktu", "kasir", "items", "total", "bayar", "kembalian", "metode")
+    ATRIBUT = dict(zip(KOLOM, ("waktu", "kasir", "barang", "total", "bayar", "kembalian", "metode")))
+
+    def __init__(self, waktu, kasir, items, total, bayar, kembalian, metode, lain=None):
+        self.waktu = waktu
+        self.kasir = kasir
+        self.barang = items
+        self.total = total
+        self.bayar = bayar
+        self.kembalian = kembalian
+        self.metode = metode
+        self.lain = lain
+
+    def ke_dict(self):
+        d = super().ke_dict()
+        d["items"] = [item.ke_dict() for item in self.barang]
+        return d
+
+
+def kode_transaksi(t, id_produk):
+    # dict/Transaksi -> array versi 2. id_produk(nama, kategori) memberi ID tetap (dibuat jika belum ada)
+    items = []
+    for item in t["items"]:
+        baris = [item.get("id") or id_produk(item["nama"], item["kategori"]), item["qty"],
+                 rupiah(item["harga"]), rupiah(item.get("harga_modal")), rupiah(item["subtotal"])]
+        lain = {k: v for k, v in item.items() if k not in Item.KOLOM}
+        if lain:
+            baris.append(lain)
+        items.append(baris)
+    baris = [VERSI, ke_detik(t["waktu"]), t["kasir"], t["metode"], rupiah(t["total"]), rupiah(t["bayar"]),
+             rupiah(t["kembalian"]), items]
+    lain = {k: v for k, v in t.items() if k not in Transaksi.KOLOM}
+    if lain:
+        baris.append(lain)
+    return baris
+
+
+def baca_transaksi(r, registri):
+    # Array versi 2 atau dict versi 1 -> Transaksi. registri.nama(id) -> (nama, kategori),
+    # registri.cari(nama, kategori) -> id atau None
+    if isinstance(r, dict):
+        items = []
+        for item in r["items"]:
+            nama, kategori = sys.intern(item["nama"]), sys.intern(item["kategori"])
+            id_produk = item.get("id") or registri.cari(nama, kategori)
+            lain = {k: v for k, v in item.items() if k not in Item.KOLOM}
+            items.append(Item(nama, kategori, item["qty"], item["harga"], item.get("harga_modal"),
+                              item["subtotal"], id_produk, lain or None))
+        lain = {k: v for k, v in r.items() if k not in Transaksi.KOLOM}
+        return Transaksi(r["waktu"], sys.intern(r["kasir"]), tuple(items), r["total"], r["bayar"],
+                         r["kembalian"], sys.intern(r["metode"]), lain or None)
+    if r[0] != VERSI:
+        raise ValueError(f"Format transaksi versi {r[0]} tidak dikenal")
+    items = []
+    for baris in r[7]:
+        nama, kategori = registri.nama(baris[0])
+        items.append(Item(nama, kategori, baris[1], baris[2], baris[3], baris[4], baris[0],
+                          baris[5] if len(baris) > 5 else None))
+    return Transaksi(dari_detik(r[1]), sys.intern(r[2]), tuple(items), r[4], r[5], r[6], sys.intern(r[3]),
+                     r[8] if len(r) > 8 else None)
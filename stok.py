@@ -0,0 +1,318 @@
+# stok.py
+# Buku besar stok: setiap perubahan stok (penjualan, penghapusan, restok, impor,
+# barang baru) dicatat sebagai mutasi di MUTASI_FILE yang hanya di-append. Setiap
+# SNAPSHOT_SETIAP mutasi disimpan snapshot stok semua barang, sehingga stok pada
+# suatu waktu dihitung dari snapshot terdekat ditambah mutasi sesudahnya, tanpa
+# memutar ulang seluruh riwayat. Snapshot pertama (saldo awal) diambil dari stok
+# di barang.json saat mutasi pertama dicatat. Setiap snapshot adalah satu file di
+# SNAPSHOT_DIR (nama file = waktu dan jumlah mutasi), ditulis di latar belakang;
+# yang disimpan hanya saldo awal dan SNAPSHOT_SIMPAN snapshot terakhir.
+#
+# Daftar stok menipis memakai kecepatan jual dari rekap (ringkasan.kecepatan) dan
+# stok di katalog, jadi tidak membaca riwayat transaksi sama sekali.
+import argparse
+import math
+import os
+import threading
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from penyimpanan import (
+    BARANG_FILE, MUTASI_FILE, PUSAT, append_banyak, atur_cabang, baca_data, cabang_aktif, iter_rentang,
+    jumlah_data, kunci_data, load_dokumen, pakai_cabang, path_cabang, save_dokumen
+)
+from katalog import katalog
+import ringkasan
+
+SNAPSHOT_DIR = "snapshot_stok"
+SNAPSHOT_SETIAP = int(os.environ.get("KASIR_SNAPSHOT_STOK", "1000"))
+SNAPSHOT_SIMPAN = int(os.environ.get("KASIR_SNAPSHOT_SIMPAN", "10"))
+# Mikrodetik agar urutan mutasi dan batas snapshot tetap tegas walau dalam detik yang sama
+FORMAT_WAKTU = "%Y-%m-%d %H:%M:%S.%f"
+JENIS = {
+    "penjualan": "Penjualan",
+    "hapus": "Penghapusan",
+    "restok": "Restok",
+    "impor": "Impor",
+    "barang_baru": "Barang Baru",
+}
+# Barang dianggap menipis jika stok cukup untuk HARI_MENIPIS hari atau kurang;
+# saran pesan mengisi stok sampai cukup untuk HARI_TARGET hari
+HARI_MENIPIS = float(os.environ.get("KASIR_HARI_MENIPIS", "7"))
+HARI_TARGET = float(os.environ.get("KASIR_HARI_TARGET", "14"))
+
+# Indeks snapshot (mtime folder, daftar), waktu mutasi terakhir dan thread snapshot per cabang
+_kunci = threading.Lock()
+_snapshot = {}
+_terakhir = {}
+_thread = {}
+# cabang -> (kunci versi, daftar menipis)
+_menipis = {}
+
+
+def _stok_katalog():
+    return {(b["nama"], b["kategori"]): b["stok"] for b in baca_data(BARANG_FILE)}
+
+
+def _ke_waktu(waktu):
+    # date = akhir hari itu, datetime/str apa adanya
+    if isinstance(waktu, datetime):
+        return waktu.strftime(FORMAT_WAKTU)
+    if isinstance(waktu, date):
+        return f"{waktu.isoformat()} 23:59:59.999999"
+    return waktu
+
+
+def _waktu_baru():
+    # Waktu mutasi selalu naik di proses ini, meski jam mundur atau dua mutasi di mikrodetik yang sama
+    cabang = cabang_aktif()
+    sekarang = datetime.now()
+    terakhir = _terakhir.get(cabang)
+    if terakhir is not None and sekarang <= terakhir:
+        sekarang = terakhir + timedelta(microseconds=1)
+    _terakhir[cabang] = sekarang
+    return sekarang.strftime(FORMAT_WAKTU)
+
+
+def _nama_file(waktu, jumlah):
+    # Urutan nama file = urutan waktu
+    return f"{waktu[:10]}T{waktu[11:].replace(':', '-')}_{jumlah}.json"
+
+
+def _dari_nama(nama):
+    waktu, jumlah = nama[:-len(".json")].rsplit("_", 1)
+    return {"waktu": f"{waktu[:10]} {waktu[11:].replace('-', ':')}", "jumlah": int(jumlah), "file": nama}
+
+
+def _daftar_snapshot():
+    # Dibaca ulang di dalam kunci setiap kali isi folder berubah (termasuk oleh proses lain)
+    cabang = cabang_aktif()
+    folder = path_cabang(SNAPSHOT_DIR)
+    with kunci_data():
+        try:
+            cap = os.stat(folder).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        with _kunci:
+            lama = _snapshot.get(cabang)
+            if lama is not None and lama[0] == cap:
+                return lama[1]
+        daftar = sorted((_dari_nama(n) for n in os.listdir(folder) if n.endswith(".json")),
+                        key=lambda s: s["waktu"])
+        with _kunci:
+            _snapshot[cabang] = (cap, daftar)
+        return daftar
+
+
+@lru_cache(maxsize=8)
+def _baca_snapshot(path):
+    # File snapshot tidak pernah diubah setelah ditulis
+    data = load_dokumen(path)
+    return {(nama, kategori): n for nama, kategori, n in data["stok"]}
+
+
+def _dari_snapshot(snapshot):
+    return _baca_snapshot(path_cabang(os.path.join(SNAPSHOT_DIR, snapshot["file"])))
+
+
+def _simpan_snapshot(waktu, stok, jumlah):
+    save_dokumen(os.path.join(SNAPSHOT_DIR, _nama_file(waktu, jumlah)),
+                 {"waktu": waktu, "jumlah": jumlah,
+                  "stok": [[nama, kategori, n] for (nama, kategori), n in sorted(stok.items())]})
+    with kunci_data():
+        daftar = _daftar_snapshot()
+        # Saldo awal selalu disimpan; snapshot di antaranya hanya mempercepat stok_pada masa lalu
+        for s in daftar[1:-SNAPSHOT_SIMPAN]:
+            os.remove(path_cabang(os.path.join(SNAPSHOT_DIR, s["file"])))
+
+
+def _putar(stok, dari, sampai):
+    # Terapkan mutasi dengan dari < waktu <= sampai ke salinan stok
+    stok = dict(stok)
+    akhir = date.fromisoformat(sampai[:10]) if sampai else None
+    for m in iter_rentang(MUTASI_FILE, date.fromisoformat(dari[:10]), akhir):
+        if m["waktu"] <= dari or (sampai and m["waktu"] > sampai):
+            continue
+        kunci = (m["nama"], m["kategori"])
+        stok[kunci] = stok.get(kunci, 0) + m["selisih"]
+    return stok
+
+
+def _snapshot_sebelum(waktu):
+    daftar = _daftar_snapshot()
+    i = bisect_right([s["waktu"] for s in daftar], waktu) if waktu else len(daftar)
+    if i == 0:
+        awal = daftar[0]["waktu"][:19] if daftar else None
+        raise ValueError(f"Buku stok baru dimulai {awal}" if awal else "Buku stok belum berisi mutasi")
+    return daftar[i - 1]
+
+
+def awal_buku():
+    # Waktu saldo awal, None jika belum ada mutasi
+    daftar = _daftar_snapshot()
+    return datetime.strptime(daftar[0]["waktu"], FORMAT_WAKTU) if daftar else None
+
+
+def catat(perubahan, jenis, oleh=None, keterangan=None):
+    # perubahan = list (nama, kategori, selisih). Dipanggil di dalam kunci_data()
+    # SEBELUM stok diubah, supaya saldo awal (jika belum ada) masih stok lama.
+    perubahan = [(nama, kategori, selisih) for nama, kategori, selisih in perubahan if selisih]
+    if not perubahan:
+        return
+    with kunci_data():
+        if not _daftar_snapshot():
+            _simpan_snapshot(_waktu_baru(), _stok_katalog(), jumlah_data(MUTASI_FILE))
+        waktu = _waktu_baru()
+        # Satu append untuk semua baris: satu fsync jurnal dan satu tulis manifest
+        append_banyak(MUTASI_FILE, [
+            {"waktu": waktu, "nama": nama, "kategori": kategori, "selisih": selisih,
+             "jenis": jenis, "oleh": oleh, "keterangan": keterangan}
+            for nama, kategori, selisih in perubahan
+        ])
+        if jumlah_data(MUTASI_FILE) - _daftar_snapshot()[-1]["jumlah"] >= SNAPSHOT_SETIAP:
+            _jadwalkan_snapshot()
+
+
+def _jadwalkan_snapshot():
+    cabang = cabang_aktif()
+    with _kunci:
+        t = _thread.get(cabang)
+        if t is not None and t.is_alive():
+            return
+        t = _thread[cabang] = threading.Thread(target=_snapshot_latar, args=(cabang,), daemon=True,
+                                               name=f"snapshot-stok-{cabang}")
+    t.start()
+
+
+def _snapshot_latar(cabang):
+    with pakai_cabang(cabang):
+        buat_snapshot()
+
+
+def buat_snapshot():
+    # Stok dihitung di dalam kunci agar tidak ada mutasi yang terlewat; file ditulis di luarnya
+    with kunci_data():
+        terakhir = _snapshot_sebelum(None)
+        waktu = _waktu_baru()
+        stok = _putar(_dari_snapshot(terakhir), terakhir["waktu"], waktu)
+        jumlah = jumlah_data(MUTASI_FILE)
+    _simpan_snapshot(waktu, stok, jumlah)
+
+
+def stok_pada(waktu=None, nama=None, kategori=None):
+    # Stok semua barang {(nama, kategori): stok} pada waktu tertentu (date = akhir hari itu,
+    # None = sekarang); jika nama dan kategori diisi, hanya stok barang itu.
+    # ValueError jika waktu sebelum saldo awal buku stok.
+    waktu = _ke_waktu(waktu)
+    with kunci_data():
+        # Di dalam kunci agar snapshot yang dipilih tidak dihapus sebelum dibaca
+        snapshot = _snapshot_sebelum(waktu)
+        awal = _dari_snapshot(snapshot)
+    stok = _putar(awal, snapshot["waktu"], waktu)
+    if nama is not None:
+        return stok.get((nama, kategori), 0)
+    return {k: n for k, n in stok.items() if n}
+
+
+def mutasi(mulai=None, akhir=None, nama=None, kategori=None):
+    # Daftar mutasi dalam rentang tanggal, terlama dulu
+    return [dict(m) for m in iter_rentang(MUTASI_FILE, mulai, akhir)
+            if nama is None or (m["nama"], m["kategori"]) == (nama, kategori)]
+
+
+def pergerakan(mulai, akhir):
+    # Per barang: stok awal (akhir hari sebelum mulai), masuk, keluar, stok akhir dan
+    # selisih per jenis mutasi dalam rentang tanggal
+    batas = _ke_waktu(mulai - timedelta(days=1))
+    daftar = _daftar_snapshot()
+    if daftar and batas < daftar[0]["waktu"]:
+        batas = daftar[0]["waktu"]
+    awal = stok_pada(batas)
+    hasil = {k: {"nama": k[0], "kategori": k[1], "awal": n, "masuk": 0, "keluar": 0, "jenis": {}}
+             for k, n in awal.items()}
+    for m in iter_rentang(MUTASI_FILE, mulai, akhir):
+        if m["waktu"] <= batas:
+            continue
+        kunci = (m["nama"], m["kategori"])
+        p = hasil.setdefault(kunci, {"nama": kunci[0], "kategori": kunci[1], "awal": 0, "masuk": 0,
+                                     "keluar": 0, "jenis": {}})
+        if m["selisih"] > 0:
+            p["masuk"] += m["selisih"]
+        else:
+            p["keluar"] -= m["selisih"]
+        p["jenis"][m["jenis"]] = p["jenis"].get(m["jenis"], 0) + m["selisih"]
+    for p in hasil.values():
+        p["akhir"] = p["awal"] + p["masuk"] - p["keluar"]
+    return sorted(hasil.values(), key=lambda p: (p["kategori"], p["nama"]))
+
+
+def rekonsiliasi():
+    # Barang yang stoknya di barang.json tidak sama dengan hasil buku stok; list kosong = cocok
+    with kunci_data():
+        if not _daftar_snapshot():
+            return []
+        buku = stok_pada()
+        stok = _stok_katalog()
+    selisih = []
+    for kunci in sorted(set(buku) | set(stok)):
+        if buku.get(kunci, 0) != stok.get(kunci, 0):
+            selisih.append({"nama": kunci[0], "kategori": kunci[1], "buku": buku.get(kunci, 0),
+                            "stok": stok.get(kunci, 0), "selisih": stok.get(kunci, 0) - buku.get(kunci, 0)})
+    return selisih
+
+
+def _daftar_menipis(kat, batas_hari):
+    kecepatan = ringkasan.kecepatan()
+    hasil = []
+    for b in kat.barang:
+        laju = kecepatan.get((b["nama"], b["kategori"]), 0)
+        if b["stok"] > 0 and (laju <= 0 or b["stok"] / laju > batas_hari):
+            continue
+        hasil.append({"nama": b["nama"], "kategori": b["kategori"], "stok": b["stok"],
+                      "per_hari": laju, "hari": b["stok"] / laju if laju > 0 and b["stok"] > 0 else 0,
+                      "saran": max(0, math.ceil(laju * HARI_TARGET - b["stok"]))})
+    # Paling cepat habis dulu; yang sama-sama habis diurutkan dari yang paling laku
+    hasil.sort(key=lambda r: (r["hari"], -r["per_hari"]))
+    return hasil
+
+
+def menipis(n=None, batas_hari=HARI_MENIPIS):
+    # Barang yang stoknya habis atau cukup untuk batas_hari hari atau kurang, urut dari yang paling
+    # cepat habis. Dihitung ulang hanya saat katalog, jumlah transaksi atau tanggal berubah.
+    kat = katalog()
+    kunci = (kat, ringkasan.versi(), date.today(), batas_hari)
+    cabang = cabang_aktif()
+    with _kunci:
+        lama = _menipis.get(cabang)
+    if lama is not None and lama[0][0] is kat and lama[0][1:] == kunci[1:]:
+        hasil = lama[1]
+    else:
+        hasil = _daftar_menipis(kat, batas_hari)
+        with _kunci:
+            _menipis[cabang] = (kunci, hasil)
+    return hasil if n is None else hasil[:n]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buku stok Aplikasi Kasir")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+    p_cek = sub.add_parser("cek", help="Bandingkan stok barang dengan buku stok")
+    p_cek.add_argument("--cabang", default=PUSAT)
+    p_snapshot = sub.add_parser("snapshot", help="Simpan snapshot stok sekarang")
+    p_snapshot.add_argument("--cabang", default=PUSAT)
+    args = parser.parse_args()
+
+    atur_cabang(args.cabang)
+    if args.perintah == "cek":
+        hasil = rekonsiliasi()
+        for s in hasil:
+            print(f"{s['nama']} ({s['kategori']}): stok {s['stok']}, buku {s['buku']}, selisih {s['selisih']}")
+        print("Stok cocok dengan buku stok" if not hasil else f"{len(hasil)} barang tidak cocok")
+        raise SystemExit(1 if hasil else 0)
+    if args.perintah == "snapshot":
+        try:
+            buat_snapshot()
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Snapshot disimpan ({len(_daftar_snapshot())} snapshot)")
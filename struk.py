@@ -0,0 +1,200 @@
+# struk.py
+# Struk PDF dan kode QR. PDF dibuat di pool thread terpisah sehingga tombol
+# simpan transaksi tidak menunggu fpdf; halaman cukup menyimpan id tugas dan
+# mengambil hasilnya saat sudah selesai. Logo dan kepala struk disiapkan sekali
+# lalu dipakai ulang oleh setiap dokumen. qrcode, fpdf dan PIL baru diimpor saat
+# struk atau QR pertama dibuat agar halaman Transaksi tidak memuatnya saat start.
+import contextvars
+import io
+import itertools
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from penyimpanan import TRANSAKSI_FILE, iter_rentang
+
+NAMA_TOKO = os.environ.get("KASIR_NAMA_TOKO", "Kasir App")
+ALAMAT_TOKO = os.environ.get("KASIR_ALAMAT_TOKO", "")
+LOGO_FILE = os.environ.get("KASIR_LOGO", "logo.png")
+# Payload QRIS statis merchant (dari penyedia QRIS); kosong = QR pembayaran tidak ditampilkan
+QRIS_MERCHANT = os.environ.get("KASIR_QRIS", "")
+
+LEBAR_KERTAS = 80  # mm, kertas thermal
+MARGIN = 4
+LEBAR_LOGO = 30
+UKURAN_QR = 28
+PEKERJA_STRUK = int(os.environ.get("KASIR_STRUK_WORKERS", "2"))
+TUGAS_MAKS = 64  # hasil tugas yang disimpan di memori
+
+_pool = ThreadPoolExecutor(max_workers=PEKERJA_STRUK, thread_name_prefix="struk")
+_kunci = threading.Lock()
+_tugas = OrderedDict()
+_nomor = itertools.count(1)
+
+
+def _latin1(teks):
+    # Font inti fpdf 1.7 hanya mendukung latin-1
+    return str(teks).encode("latin-1", "replace").decode("latin-1")
+
+
+def _rupiah(nilai):
+    return f"Rp {nilai:,.0f}"
+
+
+def kode_struk(t):
+    # Isi QR struk untuk mencari kembali transaksi dari riwayat
+    return f"STRUK|{t['waktu']}|{t['kasir']}|{t['total']}"
+
+
+@lru_cache(maxsize=128)
+def qr_png(teks):
+    import qrcode
+
+    img = qrcode.make(teks, border=2).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _parse_png(isi):
+    # fpdf 1.7 hanya membaca gambar dari path
+    from fpdf import FPDF
+
+    fd, path = tempfile.mkstemp(suffix=".png")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(isi)
+        return FPDF()._parsepng(path)
+    finally:
+        os.remove(path)
+
+
+@lru_cache(maxsize=1)
+def _template():
+    # Logo diperkecil, dibuang kanal alfanya (tidak didukung fpdf 1.7) dan diparse sekali
+    logo = None
+    if LOGO_FILE and os.path.exists(LOGO_FILE):
+        from PIL import Image
+
+        img = Image.open(LOGO_FILE)
+        img.thumbnail((300, 300))
+        latar = Image.new("RGB", img.size, "white")
+        latar.paste(img, mask=img.getchannel("A") if "A" in img.getbands() else None)
+        buf = io.BytesIO()
+        latar.save(buf, format="PNG")
+        logo = _parse_png(buf.getvalue())
+    return {
+        "logo": logo,
+        "nama": _latin1(NAMA_TOKO),
+        "alamat": [_latin1(b) for b in ALAMAT_TOKO.split("\n") if b],
+    }
+
+
+def _gambar(pdf, nama, info, x, y, w):
+    # Memakai info gambar yang sudah diparse, tanpa membaca file lagi
+    if nama not in pdf.images:
+        pdf.images[nama] = dict(info, i=len(pdf.images) + 1)
+    pdf.image(nama, x, y, w)
+    return w * info["h"] / info["w"]
+
+
+def _tinggi(t, template):
+    tinggi = 2 * MARGIN + 12 + 4 * len(template["alamat"]) + 16 + 8 * len(t["items"]) + 22 + UKURAN_QR + 12
+    if template["logo"]:
+        tinggi += LEBAR_LOGO * template["logo"]["h"] / template["logo"]["w"] + 2
+    return tinggi
+
+
+def _tulis_struk(pdf, t, template):
+    pdf.add_page()
+    lebar = LEBAR_KERTAS - 2 * MARGIN
+    if template["logo"]:
+        h = _gambar(pdf, "logo", template["logo"], (LEBAR_KERTAS - LEBAR_LOGO) / 2, pdf.get_y(), LEBAR_LOGO)
+        pdf.set_y(pdf.get_y() + h + 2)
+    pdf.set_font("Helvetica", "B", 11)
+    pdf.cell(lebar, 6, template["nama"], ln=1, align="C")
+    pdf.set_font("Helvetica", "", 8)
+    for baris in template["alamat"]:
+        pdf.cell(lebar, 4, baris, ln=1, align="C")
+    pdf.ln(2)
+
+    pdf.cell(lebar, 4, _latin1(f"Waktu : {t['waktu']}"), ln=1)
+    pdf.cell(lebar, 4, _latin1(f"Kasir : {t['kasir']}"), ln=1)
+    pdf.cell(lebar, 4, _latin1(f"Metode: {t['metode']}"), ln=1)
+    pdf.cell(lebar, 2, "-" * 60, ln=1)
+
+    for item in t["items"]:
+        pdf.cell(lebar, 4, _latin1(item["nama"]), ln=1)
+        pdf.cell(lebar / 2, 4, _latin1(f"  {item['qty']} x {_rupiah(item['harga'])}"))
+        pdf.cell(lebar / 2, 4, _rupiah(item["subtotal"]), ln=1, align="R")
+    pdf.cell(lebar, 2, "-" * 60, ln=1)
+
+    for label, nilai, tebal in (("TOTAL", t["total"], "B"), ("Dibayar", t["bayar"], ""),
+                                ("Kembalian", t["kembalian"], "")):
+        pdf.set_font("Helvetica", tebal, 9)
+        pdf.cell(lebar / 2, 5, label)
+        pdf.cell(lebar / 2, 5, _rupiah(nilai), ln=1, align="R")
+
+    pdf.ln(2)
+    kode = kode_struk(t)
+    _gambar(pdf, f"qr-{kode}", _parse_png(qr_png(kode)), (LEBAR_KERTAS - UKURAN_QR) / 2, pdf.get_y(), UKURAN_QR)
+    pdf.set_y(pdf.get_y() + UKURAN_QR + 1)
+    pdf.set_font("Helvetica", "", 7)
+    pdf.cell(lebar, 4, "Terima kasih atas kunjungan Anda", ln=1, align="C")
+
+
+def pdf_struk(transaksi):
+    # Satu halaman per transaksi; tinggi kertas mengikuti struk terpanjang
+    from fpdf import FPDF
+
+    transaksi = list(transaksi)
+    template = _template()
+    tinggi = max((_tinggi(t, template) for t in transaksi), default=100)
+    pdf = FPDF(unit="mm", format=(LEBAR_KERTAS, tinggi))
+    pdf.set_margins(MARGIN, MARGIN, MARGIN)
+    pdf.set_auto_page_break(True, MARGIN)
+    pdf.set_title(_latin1(f"Struk {template['nama']}"))
+    for t in transaksi:
+        _tulis_struk(pdf, t, template)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def _kirim(fungsi, *args):
+    # Dijalankan dalam salinan context pemanggil agar pekerja membaca cabang yang sama
+    with _kunci:
+        id_tugas = next(_nomor)
+        _tugas[id_tugas] = _pool.submit(contextvars.copy_context().run, fungsi, *args)
+        while len(_tugas) > TUGAS_MAKS:
+            _tugas.popitem(last=False)
+    return id_tugas
+
+
+def kirim(transaksi):
+    # Mulai membuat PDF di latar belakang; mengembalikan id tugas untuk hasil()
+    return _kirim(pdf_struk, [dict(t) for t in transaksi])
+
+
+def _pdf_rentang(mulai, akhir, kasir, saring):
+    return pdf_struk(t for t in iter_rentang(TRANSAKSI_FILE, mulai, akhir, kasir)
+                     if saring is None or saring(t))
+
+
+def kirim_rentang(mulai, akhir, kasir=None, saring=None):
+    # Cetak ulang semua struk dalam rentang (dan filter) dari riwayat
+    return _kirim(_pdf_rentang, mulai, akhir, kasir, saring)
+
+
+def hasil(id_tugas):
+    # ("proses", None), ("selesai", bytes PDF), ("gagal", pesan) atau (None, None) jika tidak dikenal
+    with _kunci:
+        tugas = _tugas.get(id_tugas)
+    if tugas is None:
+        return None, None
+    if not tugas.done():
+        return "proses", None
+    if tugas.exception() is not None:
+        return "gagal", str(tugas.exception())
+    return "selesai", tugas.result()
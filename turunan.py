@@ -0,0 +1,100 @@
+# turunan.py
+# Data turunan transaksi per cabang (rekap penjualan, tabel fakta item) yang
+# diperbarui setiap kali transaksi disimpan. Setiap proses menyelaraskan salinannya
+# dengan penyimpanan di dalam kunci_data: transaksi yang disimpan proses lain
+# diterapkan mulai dari tanda waktu terakhir (penyimpanan.iter_sesudah), bukan
+# dibangun ulang. Beberapa transaksi berdekatan digabung dalam satu tulis ke disk.
+import atexit
+import threading
+
+from penyimpanan import TRANSAKSI_FILE, cabang_aktif, iter_rentang, iter_sesudah, jumlah_data, kunci_data, pakai_cabang
+
+
+class DataTurunan:
+    # muat() -> data dari disk (None jika belum ada/versi lain), kosong() -> data baru,
+    # terapkan(data, t) menambah satu transaksi termasuk jumlah dan tandanya,
+    # status(data) -> (jumlah transaksi, tanda), tulis(data) menyimpan ke disk.
+    # Urutan kunci selalu kunci_data -> self.kunci, sama seperti saat transaksi disimpan.
+
+    def __init__(self, muat, kosong, terapkan, status, tulis, jeda=2.0):
+        self._muat = muat
+        self._kosong = kosong
+        self._terapkan = terapkan
+        self._status = status
+        self._tulis = tulis
+        self.jeda = jeda
+        self.kunci = threading.Lock()
+        # Data dan timer simpan per cabang
+        self._data = {}
+        self._timer = {}
+        atexit.register(self._simpan_saat_keluar)
+
+    def bangun(self, transaksi):
+        data = self._kosong()
+        for t in transaksi:
+            self._terapkan(data, t)
+        return data
+
+    def _selaraskan(self, cabang, baru=None):
+        # Di dalam kunci_data dan self.kunci. Data disamakan dengan jumlah transaksi di penyimpanan,
+        # termasuk transaksi dari proses lain; baru = transaksi yang baru saja di-append proses ini.
+        # True jika data berubah.
+        data = self._data.get(cabang)
+        if data is None:
+            data = self._data[cabang] = self._muat() or self._kosong()
+        n = jumlah_data(TRANSAKSI_FILE)
+        jumlah, tanda = self._status(data)
+        if n == jumlah:
+            return False
+        if baru is not None and n == jumlah + 1:
+            self._terapkan(data, baru)
+            return True
+        for t in iter_sesudah(TRANSAKSI_FILE, tanda):
+            self._terapkan(data, t)
+        # Transaksi dengan waktu mundur atau data yang diubah di luar aplikasi: bangun ulang
+        if self._status(data)[0] != n:
+            self._data[cabang] = self.bangun(iter_rentang(TRANSAKSI_FILE))
+        return True
+
+    def pastikan_termuat(self, baru=None):
+        cabang = cabang_aktif()
+        data = self._data.get(cabang)
+        if data is not None and baru is None and self._status(data)[0] == jumlah_data(TRANSAKSI_FILE):
+            return data
+        with kunci_data():
+            with self.kunci:
+                if self._selaraskan(cabang, baru):
+                    self._jadwalkan_simpan()
+                return self._data[cabang]
+
+    def catat_transaksi(self, t):
+        # Dipanggil di dalam kunci_data setelah transaksi di-append
+        self.pastikan_termuat(t)
+
+    def bangun_ulang(self):
+        with kunci_data():
+            with self.kunci:
+                data = self._data[cabang_aktif()] = self.bangun(iter_rentang(TRANSAKSI_FILE))
+                self._tulis(data)
+                return data
+
+    def _simpan(self, cabang):
+        # Timer berjalan di thread lain, jadi cabangnya dipasang ulang di sini. Data diselaraskan
+        # dulu agar file memuat transaksi semua proses sampai saat ini.
+        with kunci_data(), self.kunci, pakai_cabang(cabang):
+            self._timer.pop(cabang, None)
+            if cabang in self._data:
+                self._selaraskan(cabang)
+                self._tulis(self._data[cabang])
+
+    def _jadwalkan_simpan(self):
+        cabang = cabang_aktif()
+        if cabang not in self._timer:
+            self._timer[cabang] = threading.Timer(self.jeda, self._simpan, args=(cabang,))
+            self._timer[cabang].daemon = True
+            self._timer[cabang].start()
+
+    def _simpan_saat_keluar(self):
+        for cabang, timer in list(self._timer.items()):
+            timer.cancel()
+            self._simpan(cabang)